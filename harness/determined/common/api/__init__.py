@@ -1,5 +1,6 @@
 from determined.common.api import authentication, errors, metric, request
 from determined.common.api._session import Session
+from determined.common.api._async_session import AsyncSession
 from determined.common.api import bindings
 from determined.common.api._util import PageOpts, read_paginated, WARNING_MESSAGE_MAP
 from determined.common.api.authentication import Authentication, salt_and_hash
@@ -0,0 +1,141 @@
+import asyncio
+import concurrent.futures
+import functools
+from types import TracebackType
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, TypeVar
+
+import requests
+
+from determined.common.api import _session
+
+T = TypeVar("T")
+
+_done = object()
+
+
+class AsyncSession:
+    """
+    AsyncSession offloads the blocking requests of a Session to a thread pool, so that they can be
+    awaited from asyncio code without blocking the event loop.
+
+    This is not an asyncio-native client: every request occupies one of max_concurrency threads
+    until it completes, so at most max_concurrency requests are in flight at once, and any more
+    wait for a free thread.  max_concurrency defaults to the pool_maxsize of the Session, since
+    requests beyond the connection pool of the Session would only wait for a connection or open
+    and close extra ones.  Each item of stream() also occupies a thread until it arrives, so a
+    followed log stream holds one for as long as it waits for new logs.  Cancelling an awaiting
+    task does not abort its request.
+
+    Any generated binding can be called through call(), and streaming bindings (like
+    bindings.get_TrialLogs) can be iterated with stream():
+
+    .. code::
+
+        async with api.AsyncSession(sess) as asess:
+            resp = await asess.call(bindings.get_GetExperiment, experimentId=1)
+            async for log in asess.stream(bindings.get_TrialLogs, trialId=1, follow=True):
+                print(log.message)
+    """
+
+    def __init__(self, session: _session.Session, max_concurrency: Optional[int] = None) -> None:
+        if max_concurrency is None:
+            max_concurrency = session._pool_maxsize
+        self.session = session
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="det-api"
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def call(self, binding: Callable[..., T], **kwargs: Any) -> T:
+        """
+        Await binding(session, **kwargs), where binding is a function from api.bindings.
+        """
+        return await self._run(binding, self.session, **kwargs)
+
+    async def stream(self, binding: Callable[..., Iterable[T]], **kwargs: Any) -> AsyncIterator[T]:
+        """
+        Iterate over the results of a streaming binding, like bindings.get_TrialLogs.
+        """
+        it = iter(binding(self.session, **kwargs))
+        try:
+            while True:
+                item = await self._run(next, it, _done)
+                if item is _done:
+                    return
+                yield item
+        finally:
+            # Close the underlying response if the caller stopped iterating early.
+            close = getattr(it, "close", None)
+            if close is not None:
+                await self._run(close)
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+    ) -> requests.Response:
+        return await self._run(self.session.get, path, params, headers, timeout)
+
+    async def delete(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+    ) -> requests.Response:
+        return await self._run(self.session.delete, path, params, headers, timeout)
+
+    async def post(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+    ) -> requests.Response:
+        return await self._run(self.session.post, path, params, json, data, headers, timeout)
+
+    async def patch(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+    ) -> requests.Response:
+        return await self._run(self.session.patch, path, params, json, data, headers, timeout)
+
+    async def put(
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Optional[str] = None,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+    ) -> requests.Response:
+        return await self._run(self.session.put, path, params, json, data, headers, timeout)
+
+    def close(self) -> None:
+        """
+        Wait for in-flight requests and stop the request threads.  The Session is not closed.
+        """
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
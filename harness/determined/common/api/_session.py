@@ -1,13 +1,74 @@
-from typing import Any, Dict, Optional
+import collections
+import threading
+import time
+from types import TracebackType
+from typing import Any, Dict, Optional, Tuple
 
 import requests
 import urllib3
 
+import determined.common.requests
 from determined.common import util
-from determined.common.api import authentication, certs, request
+from determined.common.api import authentication, certs, errors, request
+
+# Connections to the master kept alive by each Session.
+DEFAULT_POOL_MAXSIZE = 10
+# Number of responses kept by a Session with a response cache.
+RESPONSE_CACHE_SIZE = 1024
+
+
+class _ResponseCache:
+    """
+    A thread-safe LRU cache of GET responses, which expire after ttl seconds.
+
+    An expired response with an ETag is revalidated with If-None-Match instead of fetched again.
+    """
+
+    def __init__(self, ttl: float, max_size: int = RESPONSE_CACHE_SIZE) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[Any, Tuple[float, requests.Response]]" = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: Any) -> Tuple[Optional[requests.Response], bool]:
+        """
+        Return the cached response and whether it is still fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._entries.move_to_end(key)
+            expires, resp = entry
+            return resp, time.time() < expires
+
+    def put(self, key: Any, resp: requests.Response) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, resp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
 
 
 class Session:
+    """
+    Session sends requests to the master.
+
+    With keep_alive, requests reuse a pool of up to pool_maxsize connections, so that only the
+    first request pays for connecting to the master.  A Session may be shared by many threads.
+    close() closes the pooled connections; the Session stays usable afterwards.
+
+    With a cache_ttl, the responses of GET requests are cached for cache_ttl seconds, so that
+    repeated lookups of the same objects are answered locally.  Any other request clears the
+    cache, since it may have changed what the cached responses describe.
+    """
+
     def __init__(
         self,
         master: Optional[str],
@@ -15,12 +76,50 @@ class Session:
         auth: Optional[authentication.Authentication],
         cert: Optional[certs.Cert],
         max_retries: Optional[urllib3.util.retry.Retry] = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        cache_ttl: Optional[float] = None,
     ) -> None:
         self._master = master or util.get_default_master_address()
         self._user = user
         self._auth = auth
         self._cert = cert
         self._max_retries = max_retries
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._cache_ttl = cache_ttl
+        self._cache = _ResponseCache(cache_ttl) if cache_ttl is not None else None
+
+        self._lock = threading.Lock()
+        self._http: Optional[requests.Session] = None
+
+    def _http_session(self) -> Optional[requests.Session]:
+        if not self._keep_alive:
+            return None
+        with self._lock:
+            if self._http is None:
+                cert = self._cert if self._cert is not None else certs.cli_cert
+                self._http = determined.common.requests.Session(
+                    cert.name if cert else None, self._max_retries, self._pool_maxsize
+                )
+            return self._http
+
+    def close(self) -> None:
+        with self._lock:
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
 
     def _do_request(
         self,
@@ -32,6 +131,50 @@ class Session:
         headers: Optional[Dict[str, Any]],
         timeout: Optional[int],
         stream: bool,
+    ) -> requests.Response:
+        if self._cache is None or stream:
+            return self._send(method, path, params, json, data, headers, timeout, stream)
+        if method != "GET":
+            self._cache.clear()
+            return self._send(method, path, params, json, data, headers, timeout, stream)
+
+        key = (path, repr(sorted((params or {}).items())), repr(sorted((headers or {}).items())))
+        cached, fresh = self._cache.get(key)
+        if cached is not None and fresh:
+            return cached
+        etag = cached.headers.get("ETag") if cached is not None else None
+        if cached is not None and etag is not None:
+            try:
+                resp = self._send(
+                    method,
+                    path,
+                    params,
+                    json,
+                    data,
+                    {**(headers or {}), "If-None-Match": etag},
+                    timeout,
+                    stream,
+                )
+            except errors.APIException as e:
+                if e.status_code != 304:
+                    raise
+                # Not modified.
+                resp = cached
+        else:
+            resp = self._send(method, path, params, json, data, headers, timeout, stream)
+        self._cache.put(key, resp)
+        return resp
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]],
+        json: Any,
+        data: Optional[str],
+        headers: Optional[Dict[str, Any]],
+        timeout: Optional[int],
+        stream: bool,
     ) -> requests.Response:
         return request.do_request(
             method,
@@ -46,6 +189,7 @@ class Session:
             timeout=timeout,
             stream=stream,
             max_retries=self._max_retries,
+            session=self._http_session(),
         )
 
     def get(
@@ -109,4 +253,7 @@ class Session:
             auth=self._auth,
             cert=self._cert,
             max_retries=retry,
+            pool_maxsize=self._pool_maxsize,
+            keep_alive=self._keep_alive,
+            cache_ttl=self._cache_ttl,
         )
@@ -1,3 +1,4 @@
+import concurrent.futures
 import enum
 import time
 from typing import Callable, Iterator, Optional, TypeVar, Union
@@ -23,11 +24,11 @@ WARNING_MESSAGE_MAP = {
 }
 
 
-def read_paginated(
-    get_with_offset: Callable[[int], T],
-    offset: int = 0,
-    pages: PageOpts = PageOpts.all,
-) -> Iterator[T]:
+# Number of pages read_paginated() fetches at once.
+DEFAULT_PAGINATION_CONCURRENCY = 8
+
+
+def _read_serially(get_with_offset: Callable[[int], T], offset: int) -> Iterator[T]:
     while True:
         resp = get_with_offset(offset)
         pagination = resp.pagination
@@ -35,12 +36,62 @@ def read_paginated(
         assert pagination.endIndex is not None
         assert pagination.total is not None
         yield resp
-        if pagination.endIndex >= pagination.total or pages == PageOpts.single:
+        if pagination.endIndex >= pagination.total:
             break
-        assert pagination.endIndex is not None
         offset = pagination.endIndex
 
 
+def read_paginated(
+    get_with_offset: Callable[[int], T],
+    offset: int = 0,
+    pages: PageOpts = PageOpts.all,
+    max_concurrency: int = DEFAULT_PAGINATION_CONCURRENCY,
+) -> Iterator[T]:
+    """
+    Yield the pages of a paginated API, starting at offset.
+
+    The first page tells the page size and the total, so the rest of the pages are fetched with up
+    to max_concurrency requests in flight.  Pages are still yielded in order.  If more results
+    appear while the pages are being fetched, they are read page by page afterwards.
+    """
+    resp = get_with_offset(offset)
+    pagination = resp.pagination
+    assert pagination is not None
+    assert pagination.endIndex is not None
+    assert pagination.total is not None
+    yield resp
+    if pagination.endIndex >= pagination.total or pages == PageOpts.single:
+        return
+
+    page_size = pagination.endIndex - (pagination.startIndex or 0)
+    if max_concurrency <= 1 or page_size <= 0:
+        yield from _read_serially(get_with_offset, pagination.endIndex)
+        return
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="det-paginate"
+    ) as pool:
+        futures = [
+            pool.submit(get_with_offset, o)
+            for o in range(pagination.endIndex, pagination.total, page_size)
+        ]
+        try:
+            for future in futures:
+                resp = future.result()
+                yield resp
+        finally:
+            # The caller may stop reading early.
+            for future in futures:
+                future.cancel()
+
+    pagination = resp.pagination
+    assert pagination is not None
+    assert pagination.endIndex is not None
+    assert pagination.total is not None
+    if pagination.endIndex < pagination.total:
+        yield from _read_serially(get_with_offset, pagination.endIndex)
+
+
 # Literal["notebook", "tensorboard", "shell", "command"]
 class NTSC_Kind(enum.Enum):
     notebook = "notebook"
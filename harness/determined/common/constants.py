@@ -35,6 +35,12 @@ ERROR = "ERROR"
 
 SHARED_FS_CONTAINER_PATH = "/determined_shared_fs"
 
+# Trial checkpoints hold a snapshot of the model definition in this archive, which is extracted
+# into USER_CODE_DIR next to it when the checkpoint is loaded.  Older checkpoints only hold
+# USER_CODE_DIR.
+USER_CODE_ARCHIVE = "code.tar.gz"
+USER_CODE_DIR = "code"
+
 # By default, we ignore:
 #  - all byte-compiled Python files to ignore a potential stale compilation
 #  - terraform files generated by `det deploy gcp`, e.g. when user creates
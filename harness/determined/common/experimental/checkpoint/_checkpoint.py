@@ -8,9 +8,9 @@ import tarfile
 from typing import Any, Dict, List, Optional
 
 from determined import errors
-from determined.common import api, constants, storage
+from determined.common import api, constants, storage, util
 from determined.common.api import bindings
-from determined.common.storage import shared
+from determined.common.storage import content_addressed, shared
 
 
 class DownloadMode(enum.Enum):
@@ -188,6 +188,10 @@ class Checkpoint:
         if not metadata_path.exists():
             self.write_metadata_file(str(metadata_path))
 
+        # Trial checkpoints store their model code as an archive, but the code directory is where
+        # users import it from.
+        util.extract_user_code(local_ckpt_dir)
+
         return str(local_ckpt_dir)
 
     def _download_auto(
@@ -215,27 +219,28 @@ class Checkpoint:
     ) -> None:
         if checkpoint_storage["type"] == "shared_fs":
             src_ckpt_dir = self._find_shared_fs_path(checkpoint_storage)
-            shutil.copytree(str(src_ckpt_dir), str(local_ckpt_dir))
+            if content_addressed.is_content_addressed(src_ckpt_dir):
+                # The files of a content-addressed checkpoint are blobs shared by all checkpoints.
+                manager = storage.ContentAddressedStorageManager(
+                    storage.SharedFSStorageManager(str(src_ckpt_dir.parent))
+                )
+                manager.download(self.uuid, str(local_ckpt_dir))
+            else:
+                shutil.copytree(str(src_ckpt_dir), str(local_ckpt_dir))
         else:
             local_ckpt_dir.mkdir(parents=True, exist_ok=True)
-            manager = storage.build(
-                checkpoint_storage,
-                container_path=None,
-            )
-            if not isinstance(
-                manager,
-                (
-                    storage.S3StorageManager,
-                    storage.GCSStorageManager,
-                    storage.AzureStorageManager,
-                ),
-            ):
+            if checkpoint_storage["type"] not in ("s3", "gcs", "azure"):
                 raise AssertionError(
                     "Downloading from Azure, S3 or GCS requires the experiment "
                     "to be configured with Azure, S3 or GCS checkpointing"
                     ", {} found instead".format(checkpoint_storage["type"])
                 )
-
+            # Content-addressed checkpoints are only readable through the content-addressed layer,
+            # which reads other checkpoints as usual.
+            manager = storage.build(
+                {**checkpoint_storage, "content_addressed": True},
+                container_path=None,
+            )
             manager.download(self.uuid, str(local_ckpt_dir))
 
     @staticmethod
@@ -257,6 +262,13 @@ class Checkpoint:
         with tarfile.open(fileobj=resp.raw) as tf:
             tf.extractall(local_ckpt_dir)
 
+        if content_addressed.is_content_addressed(local_ckpt_dir):
+            # The master only sends the checkpoint directory, not the blobs it refers to.
+            raise errors.ProxiedDownloadFailed(
+                f"checkpoint {uuid} is stored by content and can't be downloaded through the "
+                "master; download it with DownloadMode.DIRECT instead"
+            )
+
     def write_metadata_file(self, path: str) -> None:
         """
         Write a file with this Checkpoint's metadata inside of it.
@@ -1,8 +1,10 @@
 import enum
+import os
 import sys
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 
+import numpy as np
 import urllib3
 
 from determined.common import api
@@ -111,6 +113,33 @@ class ExperimentReference:
 
         return [trial.TrialReference(t.id, self._session) for r in resps for t in r.trials]
 
+    def export_metrics(
+        self,
+        group: str = "training",
+        metric_names: Optional[Sequence[str]] = None,
+        min_steps: Optional[int] = None,
+        max_steps: Optional[int] = None,
+        parquet_path: Optional[Union[str, os.PathLike]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Export the metrics of every trial of this experiment as columns of NumPy arrays.
+
+        See :meth:`Determined.export_trials_metrics()
+        <determined.experimental.client.Determined.export_trials_metrics>` for the columns.
+
+        Arguments:
+            group: ``"training"`` or ``"validation"``.
+            metric_names: If set, only export these metrics.
+            min_steps: If set, skip reports from before this many steps were completed.
+            max_steps: If set, skip reports from after this many steps were completed.
+            parquet_path: If set, also write the columns to a Parquet file at this path.  This
+                requires ``pyarrow``.
+        """
+        trial_ids = [t.id for t in self.get_trials(sort_by=trial.TrialSortBy.ID)]
+        return trial._export_metrics(
+            self._session, trial_ids, group, metric_names, min_steps, max_steps, parquet_path
+        )
+
     def await_first_trial(self, interval: float = 0.1) -> trial.TrialReference:
         """
         Wait for the first trial to be started for this experiment.
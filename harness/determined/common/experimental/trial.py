@@ -1,7 +1,12 @@
+import collections
 import dataclasses
 import datetime
 import enum
-from typing import Any, Dict, Iterable, List, Optional, Union
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
 
 from determined.common import api, util
 from determined.common.api import bindings, logs
@@ -422,3 +427,154 @@ def _stream_validation_metrics(
     for i in bindings.get_GetValidationMetrics(session, trialIds=trial_ids):
         for m in i.metrics:
             yield ValidationMetrics._from_bindings(m)
+
+
+# Number of trials whose metrics are requested at once by _export_metrics.
+_EXPORT_TRIALS_PER_REQUEST = 100
+# Number of metric reports which are buffered as Python objects before being converted to arrays.
+_EXPORT_CHUNK_SIZE = 65536
+
+_EXPORT_GROUPS = {
+    "training": (
+        "get_GetTrainingMetrics",
+        "/api/v1/trials/metrics/training_metrics",
+        "avg_metrics",
+    ),
+    "validation": (
+        "get_GetValidationMetrics",
+        "/api/v1/trials/metrics/validation_metrics",
+        "validation_metrics",
+    ),
+}
+
+
+def _to_array(values: List[Any]) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Not every value is a number.
+        return np.array([np.nan if v is None else v for v in values], dtype=object)
+
+
+class _MetricsColumns:
+    """
+    Build columns of metric reports, converting each chunk of reports to NumPy arrays as soon as
+    it is complete, so that memory use grows with the number of values rather than the number of
+    Python objects.  Metrics which a report lacks are NaN.
+    """
+
+    def __init__(self, metric_names: Optional[Sequence[str]]) -> None:
+        self._metric_names = set(metric_names) if metric_names is not None else None
+        self._chunks: Dict[str, List[np.ndarray]] = collections.defaultdict(list)
+        self._chunk_sizes: List[int] = []
+        self._rows: Dict[str, List[Any]] = {
+            "trial_id": [],
+            "trial_run_id": [],
+            "steps_completed": [],
+            "end_time": [],
+        }
+        self._metrics: Dict[str, List[Any]] = {}
+        self._n_rows = 0
+
+    def add(self, report: Dict[str, Any], metrics: Dict[str, Any]) -> None:
+        self._rows["trial_id"].append(report["trialId"])
+        self._rows["trial_run_id"].append(report["trialRunId"])
+        self._rows["steps_completed"].append(report.get("totalBatches", 0))
+        # numpy parses RFC3339 timestamps, but not the "Z" suffix.
+        self._rows["end_time"].append(report["endTime"].rstrip("Z"))
+        for name, value in metrics.items():
+            if self._metric_names is not None and name not in self._metric_names:
+                continue
+            column = self._metrics.get(name)
+            if column is None:
+                column = self._metrics[name] = [None] * self._n_rows
+            column.append(value)
+        self._n_rows += 1
+        for column in self._metrics.values():
+            if len(column) < self._n_rows:
+                column.append(None)
+        if self._n_rows >= _EXPORT_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._n_rows:
+            return
+        for name in ("trial_id", "trial_run_id", "steps_completed"):
+            self._chunks[name].append(np.array(self._rows[name], dtype=np.int64))
+        self._chunks["end_time"].append(np.array(self._rows["end_time"], dtype="datetime64[us]"))
+        for name, column in self._metrics.items():
+            # Pad metrics which first appeared in this chunk.
+            chunks = self._chunks[name]
+            chunks.extend(np.full(n, np.nan) for n in self._chunk_sizes[len(chunks) :])
+            self._chunks[name].append(_to_array(column))
+        self._chunk_sizes.append(self._n_rows)
+        for column in self._rows.values():
+            column.clear()
+        self._metrics = {name: [] for name in self._metrics}
+        self._n_rows = 0
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        self._flush()
+        out = {}
+        for name, chunks in self._chunks.items():
+            # Pad metrics which did not appear in the last chunks.
+            chunks.extend(np.full(n, np.nan) for n in self._chunk_sizes[len(chunks) :])
+            out[name] = np.concatenate(chunks)
+        if not self._chunk_sizes:
+            out = {
+                "trial_id": np.array([], dtype=np.int64),
+                "trial_run_id": np.array([], dtype=np.int64),
+                "steps_completed": np.array([], dtype=np.int64),
+                "end_time": np.array([], dtype="datetime64[us]"),
+            }
+        return out
+
+
+def _export_metrics(
+    session: api.Session,
+    trial_ids: Sequence[int],
+    group: str = "training",
+    metric_names: Optional[Sequence[str]] = None,
+    min_steps: Optional[int] = None,
+    max_steps: Optional[int] = None,
+    parquet_path: Optional[Union[str, os.PathLike]] = None,
+) -> Dict[str, np.ndarray]:
+    if group not in _EXPORT_GROUPS:
+        raise ValueError(f"group must be one of {sorted(_EXPORT_GROUPS)}, not {group!r}")
+    operation, path, key = _EXPORT_GROUPS[group]
+
+    columns = _MetricsColumns(metric_names)
+    for i in range(0, len(trial_ids), _EXPORT_TRIALS_PER_REQUEST):
+        # Parse the streamed reports directly, instead of through the bindings objects.
+        resp = session.get(
+            path,
+            params={"trialIds": list(trial_ids[i : i + _EXPORT_TRIALS_PER_REQUEST])},
+            stream=True,
+        )
+        for line in resp.iter_lines(chunk_size=1024 * 1024):
+            j = json.loads(line)
+            if "error" in j:
+                raise bindings.APIHttpStreamError(
+                    operation, bindings.runtimeStreamError.from_json(j["error"])
+                )
+            for report in j["result"]["metrics"]:
+                steps = report.get("totalBatches", 0)
+                if (min_steps is not None and steps < min_steps) or (
+                    max_steps is not None and steps > max_steps
+                ):
+                    continue
+                columns.add(report, report["metrics"].get(key) or {})
+
+    out = columns.finish()
+    if parquet_path is not None:
+        _write_parquet(out, parquet_path)
+    return out
+
+
+def _write_parquet(columns: Dict[str, np.ndarray], path: Union[str, os.PathLike]) -> None:
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("writing metrics to Parquet requires pyarrow; run `pip install pyarrow`")
+    pyarrow.parquet.write_table(pyarrow.table(columns), os.fspath(path))
@@ -1,7 +1,7 @@
 """
 A drop-in replacement for requests.request() which supports server name overriding.
 """
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 import requests
 import urllib3
@@ -22,21 +22,37 @@ class HTTPAdapter(requests.adapters.HTTPAdapter):
 
 
 class Session(requests.sessions.Session):
+    """
+    A requests.Session which honors server_hostname.
+
+    pool_maxsize is the number of connections kept alive per host, which should be at least the
+    number of threads sharing the session.
+    """
+
     def __init__(
-        self, server_hostname: Optional[str], max_retries: Optional[urllib3.util.retry.Retry]
+        self,
+        server_hostname: Optional[str],
+        max_retries: Optional[urllib3.util.retry.Retry],
+        pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE,
     ) -> None:
         super().__init__()
-        if max_retries is None:
-            # Override the https adapter.
-            self.mount("https://", HTTPAdapter(server_hostname))
-        else:
-            self.mount("https://", HTTPAdapter(server_hostname, max_retries=max_retries))
-            self.mount("http://", requests.adapters.HTTPAdapter(max_retries=max_retries))
-
-
-def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+        kwargs: Dict[str, Any] = {"pool_maxsize": pool_maxsize}
+        if max_retries is not None:
+            kwargs["max_retries"] = max_retries
+        self.mount("https://", HTTPAdapter(server_hostname, **kwargs))
+        self.mount("http://", requests.adapters.HTTPAdapter(**kwargs))
+
+
+def request(
+    method: str, url: str, session: Optional[requests.Session] = None, **kwargs: Any
+) -> requests.Response:
+    """
+    Send a request through session, or through a new Session which is closed afterwards.
+    """
     server_hostname = kwargs.pop("server_hostname", None)
     max_retries = kwargs.pop("max_retries", None)
+    if session is not None:
+        return session.request(method=method, url=url, **kwargs)
     with Session(server_hostname, max_retries) as session:
         out = session.request(method=method, url=url, **kwargs)  # type: requests.Response
         return out
@@ -10,9 +10,15 @@ from .gcs import GCSStorageManager
 from .hdfs import HDFSStorageManager
 from .s3 import S3StorageManager
 from .shared import SharedFSStorageManager
+from .content_addressed import ContentAddressedStorageManager
+from .cache import CachingStorageManager, CheckpointCache
+from . import cache
 
 __all__ = [
     "AzureStorageManager",
+    "CachingStorageManager",
+    "CheckpointCache",
+    "ContentAddressedStorageManager",
     "GCSStorageManager",
     "StorageManager",
     "S3StorageManager",
@@ -34,6 +40,13 @@ def build(config: Dict[str, Any], container_path: Optional[str]) -> StorageManag
     Return a checkpoint manager defined by the value of the `type` key in
     the configuration dictionary. Throws a `TypeError` if no storage manager
     with `type` is defined.
+
+    If the `content_addressed` key is true, the storage manager is wrapped in a
+    ContentAddressedStorageManager, which deduplicates files across checkpoints.
+
+    If the `cache_path` key or the DET_CHECKPOINT_CACHE_PATH environment variable is set, cloud
+    storage managers are wrapped in a CachingStorageManager, which reads checkpoints through a
+    local cache of at most `cache_max_size` (or DET_CHECKPOINT_CACHE_MAX_SIZE) bytes.
     """
     if "type" not in config:
         raise ValueError("Missing 'type' parameter of storage configuration")
@@ -56,6 +69,11 @@ def build(config: Dict[str, Any], container_path: Optional[str]) -> StorageManag
     config.pop("save_experiment_best", None)
     config.pop("save_trial_best", None)
     config.pop("save_trial_latest", None)
+    content_addressed = config.pop("content_addressed", False)
+    cache_path = config.pop("cache_path", None) or os.environ.get(cache.CACHE_PATH_ENV)
+    cache_max_size = config.pop("cache_max_size", None) or os.environ.get(
+        cache.CACHE_MAX_SIZE_ENV, cache.DEFAULT_CACHE_MAX_SIZE
+    )
 
     # For shared_fs maintain backwards compatibility by folding old keys into
     # storage_path.
@@ -77,12 +95,18 @@ def build(config: Dict[str, Any], container_path: Optional[str]) -> StorageManag
     config.pop("checkpoint_path", None)
 
     try:
-        return subclass.from_config(config, container_path)
+        manager = subclass.from_config(config, container_path)
     except TypeError as e:
         raise TypeError(
             "Failed to instantiate {} checkpoint storage: {}".format(identifier, str(e))
         )
 
+    if content_addressed:
+        manager = ContentAddressedStorageManager(manager)
+    if cache_path and isinstance(manager, CloudStorageManager):
+        manager = CachingStorageManager(manager, CheckpointCache(cache_path, int(cache_max_size)))
+    return manager
+
 
 def validate_manager(manager: StorageManager) -> None:
     """
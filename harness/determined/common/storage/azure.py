@@ -24,8 +24,14 @@ class AzureStorageManager(storage.CloudStorageManager):
         account_url: Optional[str] = None,
         credential: Optional[str] = None,
         temp_dir: Optional[str] = None,
+        streaming_upload: bool = False,
+        streaming_disk_budget: Optional[int] = None,
     ) -> None:
-        super().__init__(temp_dir if temp_dir is not None else tempfile.gettempdir())
+        super().__init__(
+            temp_dir if temp_dir is not None else tempfile.gettempdir(),
+            streaming_upload=streaming_upload,
+            streaming_disk_budget=streaming_disk_budget,
+        )
         from determined.common.storage import azure_client
 
         self.client = azure_client.AzureStorageClient(
@@ -93,6 +93,14 @@ class StorageManager(metaclass=abc.ABCMeta):
         yield path
         self.post_store_path(path, dst)
 
+    def _evicted_resources(self, path: Union[str, os.PathLike]) -> Dict[str, int]:
+        """
+        Return the files of an open store_path() directory which were already uploaded and then
+        deleted locally, mapped to their sizes.  _list_directory() no longer sees these files, but
+        they are still part of the checkpoint.
+        """
+        return {}
+
     @abc.abstractmethod
     def store_path_is_direct_access(self) -> bool:
         """
@@ -0,0 +1,285 @@
+import contextlib
+import logging
+import os
+import pathlib
+import shutil
+import stat
+import tempfile
+import uuid
+from typing import Callable, Dict, Iterator, Optional, Union
+
+from determined.common import storage
+from determined.common.storage import shared
+
+# The checkpoint cache is enabled by setting this to a directory, which may be a host path that is
+# bind-mounted into every container on a node, so that all of them share one cache.
+CACHE_PATH_ENV = "DET_CHECKPOINT_CACHE_PATH"
+# The size limit of the checkpoint cache, in bytes.
+CACHE_MAX_SIZE_ENV = "DET_CHECKPOINT_CACHE_MAX_SIZE"
+DEFAULT_CACHE_MAX_SIZE = 10 * 1024 ** 3
+
+# Containers sharing a cache may run as different users, so everything in the cache is accessible
+# to every user regardless of their umask.  Access to the cache as a whole is controlled by the
+# permissions of the cache directory itself.
+_DIR_MODE = 0o777
+_LOCK_MODE = 0o666
+_FILE_MODE = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+
+def _chmod(path: str, mode: int) -> None:
+    try:
+        os.chmod(path, mode)
+    except PermissionError:
+        # Created by another user, who already made it accessible.
+        pass
+
+
+def _link_out(src: str, dst: str, hardlink: bool) -> None:
+    """
+    Make dst a copy of src, as cheaply as possible.
+
+    Hard links share the read-only inode of the cached file, so they are only used for read-only
+    restores.
+    """
+    if shared.reflink(src, dst):
+        return
+    if hardlink:
+        try:
+            os.link(src, dst)
+            return
+        except OSError:
+            # Probably a different filesystem.
+            pass
+    shutil.copyfile(src, dst)
+
+
+class CheckpointCache:
+    """
+    A node-local, size-bounded LRU cache of downloaded checkpoints.
+
+    Checkpoints never change once they are stored, so each checkpoint is cached as a whole under
+    its storage_id.  The cache may be shared by any number of processes and containers; entries
+    are inserted atomically, and flock(2) locks keep concurrent fills of the same checkpoint from
+    downloading it more than once and keep eviction away from entries which are being read.
+    Cached files are made read-only, so that hard-linked copies can't modify the cache.
+
+    Entries and locks are accessible to every user, so that containers running as different users
+    can share the cache; any user who can reach the cache directory can also evict its entries.
+    """
+
+    def __init__(self, path: str, max_size: int = DEFAULT_CACHE_MAX_SIZE) -> None:
+        self.path = path
+        self.max_size = max_size
+        self._entries = os.path.join(path, "entries")
+        self._tmp = os.path.join(path, "tmp")
+        self._locks = os.path.join(path, "locks")
+        for d in (self._entries, self._tmp, self._locks):
+            os.makedirs(d, exist_ok=True)
+            _chmod(d, _DIR_MODE)
+
+    @contextlib.contextmanager
+    def _lock(self, name: str, shared: bool = False) -> Iterator[None]:
+        import fcntl
+
+        fd = os.open(os.path.join(self._locks, f"{name}.lock"), os.O_RDWR | os.O_CREAT, _LOCK_MODE)
+        try:
+            try:
+                os.fchmod(fd, _LOCK_MODE)
+            except PermissionError:
+                # Created by another user, who already made it accessible.
+                pass
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file releases the lock.
+            os.close(fd)
+
+    def _entry(self, storage_id: str) -> str:
+        return os.path.join(self._entries, storage_id)
+
+    def contains(self, storage_id: str) -> bool:
+        return os.path.isdir(self._entry(storage_id))
+
+    @staticmethod
+    def _size(path: str) -> int:
+        return sum(storage.StorageManager._list_directory(path).values())
+
+    def _remove(self, path: str) -> None:
+        # Move the entry out of the way first, so it disappears atomically.
+        trash = os.path.join(self._tmp, f"trash-{uuid.uuid4()}")
+        os.rename(path, trash)
+        shutil.rmtree(trash, ignore_errors=True)
+
+    def _evict(self, needed: int) -> None:
+        """
+        Remove the least recently used entries until there are needed bytes free.  The caller must
+        hold the exclusive cache lock.
+        """
+        entries = [
+            (os.path.getmtime(path), path, self._size(path))
+            for path in (os.path.join(self._entries, name) for name in os.listdir(self._entries))
+        ]
+        usage = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if usage + needed <= self.max_size:
+                break
+            logging.info(f"Evicting {os.path.basename(path)} from the checkpoint cache")
+            self._remove(path)
+            usage -= size
+
+    def _fill(self, storage_id: str, fill: Callable[[str], None]) -> Optional[str]:
+        """
+        Download a checkpoint into the cache.  Returns the path of the downloaded checkpoint if it
+        did not fit in the cache, in which case the caller must remove it after use.
+        """
+        tmp = tempfile.mkdtemp(dir=self._tmp)
+        try:
+            fill(tmp)
+            size = self._size(tmp)
+            if size > self.max_size:
+                logging.info(
+                    f"Checkpoint {storage_id} ({size} bytes) is larger than the checkpoint cache "
+                    f"({self.max_size} bytes), not caching it"
+                )
+                return tmp
+            # mkdtemp() makes tmp private; other users must be able to read the entry and evict it.
+            for root, _, files in os.walk(tmp):
+                os.chmod(root, _DIR_MODE)
+                for f in files:
+                    os.chmod(os.path.join(root, f), _FILE_MODE)
+            with self._lock("cache"):
+                self._evict(size)
+                os.rename(tmp, self._entry(storage_id))
+            return None
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    @contextlib.contextmanager
+    def checkout(self, storage_id: str, fill: Callable[[str], None]) -> Iterator[str]:
+        """
+        Yield a directory holding the checkpoint, which must not be modified.  On a cache miss,
+        fill(path) is called to download the checkpoint into path first.
+        """
+        entry = self._entry(storage_id)
+        uncached = None
+        with self._lock(f"entry-{storage_id}"):
+            if os.path.isdir(entry):
+                logging.info(f"Found checkpoint {storage_id} in the checkpoint cache")
+            else:
+                uncached = self._fill(storage_id, fill)
+
+        if uncached is not None:
+            try:
+                yield uncached
+            finally:
+                shutil.rmtree(uncached, ignore_errors=True)
+            return
+
+        with self._lock("cache", shared=True):
+            if os.path.isdir(entry):
+                # Mark the entry as recently used.
+                os.utime(entry)
+                yield entry
+                return
+
+        # Another process evicted the entry right after it was filled; just download it again.
+        tmp = tempfile.mkdtemp(dir=self._tmp)
+        try:
+            fill(tmp)
+            yield tmp
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def evict(self, storage_id: str) -> None:
+        with self._lock("cache"):
+            if self.contains(storage_id):
+                self._remove(self._entry(storage_id))
+
+
+class CachingStorageManager(storage.CloudStorageManager):
+    """
+    Read checkpoints from another StorageManager through a node-local CheckpointCache.
+
+    download() and restore_path() copy files out of the cache (by reflink where the filesystem
+    supports it), so warm-starting many trials from one checkpoint only downloads it once per
+    node.  restore_path() may also hard-link files, which are read-only.  Everything else is
+    passed to the wrapped StorageManager.
+    """
+
+    def __init__(self, inner: storage.StorageManager, cache: CheckpointCache) -> None:
+        super().__init__(inner._base_path)
+        self.inner = inner
+        self.cache = cache
+
+    def pre_store_path(self, dst: str) -> pathlib.Path:
+        return self.inner.pre_store_path(dst)
+
+    def post_store_path(self, src: Union[str, os.PathLike], dst: str) -> None:
+        self.inner.post_store_path(src, dst)
+
+    @contextlib.contextmanager
+    def store_path(self, dst: str) -> Iterator[pathlib.Path]:
+        with self.inner.store_path(dst) as path:
+            yield path
+
+    def _evicted_resources(self, path: Union[str, os.PathLike]) -> Dict[str, int]:
+        return self.inner._evicted_resources(path)
+
+    def upload(
+        self, src: Union[str, os.PathLike], dst: str, paths: Optional[storage.Paths] = None
+    ) -> None:
+        self.inner.upload(src, dst, paths)
+
+    def _download(
+        self,
+        src: str,
+        dst: Union[str, os.PathLike],
+        selector: Optional[storage.Selector],
+        hardlink: bool,
+    ) -> None:
+        dst = os.fspath(dst)
+        if selector is not None and not self.cache.contains(src):
+            # Don't download a whole checkpoint just to fill the cache.
+            self.inner.download(src, dst, selector)
+            return
+
+        def fill(path: str) -> None:
+            self.inner.download(src, path)
+
+        with self.cache.checkout(src, fill) as cached:
+            for rel_path in sorted(self._list_directory(cached)):
+                if selector is not None and not selector(rel_path):
+                    continue
+                path = os.path.join(dst, rel_path)
+                if rel_path.endswith("/"):
+                    os.makedirs(path, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                _link_out(os.path.join(cached, rel_path), path, hardlink)
+
+    def download(
+        self,
+        src: str,
+        dst: Union[str, os.PathLike],
+        selector: Optional[storage.Selector] = None,
+    ) -> None:
+        self._download(src, dst, selector, hardlink=False)
+
+    @contextlib.contextmanager
+    def restore_path(
+        self, src: str, selector: Optional[storage.Selector] = None
+    ) -> Iterator[pathlib.Path]:
+        dst = os.path.join(self._base_path, src)
+        os.makedirs(dst, exist_ok=True)
+
+        self._download(src, dst, selector, hardlink=True)
+
+        try:
+            yield pathlib.Path(dst)
+        finally:
+            shutil.rmtree(dst, ignore_errors=True)
+
+    def delete(self, tgt: str) -> None:
+        self.cache.evict(tgt)
+        self.inner.delete(tgt)
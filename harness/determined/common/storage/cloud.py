@@ -1,13 +1,245 @@
 import contextlib
+import logging
 import os
 import pathlib
 import shutil
-from typing import Iterator, Optional, Union
+import threading
+import time
+from typing import Dict, Iterator, Optional, Set, Tuple, Union
 
 from determined.common import storage
 
+# How often a streaming upload looks for newly finished files, in seconds.
+STREAMING_POLL_INTERVAL = 1.0
+# Without a view of open files, a file must be unchanged for this long to be considered finished.
+STREAMING_SETTLE_TIME = 5.0
+
+
+def _open_files() -> Optional[Set[str]]:
+    """
+    Return the paths of files which this process has open, or None if that can't be determined.
+    """
+    fd_dir = "/proc/self/fd"
+    if not os.path.isdir(fd_dir):
+        return None
+    out = set()
+    for fd in os.listdir(fd_dir):
+        try:
+            out.add(os.readlink(os.path.join(fd_dir, fd)))
+        except OSError:
+            # The fd was closed while we were listing.
+            continue
+    return out
+
+
+def _parents(rel_path: str) -> Set[str]:
+    parts = rel_path.split("/")[:-1]
+    return {"/".join(parts[: i + 1]) + "/" for i in range(len(parts))}
+
+
+class _StreamingUpload(threading.Thread):
+    """
+    Upload the files of a store_path() directory while the rest of the checkpoint is still being
+    written.
+
+    A file is uploaded once it is unchanged since the previous scan and is no longer open in this
+    process.  finish() uploads everything else, including files that changed after they were
+    streamed.  When a disk budget is set and the directory grows beyond it, files which have
+    already been uploaded are deleted locally, oldest first.
+    """
+
+    def __init__(
+        self,
+        manager: storage.StorageManager,
+        src: Union[str, os.PathLike],
+        dst: str,
+        disk_budget: Optional[int],
+    ) -> None:
+        self._manager = manager
+        self._src = os.path.realpath(src)
+        self._dst = dst
+        self._disk_budget = disk_budget
+        self._stop_event = threading.Event()
+        # Guards _uploaded and _evicted, which evicted_resources() reads from another thread.
+        self._lock = threading.Lock()
+
+        # The (size, mtime) of each file as of the previous scan.
+        self._last_seen: Dict[str, Tuple[int, int]] = {}
+        # The (size, mtime) of each file when it was uploaded.
+        self._uploaded: Dict[str, Tuple[int, int]] = {}
+        self._uploaded_dirs: Set[str] = set()
+        # Files deleted locally after they were uploaded, to stay within the disk budget.
+        self._evicted: Set[str] = set()
+
+        super().__init__(name="det-streaming-upload", daemon=True)
+
+    def run(self) -> None:
+        while not self._stop_event.wait(STREAMING_POLL_INTERVAL):
+            try:
+                self._scan()
+            except Exception as e:
+                # Whatever was not streamed is uploaded by finish().
+                logging.warning(f"Streaming upload to {self._dst} stopped early: {e}")
+                return
+
+    def _stat_files(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for root, _, names in os.walk(self._src):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files[os.path.relpath(path, self._src)] = (st.st_size, st.st_mtime_ns)
+        return files
+
+    def _upload(self, ready: Set[str], files: Dict[str, Tuple[int, int]]) -> None:
+        paths = set(ready)
+        for rel_path in ready:
+            paths.update(_parents(rel_path))
+        paths -= self._uploaded_dirs
+        self._manager.upload(self._src, self._dst, paths=paths)
+        self._uploaded_dirs.update(p for p in paths if p.endswith("/"))
+        with self._lock:
+            for rel_path in ready:
+                self._uploaded[rel_path] = files[rel_path]
+                self._evicted.discard(rel_path)
+
+    def _scan(self) -> None:
+        files = self._stat_files()
+        open_files = _open_files()
+        settled_before = time.time_ns() - int(STREAMING_SETTLE_TIME * 1e9)
+
+        ready = set()
+        for rel_path, st in files.items():
+            if self._uploaded.get(rel_path) == st or self._last_seen.get(rel_path) != st:
+                # Already uploaded, or still being written.
+                continue
+            if open_files is not None:
+                if os.path.join(self._src, rel_path) in open_files:
+                    continue
+            elif st[1] > settled_before:
+                continue
+            ready.add(rel_path)
+        self._last_seen = files
+
+        if ready:
+            self._upload(ready, files)
+
+        if self._disk_budget is not None:
+            self._evict(files)
+
+    def _evict(self, files: Dict[str, Tuple[int, int]]) -> None:
+        budget = self._disk_budget
+        assert budget is not None
+        usage = sum(size for size, _ in files.values())
+        if usage <= budget:
+            return
+        with self._lock:
+            for rel_path, st in sorted(self._uploaded.items(), key=lambda item: item[1][1]):
+                if usage <= budget:
+                    break
+                if files.get(rel_path) != st:
+                    # Already evicted, or changed since it was uploaded.
+                    continue
+                os.remove(os.path.join(self._src, rel_path))
+                self._evicted.add(rel_path)
+                usage -= st[0]
+        if usage > budget:
+            logging.debug(f"Checkpoint {self._dst} uses {usage} bytes locally, over budget")
+
+    def evicted_resources(self) -> Dict[str, int]:
+        """
+        Return the size of each file which was uploaded and then deleted locally.
+        """
+        with self._lock:
+            return {rel_path: self._uploaded[rel_path][0] for rel_path in self._evicted}
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    def finish(self) -> None:
+        """
+        Stop streaming, then upload whatever was not uploaded yet or changed since.
+        """
+        self.stop()
+        files = self._stat_files()
+        remaining = {p for p, st in files.items() if self._uploaded.get(p) != st}
+        for rel_path in self._manager._list_directory(self._src):
+            if rel_path.endswith("/") and rel_path not in self._uploaded_dirs:
+                remaining.add(rel_path)
+        streamed = len(set(self._uploaded) - remaining)
+        logging.info(
+            f"Streamed {streamed} files of checkpoint {self._dst} while it was written, "
+            f"{len(self._evicted)} of which were removed locally to stay within the disk budget"
+        )
+        if remaining:
+            self._manager.upload(self._src, self._dst, paths=remaining)
+
 
 class CloudStorageManager(storage.StorageManager):
+    """
+    Base class for storage managers whose checkpoints are uploaded from a local directory.
+
+    With `streaming_upload`, store_path() uploads each file as soon as it is finished, so that
+    writing and uploading overlap.  `streaming_disk_budget` (in bytes) additionally limits how
+    much of the checkpoint is kept on local disk: files which are already uploaded are deleted
+    locally once the directory grows beyond the budget.  Streaming is only suitable for
+    checkpoints whose files are written once and not read back inside store_path().
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        streaming_upload: bool = False,
+        streaming_disk_budget: Optional[int] = None,
+    ) -> None:
+        super().__init__(base_path)
+        if streaming_disk_budget is not None and not streaming_upload:
+            raise ValueError("streaming_disk_budget requires streaming_upload")
+        self._streaming_upload = streaming_upload
+        self._streaming_disk_budget = streaming_disk_budget
+        # The streaming uploads of the store_path() directories which are currently open.
+        self._streams: Dict[str, _StreamingUpload] = {}
+
+    @contextlib.contextmanager
+    def store_path(self, dst: str) -> Iterator[pathlib.Path]:
+        if not self._streaming_upload:
+            with super().store_path(dst) as path:
+                yield path
+            return
+
+        path = self.pre_store_path(dst)
+        streaming = _StreamingUpload(self, path, dst, self._streaming_disk_budget)
+        streaming.start()
+        self._streams[os.fspath(path)] = streaming
+        try:
+            try:
+                yield path
+            finally:
+                streaming.stop()
+                del self._streams[os.fspath(path)]
+            streaming.finish()
+        except BaseException:
+            # No checkpoint is reported for a failed store_path(), so nothing else would ever delete
+            # the files which were streamed already.
+            logging.info(f"Deleting the partial upload of checkpoint {dst}")
+            try:
+                self.delete(dst)
+            except Exception as e:
+                logging.warning(f"Failed to delete the partial upload of checkpoint {dst}: {e}")
+            raise
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _evicted_resources(self, path: Union[str, os.PathLike]) -> Dict[str, int]:
+        streaming = self._streams.get(os.fspath(path))
+        if streaming is None:
+            return {}
+        return streaming.evicted_resources()
+
     @contextlib.contextmanager
     def restore_path(
         self, src: str, selector: Optional[storage.Selector] = None
@@ -0,0 +1,315 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Set, Union
+
+from determined import errors
+from determined.common import storage
+from determined.common.storage import transfer
+
+# Everything shared between checkpoints lives under this directory of the underlying storage:
+#
+#   .det-cas/blobs/<sha256>/blob              file contents, stored once
+#   .det-cas/manifests/<storage_id>/<id>.json  a copy of every manifest, used to count references
+#
+# A content-addressed checkpoint itself only holds one manifest per uploader (sharded uploads have
+# several uploaders for the same storage_id):
+#
+#   <storage_id>/.det-manifest-<id>.json
+CAS_DIR = ".det-cas"
+BLOBS_DIR = f"{CAS_DIR}/blobs"
+MANIFESTS_DIR = f"{CAS_DIR}/manifests"
+MANIFEST_PREFIX = ".det-manifest-"
+
+MANIFEST_VERSION = 1
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _is_manifest(path: str) -> bool:
+    return "/" not in path and path.startswith(MANIFEST_PREFIX) and path.endswith(".json")
+
+
+def is_content_addressed(ckpt_dir: Union[str, os.PathLike]) -> bool:
+    """
+    Return True if a checkpoint directory, as stored or as downloaded without the
+    content-addressed layer, only holds the manifests of a content-addressed checkpoint.
+    """
+    return any(_is_manifest(name) for name in os.listdir(ckpt_dir))
+
+
+class ContentAddressedStorageManager(storage.CloudStorageManager):
+    """
+    Store checkpoints in another StorageManager by the content of their files.
+
+    Every file is stored once, as a blob named by its sha256 digest, and each checkpoint is only a
+    manifest mapping paths to digests.  Files which are unchanged since an earlier checkpoint, like
+    frozen weights or tokenizer files, are referenced instead of uploaded again.  Deleting a
+    checkpoint only deletes the blobs which no other checkpoint references.
+
+    Checkpoints which were not written in this mode are still read and deleted normally, so this
+    mode can be turned on for existing checkpoint storage.
+
+    Blobs are shared between checkpoints without any locking, so a blob may be lost if a checkpoint
+    referencing it is deleted at the same moment that a new checkpoint reusing it is uploaded.
+    """
+
+    def __init__(
+        self,
+        inner: storage.StorageManager,
+        temp_dir: Optional[str] = None,
+        max_concurrency: int = transfer.DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        if isinstance(
+            inner,
+            (
+                ContentAddressedStorageManager,
+                storage.CachingStorageManager,
+                storage.HDFSStorageManager,
+            ),
+        ):
+            raise ValueError(
+                f"content-addressed storage is not supported on top of {type(inner).__name__}"
+            )
+        if temp_dir is None:
+            # Cloud storage managers already have a place for temporary files.
+            if isinstance(inner, storage.CloudStorageManager):
+                temp_dir = inner._base_path
+            else:
+                temp_dir = tempfile.gettempdir()
+        super().__init__(temp_dir)
+        self.inner = inner
+        self.max_concurrency = max_concurrency
+
+    def _tempdir(self) -> str:
+        os.makedirs(self._base_path, exist_ok=True)
+        return tempfile.mkdtemp(prefix=".det-cas-", dir=self._base_path)
+
+    def _list(self, src: str) -> Set[str]:
+        """
+        List the paths under src, without downloading anything.
+        """
+        found: Set[str] = set()
+
+        def selector(path: str) -> bool:
+            found.add(path)
+            return False
+
+        tmp = self._tempdir()
+        try:
+            self.inner.download(src, tmp, selector=selector)
+        except errors.CheckpointNotFound:
+            pass
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return found
+
+    def _read_manifests(self, src: str, selector: storage.Selector) -> Optional[List[Dict]]:
+        """
+        Download and parse the manifests under src which are accepted by the selector.
+
+        Returns None if src exists but contains no manifests.
+        """
+        tmp = self._tempdir()
+        try:
+            self.inner.download(src, tmp, selector=selector)
+            manifests = []
+            for root, _, files in os.walk(tmp):
+                for f in files:
+                    with open(os.path.join(root, f)) as fp:
+                        manifests.append(json.load(fp))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return manifests or None
+
+    def _read_checkpoint_manifests(self, storage_id: str) -> Optional[List[Dict]]:
+        return self._read_manifests(storage_id, _is_manifest)
+
+    def _read_all_manifests(self) -> List[Dict]:
+        try:
+            return self._read_manifests(MANIFESTS_DIR, lambda path: True) or []
+        except errors.CheckpointNotFound:
+            return []
+
+    def _build_manifest(self, src: str, paths: storage.Paths) -> Dict[str, Any]:
+        files = sorted(p for p in paths if not p.endswith("/"))
+        digests: Dict[str, str] = {}
+
+        def _hash(rel_path: str) -> None:
+            digests[rel_path] = _sha256(os.path.join(src, rel_path))
+
+        stats = transfer.run(
+            _hash,
+            files,
+            size_of=lambda rel_path: os.path.getsize(os.path.join(src, rel_path)),
+            max_concurrency=self.max_concurrency,
+            max_attempts=1,
+            desc=f"Hashing of {src}",
+        )
+        logging.debug(f"Hashed {src}: {stats}")
+
+        return {
+            "version": MANIFEST_VERSION,
+            "dirs": sorted(p for p in paths if p.endswith("/")),
+            "files": {
+                p: {"digest": digests[p], "size": os.path.getsize(os.path.join(src, p))}
+                for p in files
+            },
+        }
+
+    def upload(
+        self, src: Union[str, os.PathLike], dst: str, paths: Optional[storage.Paths] = None
+    ) -> None:
+        src = os.fspath(src)
+        upload_paths = paths if paths is not None else set(self._list_directory(src))
+        manifest = self._build_manifest(src, upload_paths)
+        manifest_name = f"{uuid.uuid4()}.json"
+
+        tmp = self._tempdir()
+        try:
+            manifest_path = os.path.join(tmp, manifest_name)
+            with open(manifest_path, "w") as f:
+                json.dump(manifest, f)
+
+            # Record the references before checking which blobs exist, so that a concurrent
+            # delete of another checkpoint does not delete any blob that this one reuses.
+            self.inner.upload(tmp, f"{MANIFESTS_DIR}/{dst}", paths={manifest_name})
+
+            existing = {p.split("/")[0] for p in self._list(BLOBS_DIR)}
+            missing: Dict[str, str] = {}
+            for rel_path, entry in manifest["files"].items():
+                if entry["digest"] not in existing:
+                    missing.setdefault(entry["digest"], rel_path)
+
+            blobs_dir = os.path.join(tmp, "blobs")
+            for digest, rel_path in missing.items():
+                os.makedirs(os.path.join(blobs_dir, digest))
+                os.symlink(
+                    os.path.abspath(os.path.join(src, rel_path)),
+                    os.path.join(blobs_dir, digest, "blob"),
+                )
+            if missing:
+                self.inner.upload(blobs_dir, BLOBS_DIR, paths={f"{d}/blob" for d in missing})
+
+            # The checkpoint manifest is uploaded last, once every blob it references exists.
+            os.rename(manifest_path, os.path.join(tmp, MANIFEST_PREFIX + manifest_name))
+            self.inner.upload(tmp, dst, paths={MANIFEST_PREFIX + manifest_name})
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        nbytes = sum(e["size"] for e in manifest["files"].values())
+        new_bytes = sum(manifest["files"][p]["size"] for p in missing.values())
+        logging.info(
+            f"Stored {dst} by content: {len(missing)} of {len(manifest['files'])} files "
+            f"({new_bytes} of {nbytes} bytes) were not stored yet"
+        )
+
+    def download(
+        self,
+        src: str,
+        dst: Union[str, os.PathLike],
+        selector: Optional[storage.Selector] = None,
+    ) -> None:
+        dst = os.fspath(dst)
+        manifests = self._read_checkpoint_manifests(src)
+        if manifests is None:
+            # Not a content-addressed checkpoint.
+            self.inner.download(src, dst, selector=selector)
+            return
+
+        dirs: Set[str] = set()
+        files: Dict[str, str] = {}
+        for manifest in manifests:
+            dirs.update(manifest["dirs"])
+            files.update({p: e["digest"] for p, e in manifest["files"].items()})
+        if selector is not None:
+            dirs = {d for d in dirs if selector(d)}
+            files = {p: d for p, d in files.items() if selector(p)}
+
+        for d in sorted(dirs):
+            os.makedirs(os.path.join(dst, d), exist_ok=True)
+        if not files:
+            return
+
+        needed = set(files.values())
+        tmp = self._tempdir()
+        try:
+            self.inner.download(BLOBS_DIR, tmp, selector=lambda path: path.split("/")[0] in needed)
+            by_digest: Dict[str, List[str]] = {}
+            for rel_path, digest in sorted(files.items()):
+                by_digest.setdefault(digest, []).append(rel_path)
+            for digest, rel_paths in by_digest.items():
+                blob = os.path.join(tmp, digest, "blob")
+                if not os.path.exists(blob):
+                    raise errors.CheckpointNotFound(
+                        f"Checkpoint {src} references missing content {digest}"
+                    )
+                # Copy the blob for all but the last path using it, then move it into place.
+                for rel_path in rel_paths:
+                    os.makedirs(os.path.dirname(os.path.join(dst, rel_path)), exist_ok=True)
+                for rel_path in rel_paths[:-1]:
+                    shutil.copyfile(blob, os.path.join(dst, rel_path))
+                shutil.move(blob, os.path.join(dst, rel_paths[-1]))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def delete(self, tgt: str) -> None:
+        self._delete_unreferenced(self._delete_checkpoint(tgt))
+
+    def delete_many(self, tgts: Sequence[str]) -> None:
+        """
+        Delete several checkpoints, like delete(), but only read the manifests of the remaining
+        checkpoints once to find the content which is no longer referenced.  Checkpoints which are
+        not found are skipped with a warning.
+        """
+        digests: Set[str] = set()
+        for tgt in tgts:
+            try:
+                digests.update(self._delete_checkpoint(tgt))
+            except errors.CheckpointNotFound as e:
+                logging.warning(e)
+        self._delete_unreferenced(digests)
+
+    def _delete_checkpoint(self, tgt: str) -> Set[str]:
+        """
+        Delete a checkpoint, but not its content, and return the digests it referenced.
+        """
+        try:
+            manifests = self._read_checkpoint_manifests(tgt)
+        except errors.CheckpointNotFound:
+            manifests = None
+        if manifests is None:
+            # Not a content-addressed checkpoint (or already deleted).
+            self.inner.delete(tgt)
+            return set()
+
+        self.inner.delete(tgt)
+        self.inner.delete(f"{MANIFESTS_DIR}/{tgt}")
+        return {e["digest"] for m in manifests for e in m["files"].values()}
+
+    def _delete_unreferenced(self, digests: Set[str]) -> None:
+        """
+        Delete the blobs among digests which no remaining checkpoint references.
+        """
+        if not digests:
+            return
+        referenced = set()
+        for manifest in self._read_all_manifests():
+            referenced.update(e["digest"] for e in manifest["files"].values())
+
+        unreferenced = digests - referenced
+        logging.info(f"Deleting {len(unreferenced)} blobs which are no longer referenced")
+        for digest in sorted(unreferenced):
+            self.inner.delete(f"{BLOBS_DIR}/{digest}")
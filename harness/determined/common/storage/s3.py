@@ -2,12 +2,13 @@ import logging
 import os
 import re
 import tempfile
-from typing import Optional, Union
+from typing import Any, Dict, Optional, Tuple, Union
 
 import requests
 
 from determined import errors
 from determined.common import storage, util
+from determined.common.storage import transfer
 
 
 def normalize_prefix(prefix: Optional[str]) -> str:
@@ -20,9 +21,48 @@ def normalize_prefix(prefix: Optional[str]) -> str:
     return new_prefix
 
 
+def _is_retryable(e: Exception) -> bool:
+    """
+    Decide if a failed transfer of a single file is worth retrying.
+    """
+    import boto3
+    import botocore
+
+    if isinstance(e, botocore.exceptions.ClientError):
+        code = e.response.get("Error", {}).get("Code", "")
+        return code in (
+            "InternalError",
+            "RequestTimeout",
+            "ServiceUnavailable",
+            "SlowDown",
+            "500",
+            "503",
+        )
+    if isinstance(e, boto3.exceptions.S3UploadFailedError):
+        # boto3 raises S3UploadFailedError while handling the ClientError of the failed request, so
+        # judge by that error instead; e.g. AccessDenied or NoSuchBucket never succeed on retry.
+        cause = e.__cause__ or e.__context__
+        if isinstance(cause, botocore.exceptions.ClientError):
+            return _is_retryable(cause)
+        return True
+    if isinstance(
+        e, (botocore.exceptions.NoCredentialsError, botocore.exceptions.PartialCredentialsError)
+    ):
+        return False
+    return isinstance(e, (botocore.exceptions.BotoCoreError, ConnectionError))
+
+
 class S3StorageManager(storage.CloudStorageManager):
     """
     Store and load checkpoints from S3.
+
+    Files are transferred by a pool of up to `max_concurrency` threads, so that checkpoints made of
+    many files are bound by bandwidth rather than by per-object latency.  Each file is retried up
+    to `max_attempts` times on transient errors.
+
+    The transfer threads share one boto3 client, since boto3 clients are thread-safe but resources
+    are not.  The multipart threads of boto3 itself are bounded so that all files in flight use at
+    most `max_concurrency` connections together.
     """
 
     def __init__(
@@ -33,8 +73,16 @@ class S3StorageManager(storage.CloudStorageManager):
         endpoint_url: Optional[str] = None,
         prefix: Optional[str] = None,
         temp_dir: Optional[str] = None,
+        max_concurrency: int = transfer.DEFAULT_MAX_CONCURRENCY,
+        max_attempts: int = transfer.DEFAULT_MAX_ATTEMPTS,
+        streaming_upload: bool = False,
+        streaming_disk_budget: Optional[int] = None,
     ) -> None:
-        super().__init__(temp_dir if temp_dir is not None else tempfile.gettempdir())
+        super().__init__(
+            temp_dir if temp_dir is not None else tempfile.gettempdir(),
+            streaming_upload=streaming_upload,
+            streaming_disk_budget=streaming_disk_budget,
+        )
         import boto3
 
         from determined.common.storage import boto3_credential_manager
@@ -48,8 +96,16 @@ class S3StorageManager(storage.CloudStorageManager):
             aws_secret_access_key=secret_key,
         )
         self.bucket = self.s3.Bucket(self.bucket_name)
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+        )
 
         self.prefix = normalize_prefix(prefix)
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
 
         # Detect if we are talking to minio, because boto3 has a client-side bug parsing the output
         # of the minio server.
@@ -70,6 +126,15 @@ class S3StorageManager(storage.CloudStorageManager):
     def get_storage_prefix(self, storage_id: str) -> str:
         return os.path.join(self.prefix, storage_id)
 
+    def _transfer_config(self, n_files: int) -> Any:
+        """
+        Split max_concurrency between the files transferred in parallel and the parts of each file.
+        """
+        from boto3.s3.transfer import TransferConfig
+
+        workers = max(1, min(self.max_concurrency, n_files))
+        return TransferConfig(max_concurrency=max(1, self.max_concurrency // workers))
+
     @util.preserve_random_state
     def upload(
         self, src: Union[str, os.PathLike], dst: str, paths: Optional[storage.Paths] = None
@@ -78,7 +143,9 @@ class S3StorageManager(storage.CloudStorageManager):
         prefix = self.get_storage_prefix(dst)
         logging.info(f"Uploading to s3: prefix={prefix}")
         upload_paths = paths if paths is not None else self._list_directory(src)
-        for rel_path in sorted(upload_paths):
+        config = self._transfer_config(len(upload_paths))
+
+        def _upload(rel_path: str) -> None:
             key_name = f"{prefix}/{rel_path}"
             logging.debug(f"Uploading {rel_path} to s3://{self.bucket_name}/{key_name}")
 
@@ -86,7 +153,7 @@ class S3StorageManager(storage.CloudStorageManager):
                 # Create empty S3 keys for each subdirectory to mimic what the S3 console does to
                 # represent empty directories.
                 if not self._use_minio_workaround:
-                    self.bucket.put_object(Key=key_name, Body=b"")
+                    self.client.put_object(Bucket=self.bucket_name, Key=key_name, Body=b"")
                 else:
                     # boto3 will puke on the following MinIO response if you ever create a
                     # directory by uploading an empty blob.  Uploading a normal file in the
@@ -96,7 +163,21 @@ class S3StorageManager(storage.CloudStorageManager):
                     pass
             else:
                 abs_path = os.path.join(src, rel_path)
-                self.bucket.upload_file(abs_path, key_name)
+                self.client.upload_file(abs_path, self.bucket_name, key_name, Config=config)
+
+        def _size(rel_path: str) -> int:
+            return 0 if rel_path.endswith("/") else os.path.getsize(os.path.join(src, rel_path))
+
+        stats = transfer.run(
+            _upload,
+            sorted(upload_paths),
+            size_of=_size,
+            max_concurrency=self.max_concurrency,
+            max_attempts=self.max_attempts,
+            should_retry=_is_retryable,
+            desc=f"Upload to s3: prefix={prefix}",
+        )
+        logging.info(f"Uploaded to s3: prefix={prefix}: {stats}")
 
     @util.preserve_random_state
     def download(
@@ -111,6 +192,13 @@ class S3StorageManager(storage.CloudStorageManager):
         prefix = self.get_storage_prefix(src)
         logging.info(f"Downloading {prefix} from S3")
         found = False
+        # Map of object key to (local destination, object size).
+        downloads: Dict[str, Tuple[str, int]] = {}
+
+        def _download(key: str) -> None:
+            _dst, _ = downloads[key]
+            logging.debug(f"Downloading s3://{self.bucket_name}/{key} to {_dst}")
+            self.client.download_file(self.bucket_name, key, _dst, Config=config)
 
         try:
             for obj in self.bucket.objects.filter(Prefix=prefix):
@@ -125,15 +213,26 @@ class S3StorageManager(storage.CloudStorageManager):
                 dst_dir = os.path.dirname(_dst)
                 os.makedirs(dst_dir, exist_ok=True)
 
-                logging.debug(f"Downloading s3://{self.bucket_name}/{obj.key} to {_dst}")
-
                 # Only create empty directory for keys that end with "/".
                 # See `upload` method for more context.
                 if obj.key.endswith("/"):
                     os.makedirs(_dst, exist_ok=True)
                     continue
 
-                self.bucket.download_file(obj.key, _dst)
+                downloads[obj.key] = (_dst, obj.size)
+
+            config = self._transfer_config(len(downloads))
+            stats = transfer.run(
+                _download,
+                sorted(downloads),
+                size_of=lambda key: downloads[key][1],
+                max_concurrency=self.max_concurrency,
+                max_attempts=self.max_attempts,
+                should_retry=_is_retryable,
+                desc=f"Download of {prefix} from S3",
+            )
+            if downloads:
+                logging.info(f"Downloaded {prefix} from S3: {stats}")
 
         except botocore.exceptions.ClientError as e:
             if e.response["Error"]["Code"] == "AccessDenied":
@@ -1,12 +1,160 @@
 import contextlib
+import errno
 import logging
 import os
 import pathlib
 import shutil
-from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+import sys
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from determined import errors
 from determined.common import check, storage
+from determined.common.storage import transfer
+
+# Files larger than this are copied in chunks of this size by separate threads.
+COPY_CHUNK_SIZE = 64 * 1024 * 1024
+
+# ioctl(2) request for cloning a file on copy-on-write filesystems (btrfs, xfs, ...) on Linux.
+_FICLONE = 0x40049409
+
+
+def reflink(src: str, dst: str) -> bool:
+    """
+    Try to make dst a copy-on-write clone of src.  Returns False if the filesystem can't.
+    """
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(dst)
+        return False
+
+
+def _copy_range(src: str, dst: str, offset: int, length: int) -> None:
+    """
+    Copy length bytes at offset from src to the same offset in the existing file dst.
+
+    copy_file_range(2) lets the kernel (or an NFS 4.2 server) copy without passing the data through
+    userspace; sendfile(2) and a plain read/write loop are the fallbacks.
+    """
+    with open(src, "rb") as fsrc, open(dst, "r+b") as fdst:
+        if hasattr(os, "copy_file_range"):
+            try:
+                while length > 0:
+                    n = os.copy_file_range(  # type: ignore
+                        fsrc.fileno(), fdst.fileno(), length, offset, offset
+                    )
+                    if n == 0:
+                        break
+                    offset += n
+                    length -= n
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+        if hasattr(os, "sendfile"):
+            try:
+                fdst.seek(offset)
+                while length > 0:
+                    n = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, length)
+                    if n == 0:
+                        break
+                    offset += n
+                    length -= n
+                return
+            except OSError as e:
+                if e.errno not in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK):
+                    raise
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        while length > 0:
+            buf = fsrc.read(min(length, 1024 * 1024))
+            if not buf:
+                break
+            fdst.write(buf)
+            length -= len(buf)
+
+
+def _copy_file(src: str, dst: str, size: int, use_reflink: bool) -> None:
+    if not (use_reflink and reflink(src, dst)):
+        with open(dst, "wb"):
+            pass
+        _copy_range(src, dst, 0, size)
+    shutil.copystat(src, dst)
+
+
+def _copy_files(files: List[Tuple[str, str]], max_concurrency: int, hardlink: bool) -> None:
+    """
+    Copy files with a pool of threads, preferring reflinks (and hard links, if allowed) to copies.
+    """
+    # Items are (src, dst, offset, length); an offset of None means the whole file.
+    items: List[Tuple[str, str, Optional[int], int]] = []
+    chunked = []
+    # Whether the destination supports reflinks is probed once, with the first file.  Every failed
+    # attempt costs several metadata round trips on filesystems like NFS or Lustre.
+    use_reflink: Optional[bool] = None
+    for src, dst in files:
+        if hardlink:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(dst)
+            try:
+                os.link(src, dst)
+                continue
+            except OSError:
+                # Probably a different filesystem.
+                pass
+        size = os.path.getsize(src)
+        if use_reflink is None:
+            use_reflink = reflink(src, dst)
+            if use_reflink:
+                shutil.copystat(src, dst)
+                continue
+        if size <= COPY_CHUNK_SIZE or max_concurrency <= 1:
+            items.append((src, dst, None, size))
+        elif use_reflink and reflink(src, dst):
+            shutil.copystat(src, dst)
+        else:
+            # Large files are copied in chunks, so one file can use many threads.
+            with open(dst, "wb") as f:
+                f.truncate(size)
+            chunked.append((src, dst))
+            for offset in range(0, size, COPY_CHUNK_SIZE):
+                items.append((src, dst, offset, min(COPY_CHUNK_SIZE, size - offset)))
+
+    def _copy(item: Tuple[str, str, Optional[int], int]) -> None:
+        src, dst, offset, length = item
+        if offset is None:
+            _copy_file(src, dst, length, bool(use_reflink))
+        else:
+            _copy_range(src, dst, offset, length)
+
+    transfer.run(
+        _copy,
+        items,
+        size_of=lambda item: item[3],
+        max_concurrency=max_concurrency,
+        max_attempts=1,
+        desc="Copy",
+    )
+    for src, dst in chunked:
+        shutil.copystat(src, dst)
+
+
+class _PendingCopies:
+    """
+    Files and directory stats which are copied after the traversal of a tree has finished.
+    """
+
+    def __init__(self) -> None:
+        self.files: List[Tuple[str, str]] = []
+        self.dirs: List[Tuple[str, str]] = []
+
 
 # Based on shutil.copytree and shutil._copytree (for Python 3.8). Compared to the original
 # implementation this code delays creating new directories during traversal, such that dir
@@ -17,6 +165,9 @@ from determined.common import check, storage
 # copy_function=shutil.copy2,
 # ignore_dangling_symlinks=False,
 # dirs_exist_ok = True.
+#
+# When pending is not None, files and directory stats are not copied during the traversal but are
+# recorded in pending, so that the caller can copy them in parallel.
 
 
 def _copytree(
@@ -25,6 +176,7 @@ def _copytree(
     dst: str,
     selector: Optional[Callable[[str], bool]],
     src_root: str,
+    pending: Optional[_PendingCopies] = None,
 ) -> str:
     errors = []
     have_copied = False
@@ -41,11 +193,15 @@ def _copytree(
                 if selector is None or selector(src_relpath + "/"):
                     os.makedirs(dstname, exist_ok=True)
                     have_copied = True
-                copytree(
+                with os.scandir(srcobj) as itr:
+                    sub_entries = list(itr)
+                _copytree(
+                    sub_entries,
                     srcobj,
                     dstname,
                     selector,
                     src_root,
+                    pending,
                 )
             else:
                 # If selector is None all files are copied; if selector is not None
@@ -55,7 +211,10 @@ def _copytree(
                 if selector is None or selector(src_relpath):
                     have_copied = True
                     os.makedirs(dst, exist_ok=True)
-                    shutil.copy2(srcobj, dstname)
+                    if pending is None:
+                        shutil.copy2(srcobj, dstname)
+                    else:
+                        pending.files.append((srcname, dstname))
         # catch the Error from the recursive copytree so that we can
         # continue with other files
         except shutil.Error as err:
@@ -63,12 +222,15 @@ def _copytree(
         except OSError as why:
             errors.append((srcname, dstname, str(why)))
     if have_copied:
-        try:
-            shutil.copystat(src, dst)
-        except OSError as why:
-            # Copying file access times may fail on Windows
-            if getattr(why, "winerror", None) is None:
-                errors.append((src, dst, str(why)))
+        if pending is not None:
+            pending.dirs.append((src, dst))
+        else:
+            try:
+                shutil.copystat(src, dst)
+            except OSError as why:
+                # Copying file access times may fail on Windows
+                if getattr(why, "winerror", None) is None:
+                    errors.append((src, dst, str(why)))
     if errors:
         raise shutil.Error(errors)
     return dst
@@ -79,18 +241,48 @@ def copytree(
     dst: str,
     selector: Optional[Callable[[str], bool]] = None,
     src_root: Optional[str] = None,
+    max_concurrency: int = 1,
+    hardlink: bool = False,
 ) -> str:
+    """
+    Copy a directory tree like shutil.copytree, but only the paths accepted by selector.
+
+    With max_concurrency > 1, files are copied by a pool of threads after the tree has been
+    traversed, large files are split into chunks, and reflinks are used where the filesystem
+    supports them.  With hardlink=True, files are hard-linked instead of copied when possible, so
+    src and dst share their contents.
+    """
     if src_root is None:
         src_root = src
     with os.scandir(src) as itr:
         entries = list(itr)
-    return _copytree(
+    if max_concurrency <= 1 and not hardlink:
+        return _copytree(
+            entries=entries,
+            src=src,
+            dst=dst,
+            selector=selector,
+            src_root=src_root,
+        )
+
+    pending = _PendingCopies()
+    _copytree(
         entries=entries,
         src=src,
         dst=dst,
         selector=selector,
         src_root=src_root,
+        pending=pending,
     )
+    _copy_files(pending.files, max_concurrency, hardlink)
+    for src_dir, dst_dir in pending.dirs:
+        try:
+            shutil.copystat(src_dir, dst_dir)
+        except OSError as why:
+            # Copying file access times may fail on Windows
+            if getattr(why, "winerror", None) is None:
+                raise
+    return dst
 
 
 def _full_storage_path(
@@ -121,13 +313,36 @@ class SharedFSStorageManager(storage.StorageManager):
     Store and load storages from a shared file system. Each agent should
     have this shared file system mounted in the same location defined by the
     `host_path`.
+
+    Uploads and downloads copy files with a pool of up to `max_concurrency` threads, since a single
+    stream gets a fraction of the bandwidth of parallel filesystems, and use reflinks where the
+    filesystem supports them.  With `hardlink`, files are hard-linked instead of copied where
+    possible; then a checkpoint and its uploaded or downloaded copies share the same data, so they
+    must not be modified in place.
     """
 
+    def __init__(
+        self,
+        base_path: str,
+        max_concurrency: int = transfer.DEFAULT_MAX_CONCURRENCY,
+        hardlink: bool = False,
+    ) -> None:
+        super().__init__(base_path)
+        self.max_concurrency = max_concurrency
+        self.hardlink = hardlink
+
     @classmethod
     def from_config(
         cls, config: Dict[str, Any], container_path: Optional[str]
     ) -> "SharedFSStorageManager":
-        allowed_keys = {"host_path", "storage_path", "container_path", "propagation"}
+        allowed_keys = {
+            "host_path",
+            "storage_path",
+            "container_path",
+            "propagation",
+            "max_concurrency",
+            "hardlink",
+        }
         for key in config.keys():
             check.is_in(key, allowed_keys, "extra key in shared_fs config")
         check.is_in("host_path", config, "shared_fs config is missing host_path")
@@ -135,7 +350,11 @@ class SharedFSStorageManager(storage.StorageManager):
         base_path = _full_storage_path(
             config["host_path"], config.get("storage_path"), container_path
         )
-        return cls(base_path)
+        return cls(
+            base_path,
+            max_concurrency=config.get("max_concurrency", transfer.DEFAULT_MAX_CONCURRENCY),
+            hardlink=config.get("hardlink", False),
+        )
 
     def post_store_path(self, src: Union[str, os.PathLike], dst: str) -> None:
         """
@@ -196,7 +415,13 @@ class SharedFSStorageManager(storage.StorageManager):
                 return x in paths
 
         dst = os.path.join(self._base_path, dst)
-        copytree(src, dst, selector=selector)
+        copytree(
+            src,
+            dst,
+            selector=selector,
+            max_concurrency=self.max_concurrency,
+            hardlink=self.hardlink,
+        )
 
     def download(
         self,
@@ -208,7 +433,13 @@ class SharedFSStorageManager(storage.StorageManager):
 
         try:
             src = os.path.join(self._base_path, src)
-            copytree(src, dst, selector=selector)
+            copytree(
+                src,
+                dst,
+                selector=selector,
+                max_concurrency=self.max_concurrency,
+                hardlink=self.hardlink,
+            )
         except FileNotFoundError:
             raise errors.CheckpointNotFound(
                 f"Did not find checkpoint {src} in shared_fs storage"
@@ -0,0 +1,130 @@
+import concurrent.futures
+import logging
+import threading
+import time
+from typing import Callable, Sequence, TypeVar
+
+from determined.common import util
+
+T = TypeVar("T")
+
+# Number of files transferred in parallel when a storage manager is not configured otherwise.
+DEFAULT_MAX_CONCURRENCY = 16
+# Number of attempts for each file before a transfer is considered failed.
+DEFAULT_MAX_ATTEMPTS = 3
+# How often to log aggregate progress of a long-running transfer, in seconds.
+PROGRESS_INTERVAL = 30.0
+
+
+class TransferStats:
+    """
+    Thread-safe aggregate counters for a batch of file transfers.
+    """
+
+    def __init__(self, total_files: int, total_bytes: int) -> None:
+        self._lock = threading.Lock()
+        self._start = time.time()
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.files_done = 0
+        self.bytes_done = 0
+        self.retries = 0
+
+    def record_done(self, nbytes: int) -> None:
+        with self._lock:
+            self.files_done += 1
+            self.bytes_done += nbytes
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.time() - self._start
+
+    def __str__(self) -> str:
+        with self._lock:
+            files_done, bytes_done, retries = self.files_done, self.bytes_done, self.retries
+        out = (
+            f"{files_done}/{self.total_files} files, "
+            f"{util.sizeof_fmt(bytes_done)}/{util.sizeof_fmt(self.total_bytes)} "
+            f"in {self.elapsed:.1f}s"
+        )
+        if retries:
+            out += f" ({retries} retries)"
+        return out
+
+
+def _with_retries(
+    fn: Callable[[T], None],
+    item: T,
+    max_attempts: int,
+    should_retry: Callable[[Exception], bool],
+    stats: TransferStats,
+) -> None:
+    attempt = 1
+    while True:
+        try:
+            fn(item)
+            return
+        except Exception as e:
+            if attempt >= max_attempts or not should_retry(e):
+                raise
+            delay = min(0.5 * 2 ** (attempt - 1), 10.0)
+            logging.debug(f"Transfer of {item} failed ({e}), retrying in {delay}s")
+            stats.record_retry()
+            time.sleep(delay)
+            attempt += 1
+
+
+def run(
+    fn: Callable[[T], None],
+    items: Sequence[T],
+    size_of: Callable[[T], int],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    should_retry: Callable[[Exception], bool] = lambda e: True,
+    desc: str = "Transfer",
+) -> TransferStats:
+    """
+    Call fn(item) for every item, using a pool of at most max_concurrency threads.
+
+    Each item is attempted up to max_attempts times, as long as should_retry() accepts the
+    exception raised by the previous attempt.  The first exception which is not retried cancels
+    all pending work and is reraised in the calling thread, after in-flight work has finished.
+
+    With max_concurrency == 1 the items are processed in order in the calling thread.
+    """
+    stats = TransferStats(len(items), sum(size_of(item) for item in items))
+
+    def work(item: T) -> None:
+        _with_retries(fn, item, max_attempts, should_retry, stats)
+        stats.record_done(size_of(item))
+
+    if max_concurrency <= 1 or len(items) <= 1:
+        for item in items:
+            work(item)
+        return stats
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="det-transfer"
+    ) as pool:
+        pending = {pool.submit(work, item) for item in items}
+        try:
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    timeout=PROGRESS_INTERVAL,
+                    return_when=concurrent.futures.FIRST_EXCEPTION,
+                )
+                for fut in done:
+                    # Reraise the first failure in the calling thread.
+                    fut.result()
+                if pending and not done:
+                    logging.info(f"{desc} in progress: {stats}")
+        finally:
+            for fut in pending:
+                fut.cancel()
+
+    return stats
@@ -6,12 +6,16 @@ import os
 import pathlib
 import platform
 import random
+import shutil
 import sys
+import tarfile
+import tempfile
 from typing import (
     IO,
     Any,
     Callable,
     Iterator,
+    List,
     Optional,
     Sequence,
     TypeVar,
@@ -22,7 +26,7 @@ from typing import (
 
 import urllib3
 
-from determined.common import yaml
+from determined.common import constants, yaml
 
 _yaml = yaml.YAML(typ="safe", pure=True)
 
@@ -200,3 +204,49 @@ def parse_protobuf_timestamp(ts: str) -> datetime.datetime:
     if ts.endswith("Z"):
         ts = ts[:-1] + "+00:00"
     return datetime.datetime.fromisoformat(ts)
+
+
+def _user_code_members(tf: tarfile.TarFile) -> List[tarfile.TarInfo]:
+    """
+    Return the files and directories of a code archive, refusing any which would be extracted
+    outside of the target directory.  Code archives hold no links or special files, so those are
+    skipped.
+    """
+    members = []
+    for member in tf.getmembers():
+        name = os.path.normpath(member.name)
+        if os.path.isabs(name) or name == ".." or name.startswith(".." + os.sep):
+            raise ValueError(f"code archive has a path outside of its directory: {member.name}")
+        if member.isfile() or member.isdir():
+            members.append(member)
+    return members
+
+
+def extract_user_code(ckpt_dir: pathlib.Path) -> pathlib.Path:
+    """
+    Return the directory of model code in a checkpoint, extracting it from the checkpoint's code
+    archive first if that has not been done yet.
+    """
+    code_path = ckpt_dir.joinpath(constants.USER_CODE_DIR)
+    archive_path = ckpt_dir.joinpath(constants.USER_CODE_ARCHIVE)
+    if code_path.exists() or not archive_path.exists():
+        return code_path
+
+    # Extract next to the code directory and rename it into place, so that an interrupted
+    # extraction never leaves behind a partial code directory.
+    with tarfile.open(str(archive_path)) as tf:
+        members = _user_code_members(tf)
+        tmp = tempfile.mkdtemp(prefix=".code-", dir=str(ckpt_dir))
+        try:
+            if hasattr(tarfile, "data_filter"):
+                tf.extractall(tmp, members=members, filter="data")
+            else:
+                tf.extractall(tmp, members=members)
+            os.chmod(tmp, 0o755)
+            os.rename(tmp, str(code_path))
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            # Another process may have extracted the same checkpoint at the same time.
+            if not code_path.exists():
+                raise
+    return code_path
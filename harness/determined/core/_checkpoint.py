@@ -5,6 +5,10 @@ import json
 import logging
 import os
 import pathlib
+import queue
+import shutil
+import tempfile
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
@@ -12,9 +16,12 @@ from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Un
 from determined import core, tensorboard
 from determined.common import api, storage
 from determined.common.api import bindings
+from determined.common.storage import transfer
 
 logger = logging.getLogger("determined.core")
 
+_DIGEST_CHUNK_SIZE = 1 << 20
+
 
 class DownloadMode(enum.Enum):
     """
@@ -171,9 +178,113 @@ def merge_resources(
     return merged, conflicts
 
 
+def _file_digest(path: str) -> str:
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_DIGEST_CHUNK_SIZE), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _file_digests(ckpt_dir: str, fnames: List[str]) -> Dict[str, str]:
+    """
+    Compute the md5 digests of files in ckpt_dir in parallel, reading them in chunks.
+    """
+    digests = {}
+
+    def _hash(fname: str) -> None:
+        digests[fname] = _file_digest(os.path.join(ckpt_dir, fname))
+
+    transfer.run(
+        _hash,
+        fnames,
+        size_of=lambda fname: os.path.getsize(os.path.join(ckpt_dir, fname)),
+        max_attempts=1,
+        desc=f"Hashing of {ckpt_dir}",
+    )
+    return digests
+
+
+class _CheckpointUploadThread(threading.Thread):
+    """
+    Uploads and reports checkpoints in the background, in the order they were submitted.
+
+    At most max_in_flight checkpoints may be waiting or uploading at once; submit() blocks once
+    that limit is reached, so a slow backend cannot pile up unbounded local copies of checkpoints.
+    A failed upload is raised from the next call to submit() or flush().
+    """
+
+    def __init__(self, max_in_flight: int) -> None:
+        if max_in_flight < 1:
+            raise ValueError(f"max_in_flight must be at least 1, not {max_in_flight}")
+        self._work_queue: queue.Queue = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._error: Optional[Tuple[str, Exception]] = None
+
+        super().__init__(name="det-checkpoint-upload", daemon=True)
+
+    def run(self) -> None:
+        while True:
+            work = self._work_queue.get()
+
+            # None is the sentinel value to signal the thread to exit.
+            if work is None:
+                self._work_queue.task_done()
+                return
+
+            storage_id, fn = work
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"Background upload of checkpoint {storage_id} failed: {e}")
+                if self._error is None:
+                    self._error = (storage_id, e)
+            finally:
+                self._slots.release()
+                self._work_queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is None:
+            return
+        storage_id, e = self._error
+        self._error = None
+        raise RuntimeError(f"background upload of checkpoint {storage_id} failed") from e
+
+    def submit(self, storage_id: str, fn: Callable[[], None]) -> None:
+        self._raise_error()
+        if not self._slots.acquire(blocking=False):
+            logger.info("Waiting for an earlier checkpoint to finish uploading")
+            self._slots.acquire()
+        self._work_queue.put((storage_id, fn))
+
+    def flush(self) -> None:
+        self._work_queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        self._work_queue.put(None)
+        while self.is_alive():
+            logger.info("Waiting for checkpoints to finish uploading")
+            self.join(10)
+        self._raise_error()
+
+
 class CheckpointContext:
     """
     ``CheckpointContext`` gives access to checkpoint-related features of a Determined cluster.
+
+    When ``async_upload=True``, non-sharded checkpoints from ``upload()`` and ``store_path()`` are
+    uploaded and reported to the master from a background thread, so training can continue while
+    the upload is in progress.  At most ``max_in_flight_uploads`` checkpoints are uploaded or
+    waiting to be uploaded at once; beyond that, saving a checkpoint blocks until an earlier
+    upload finishes.  Pending uploads are flushed by ``flush()``, by any sharded checkpoint, and
+    when the ``core.Context`` exits, so training code which exits after preemption does not lose
+    its last checkpoint.
+
+    In sharded uploads, files which more than one worker would upload are compared by content,
+    and the upload fails if their contents differ.  With ``fast_conflict_check=True``, files with
+    the same size and modification time on every worker are assumed to be identical instead, which
+    avoids reading them when every worker sees the same file on a shared filesystem.
     """
 
     def __init__(
@@ -185,14 +296,51 @@ class CheckpointContext:
         allocation_id: str,
         tbd_sync_mode: core.TensorboardMode,
         tensorboard_manager: tensorboard.TensorboardManager,
+        async_upload: bool = False,
+        max_in_flight_uploads: int = 2,
+        fast_conflict_check: bool = False,
+        flush_metrics: Optional[Callable[[], None]] = None,
     ) -> None:
         self._dist = dist
         self._storage_manager = storage_manager
+        self._fast_conflict_check = fast_conflict_check
+        self._flush_metrics = flush_metrics
         self._session = session
         self._task_id = task_id
         self._allocation_id = allocation_id
         self._tensorboard_mode = tbd_sync_mode
         self._tensorboard_manager = tensorboard_manager
+        self._init_upload_thread(async_upload, max_in_flight_uploads)
+
+    def _init_upload_thread(self, async_upload: bool, max_in_flight_uploads: int) -> None:
+        self._upload_thread = None
+        if async_upload:
+            self._upload_thread = _CheckpointUploadThread(max_in_flight_uploads)
+
+    def _submit_upload(self, storage_id: str, fn: Callable[[], None]) -> None:
+        assert self._upload_thread
+        if self._flush_metrics is not None:
+            # Flush here rather than on the upload thread, so that a failure to report metrics is
+            # raised to the caller instead of failing an upload which would otherwise succeed.
+            self._flush_metrics()
+        if self._upload_thread.ident is None:
+            # Only start the thread once it is needed.
+            self._upload_thread.start()
+        self._upload_thread.submit(storage_id, fn)
+
+    def flush(self) -> None:
+        """
+        Wait until every checkpoint uploading in the background has been uploaded and reported.
+
+        This is a no-op unless ``async_upload`` is enabled.  A failed background upload is raised
+        here as a ``RuntimeError``.
+        """
+        if self._upload_thread is not None and self._upload_thread.is_alive():
+            self._upload_thread.flush()
+
+    def close(self) -> None:
+        if self._upload_thread is not None and self._upload_thread.is_alive():
+            self._upload_thread.close()
 
     def upload(
         self,
@@ -217,6 +365,10 @@ class CheckpointContext:
         Each worker may optionally provide a ``selector`` that accepts a path
         relative to the checkpoint root, and returns True for paths that should be uploaded.
 
+        With ``async_upload`` enabled and ``shard=False``, ``upload()`` returns as soon as the
+        contents of ``ckpt_dir`` have been copied aside, and ``ckpt_dir`` may be modified or
+        deleted right away.
+
         Returns:  The ``storage_id`` for this checkpoint.
 
         Example:
@@ -245,6 +397,7 @@ class CheckpointContext:
                 )
             return self._upload_single(ckpt_dir, metadata, selector=selector)
         else:
+            self.flush()
             storage_id = None
             if self._dist.rank == 0:
                 storage_id = str(uuid.uuid4())
@@ -275,10 +428,46 @@ class CheckpointContext:
             resources = {key: resources[key] for key in resources if selector(key)}
             paths = set(resources)
 
-        self._storage_manager.upload(src=ckpt_dir, dst=storage_id, paths=paths)
-        self._report_checkpoint(storage_id, resources, metadata)
+        if self._upload_thread is None:
+            self._storage_manager.upload(src=ckpt_dir, dst=storage_id, paths=paths)
+            self._report_checkpoint(storage_id, resources, metadata)
+            return storage_id
+
+        # The caller may reuse ckpt_dir as soon as we return, so upload from a local snapshot.
+        snapshot = self._snapshot(ckpt_dir, paths)
+
+        def upload_and_report() -> None:
+            try:
+                self._storage_manager.upload(src=snapshot, dst=storage_id, paths=paths)
+            finally:
+                shutil.rmtree(snapshot, ignore_errors=True)
+            self._report_checkpoint(storage_id, resources, metadata)
+
+        try:
+            self._submit_upload(storage_id, upload_and_report)
+        except BaseException:
+            shutil.rmtree(snapshot, ignore_errors=True)
+            raise
         return storage_id
 
+    def _snapshot(self, ckpt_dir: str, paths: Optional[storage.Paths]) -> str:
+        snapshot = tempfile.mkdtemp(prefix="det-checkpoint-")
+        try:
+            if paths is None:
+                # List again, to include metadata.json.
+                paths = set(self._storage_manager._list_directory(ckpt_dir))
+            for path in sorted(paths):
+                dst = os.path.join(snapshot, path)
+                if path.endswith("/"):
+                    os.makedirs(dst, exist_ok=True)
+                    continue
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                shutil.copy2(os.path.join(ckpt_dir, path), dst)
+        except Exception:
+            shutil.rmtree(snapshot, ignore_errors=True)
+            raise
+        return snapshot
+
     def _upload_sharded(
         self,
         ckpt_dir: Optional[str],
@@ -360,22 +549,40 @@ class CheckpointContext:
     def _resolve_conflicts(
         self, resources: Dict[str, int], conflicts: Dict[str, List[int]], ckpt_dir: Optional[str]
     ) -> Dict[str, int]:
-        all_conflicts = conflicts.copy()
-
-        for fname in conflicts:
-            ranks = conflicts[fname]
-            if self._dist.rank in ranks:
-                assert ckpt_dir
-                md5 = hashlib.md5(open(os.path.join(ckpt_dir, fname), "rb").read()).hexdigest()
-                md5_ranks = self._dist.allgather(md5)
+        # Every rank must make the same collective calls, so each decision below is made from
+        # gathered data that all ranks share.
+        mine = sorted(fname for fname, ranks in conflicts.items() if self._dist.rank in ranks)
+        stats = {}
+        for fname in mine:
+            assert ckpt_dir
+            st = os.stat(os.path.join(ckpt_dir, fname))
+            stats[fname] = (st.st_size, st.st_mtime_ns)
+        all_stats = self._dist.allgather(stats)
+
+        all_conflicts = {}
+        to_hash = []
+        for fname, ranks in conflicts.items():
+            file_stats = {all_stats[rank][fname] for rank in ranks}
+            if len({size for size, _ in file_stats}) > 1:
+                # Different sizes are always a conflict.
+                all_conflicts[fname] = ranks
+            elif self._fast_conflict_check and len(file_stats) == 1:
+                # Same size and mtime, as when every rank sees one file on a shared filesystem.
+                continue
             else:
-                md5_ranks = self._dist.allgather(None)
-
-            md5_ranks = [x for x in md5_ranks if x is not None]
+                to_hash.append(fname)
 
-            if len(set(md5_ranks)) == 1:
-                # All files have the same md5 checksum, which means there is no conflict.
-                all_conflicts.pop(fname)
+        if to_hash:
+            mine_to_hash = [fname for fname in to_hash if self._dist.rank in conflicts[fname]]
+            digests = {}
+            if mine_to_hash:
+                assert ckpt_dir
+                digests = _file_digests(ckpt_dir, mine_to_hash)
+            all_digests = self._dist.allgather(digests)
+            for fname in to_hash:
+                ranks = conflicts[fname]
+                if len({all_digests[rank][fname] for rank in ranks}) > 1:
+                    all_conflicts[fname] = ranks
 
         if len(all_conflicts) > 0:
             self._raise_conflict_error(all_conflicts, "files")
@@ -508,12 +715,34 @@ class CheckpointContext:
             )
 
         storage_id = str(uuid.uuid4())
-        with self._storage_manager.store_path(storage_id) as path:
+        if self._upload_thread is None or self._storage_manager.store_path_is_direct_access():
+            with self._storage_manager.store_path(storage_id) as path:
+                yield path, storage_id
+                resources = self._storage_manager._list_directory(path)
+                # Streaming uploads may have deleted files locally which are already uploaded.
+                resources = {**self._storage_manager._evicted_resources(path), **resources}
+                self._write_metadata_file(os.fspath(path), metadata or {})
+
+            self._report_checkpoint(storage_id, resources, metadata)
+            return
+
+        # The local directory from pre_store_path() is not reused after post_store_path(), so it
+        # serves as the snapshot for a background upload.
+        path = self._storage_manager.pre_store_path(storage_id)
+        try:
             yield path, storage_id
             resources = self._storage_manager._list_directory(path)
             self._write_metadata_file(os.fspath(path), metadata or {})
 
-        self._report_checkpoint(storage_id, resources, metadata)
+            def upload_and_report() -> None:
+                self._storage_manager.post_store_path(path, storage_id)
+                self._report_checkpoint(storage_id, resources, metadata)
+
+            self._submit_upload(storage_id, upload_and_report)
+        except BaseException:
+            # Only post_store_path() removes the directory, and it will not run now.
+            shutil.rmtree(path, ignore_errors=True)
+            raise
 
     def _store_path_sharded(
         self, metadata: Optional[Dict[str, Any]] = None
@@ -706,6 +935,11 @@ class CheckpointContext:
             reportTime=datetime.now(timezone.utc).isoformat(),
             state=bindings.checkpointv1State.STATE_COMPLETED,
         )
+        on_upload_thread = threading.current_thread() is self._upload_thread
+        if self._flush_metrics is not None and not on_upload_thread:
+            # Report the checkpoint after the training metrics which led up to it.  Background
+            # uploads were flushed by _submit_upload() already.
+            self._flush_metrics()
         bindings.post_ReportCheckpoint(self._session, body=ckpt)
         logger.info(f"Reported checkpoint to master {storage_id}")
 
@@ -719,9 +953,15 @@ class DummyCheckpointContext(CheckpointContext):
         self,
         dist: core.DistributedContext,
         storage_manager: storage.StorageManager,
+        async_upload: bool = False,
+        max_in_flight_uploads: int = 2,
+        fast_conflict_check: bool = False,
     ) -> None:
         self._dist = dist
         self._storage_manager = storage_manager
+        self._fast_conflict_check = fast_conflict_check
+        self._flush_metrics = None
+        self._init_upload_thread(async_upload, max_in_flight_uploads)
 
     def _report_checkpoint(
         self,
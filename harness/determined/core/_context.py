@@ -1,9 +1,10 @@
+import contextlib
 import logging
 import pathlib
 import signal
 import sys
 import traceback
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Union
 
 import appdirs
 
@@ -56,16 +57,34 @@ class Context:
         return self
 
     def __exit__(self, typ: type, value: Exception, tb: Any) -> None:
-        self.preempt.close()
-        self.distributed.close()
-        if self._tensorboard_manager is not None:
-            self._tensorboard_manager.close()
+        try:
+            self._close()
+        except Exception:
+            if value is not None:
+                # Don't replace the exception which is already propagating out of the with block.
+                logger.exception("Error while closing core.Context")
+            else:
+                raise
         # Detect some specific exceptions that are part of the user-facing API.
         if isinstance(value, det.InvalidHP):
             self.train.report_early_exit(core.EarlyExitReason.INVALID_HP)
             logger.info("InvalidHP detected during Trial init, converting InvalidHP to exit(0)")
             exit(0)
 
+    def _close(self) -> None:
+        # ExitStack runs every callback (in reverse order) even when an earlier one raises, so a
+        # failed metrics report or checkpoint upload can't leak the threads and sockets of the
+        # other components.
+        with contextlib.ExitStack() as stack:
+            if self._tensorboard_manager is not None:
+                stack.callback(self._tensorboard_manager.close)
+            stack.callback(self.distributed.close)
+            stack.callback(self.preempt.close)
+            # Finish any background checkpoint uploads and reporting metrics before the task can
+            # exit.
+            stack.callback(self.checkpoint.close)
+            stack.callback(self.train.close)
+
 
 def _install_stacktrace_on_sigusr1() -> None:
     """Install a SIGUSR1 handler that prints a stack trace to stderr."""
@@ -87,9 +106,10 @@ def _install_stacktrace_on_sigusr1() -> None:
 def _dummy_init(
     *,
     distributed: Optional[core.DistributedContext] = None,
-    checkpoint_storage: Optional[str] = None,
+    checkpoint_storage: Optional[Union[str, Dict[str, Any]]] = None,
     tensorboard_path: Optional[pathlib.Path] = None,
     preempt_mode: core.PreemptMode = core.PreemptMode.WorkersAskChief,
+    async_checkpoint_upload: bool = False,
 ) -> Context:
     """
     Build a core.Context suitable for running off-cluster.  This is normally called by init()
@@ -100,14 +120,18 @@ def _dummy_init(
     preempt = core.DummyPreemptContext(distributed, preempt_mode)
 
     storage_manager = None
-    if checkpoint_storage is not None:
+    if isinstance(checkpoint_storage, str):
         storage_manager = storage.from_string(checkpoint_storage)
+    elif checkpoint_storage is not None:
+        storage_manager = storage.build(checkpoint_storage, container_path=None)
 
     if storage_manager is None:
         base_path = appdirs.user_data_dir("determined")
         logger.info(f"no storage_manager provided; storing checkpoints in {base_path}")
         storage_manager = storage.SharedFSStorageManager(base_path)
-    checkpoint = core.DummyCheckpointContext(distributed, storage_manager)
+    checkpoint = core.DummyCheckpointContext(
+        distributed, storage_manager, async_upload=async_checkpoint_upload
+    )
 
     train = core.DummyTrainContext(tensorboard_path)
     searcher = core.DummySearcherContext(distributed)
@@ -130,9 +154,11 @@ def _dummy_init(
 def init(
     *,
     distributed: Optional[core.DistributedContext] = None,
-    checkpoint_storage: Optional[str] = None,
+    checkpoint_storage: Optional[Union[str, Dict[str, Any]]] = None,
     preempt_mode: core.PreemptMode = core.PreemptMode.WorkersAskChief,
     tensorboard_mode: core.TensorboardMode = core.TensorboardMode.AUTO,
+    async_checkpoint_upload: bool = False,
+    async_metrics_reporting: bool = False,
 ) -> Context:
     """
     ``core.init()`` builds a :class:`core.Context <determined.core.Context>` for use with the Core
@@ -154,18 +180,30 @@ def init(
         preempt_mode (``core.PreemptMode``, optional): Configure the calling pattern for the
             ``core_context.preempt.should_preempt()`` method.  See
             :class:`~determined.core.PreemptMode` for more detail.  Defaults to ``WorkersAskChief``.
-        checkpoint_storage (``str``, optional): A directory path or a cloud storage URI of the form
-            ``s3://<bucket>[/<prefix>]`` (AWS) or ``gs://<bucket>[/<prefix>]`` (GCP). This should
-            only be used when IAM permissions can be assumed.
+        checkpoint_storage (``str`` or ``dict``, optional): A directory path or a cloud storage URI
+            of the form ``s3://<bucket>[/<prefix>]`` (AWS) or ``gs://<bucket>[/<prefix>]`` (GCP).
+            This should only be used when IAM permissions can be assumed.  Alternately, a
+            dictionary in the format of the ``checkpoint_storage`` field of the experiment config,
+            which may also set ``content_addressed: true`` to store every file only once across
+            checkpoints.
         tensorboard_mode (``core.TensorboardMode``, optional): Define how Tensorboard
             metrics and profiling data are retained. See
             :class:`~determined.core.TensorboardMode`` for more detail. Defaults to ``AUTO``.
+        async_checkpoint_upload (``bool``, optional): Upload non-sharded checkpoints in the
+            background and report them to the master once they are uploaded, so that training
+            does not wait on checkpoint storage.  Pending uploads are finished when the
+            ``core.Context`` exits.  See :class:`~determined.core.CheckpointContext` for more
+            detail.  Defaults to ``False``.
+        async_metrics_reporting (``bool``, optional): Report training metrics to the master from
+            a background thread, so that training does not wait on the master.  See
+            :class:`~determined.core.TrainContext` for more detail.  Defaults to ``False``.
     """
     info = det.get_cluster_info()
     if info is None:
         return _dummy_init(
             distributed=distributed,
             checkpoint_storage=checkpoint_storage,
+            async_checkpoint_upload=async_checkpoint_upload,
         )
 
     # We are on the cluster.
@@ -188,8 +226,12 @@ def init(
     tensorboard_manager = None
 
     storage_manager = None
-    if checkpoint_storage is not None:
+    if isinstance(checkpoint_storage, str):
         storage_manager = storage.from_string(checkpoint_storage)
+    elif checkpoint_storage is not None:
+        storage_manager = storage.build(
+            checkpoint_storage, container_path=constants.SHARED_FS_CONTAINER_PATH
+        )
 
     if info.task_type == "TRIAL":
         # Prepare the tensorboard hooks.
@@ -213,6 +255,7 @@ def init(
             tensorboard_mode,
             tensorboard_manager,
             tbd_writer,
+            async_reporting=async_metrics_reporting,
         )
         units = core._parse_searcher_units(info.trial._config)
         searcher = core.SearcherContext(
@@ -238,6 +281,8 @@ def init(
             info.allocation_id,
             tensorboard_mode,
             tensorboard_manager,
+            async_upload=async_checkpoint_upload,
+            flush_metrics=train.flush,
         )
 
         preempt = core.PreemptContext(session, info.allocation_id, distributed, preempt_mode)
@@ -248,7 +293,9 @@ def init(
             base_path = appdirs.user_data_dir("determined")
             logger.info(f"no storage_manager provided; storing checkpoints in {base_path}")
             storage_manager = storage.SharedFSStorageManager(base_path)
-        checkpoint = core.DummyCheckpointContext(distributed, storage_manager)
+        checkpoint = core.DummyCheckpointContext(
+            distributed, storage_manager, async_upload=async_checkpoint_upload
+        )
         preempt = core.DummyPreemptContext(distributed, preempt_mode)
 
     _install_stacktrace_on_sigusr1()
@@ -3,11 +3,15 @@ import os
 import shutil
 import socket
 import tempfile
-from typing import Any, List, Optional
+from typing import Any, List, Optional, Tuple
 
 from determined import constants, ipc
 
 
+def _hierarchical_from_env() -> bool:
+    return os.environ.get("DET_HIERARCHICAL_COLLECTIVES", "").lower() in ("1", "true")
+
+
 class DistributedContext:
     """
     DistributedContext provides useful methods for effective distributed training.
@@ -23,6 +27,20 @@ class DistributedContext:
     Additionally, any time that cross_size > 1, you must also provide:
      - chief_ip: the ip address to reach the chief worker (where rank==0)
 
+    The ``zero_copy`` arg controls how objects are sent between workers.  By default, where
+    pickle protocol 5 is available, large buffers like numpy arrays are sent as separate messages
+    without being copied into a pickle.  Every worker in the job must use the same setting.
+
+    By default, every worker talks directly to the chief, so the chief sends and receives one
+    message per worker for each collective operation.  With ``hierarchical=True``, collectives
+    first go through the local chief of each machine, and only the local chiefs talk to the chief
+    across the network, so the chief handles one connection per machine rather than one per worker.
+    The hierarchical topology is experimental: its benefit has not been measured on real multi-host
+    jobs, so the star topology remains the default.  The ``from_*`` constructors read the option
+    from the ``DET_HIERARCHICAL_COLLECTIVES`` environment variable unless it is passed explicitly;
+    set ``DET_HIERARCHICAL_COLLECTIVES=true`` in ``environment.environment_variables`` of the
+    experiment configuration to enable it for every worker of a trial.
+
     .. note::
 
        DistributedContext has ``.allgather()``, ``.gather()``, and ``.broadcast()`` methods, which
@@ -45,6 +63,8 @@ class DistributedContext:
         pull_port: int = constants.INTER_TRAIN_PROCESS_COMM_PORT_2,
         port_offset: int = 0,
         force_tcp: bool = False,
+        zero_copy: bool = ipc.ZERO_COPY_AVAILABLE,
+        hierarchical: bool = False,
     ) -> None:
         rank_args = (rank, size, local_rank, local_size, cross_rank, cross_size)
         if sum(x is not None for x in rank_args) not in (0, 6):
@@ -80,9 +100,16 @@ class DistributedContext:
             self._chief_ip = "127.0.0.1"
 
         self._closed = False
+        self._zero_copy = zero_copy
+        # Collectives use the star topology until the hierarchical one is connected.
+        self._hierarchical = False
 
         self._init_ipc(force_tcp)
 
+        # A hierarchy only helps when there are multiple machines with multiple workers each.
+        if hierarchical and self.cross_size > 1 and self.local_size > 1:
+            self._init_cross_ipc()
+
     def _init_ipc(self, force_tcp: bool) -> None:
         if self.size < 2:
             # No broadcasting necessary.
@@ -95,6 +122,7 @@ class DistributedContext:
                 num_connections=self.size - 1,
                 pub_url=f"tcp://*:{self._pub_port}",
                 pull_url=f"tcp://*:{self._pull_port}",
+                zero_copy=self._zero_copy,
             )
             self._chief_zmq.safe_start()
 
@@ -107,6 +135,7 @@ class DistributedContext:
             self._worker_zmq = ipc.ZMQBroadcastClient(
                 srv_pub_url=f"tcp://{self._chief_ip}:{self._pub_port}",
                 srv_pull_url=f"tcp://{self._chief_ip}:{self._pull_port}",
+                zero_copy=self._zero_copy,
             )
             self._worker_zmq.safe_start()
 
@@ -130,6 +159,7 @@ class DistributedContext:
                 num_connections=self.local_size - 1,
                 pub_url=pub_url,
                 pull_url=pull_url,
+                zero_copy=self._zero_copy,
             )
 
             if pub_url is None:
@@ -159,11 +189,50 @@ class DistributedContext:
             assert isinstance(pull_url, str), f"invalid pub_url: {pull_url}"
 
             logging.debug(f"Local Worker setting up server with urls {pub_url}/{pull_url}.")
-            self._local_worker_zmq = ipc.ZMQBroadcastClient(pub_url, pull_url)
+            self._local_worker_zmq = ipc.ZMQBroadcastClient(
+                pub_url, pull_url, zero_copy=self._zero_copy
+            )
             self._local_worker_zmq.safe_start()
 
+    def _init_cross_ipc(self) -> None:
+        """
+        Connect the local chiefs to the chief, for hierarchical collectives.
+        """
+        if self._is_chief:
+            self._cross_chief_zmq = ipc.ZMQBroadcastServer(
+                num_connections=self.cross_size - 1, zero_copy=self._zero_copy
+            )
+            ports: Optional[Tuple[int, int]] = (
+                self._cross_chief_zmq.get_pub_port(),
+                self._cross_chief_zmq.get_pull_port(),
+            )
+        else:
+            ports = None
+
+        # Share the randomly-chosen ports over the existing global connections.
+        ports = self.broadcast(ports)
+        assert ports is not None
+
+        if self._is_chief:
+            self._cross_chief_zmq.safe_start()
+        elif self._is_local_chief:
+            pub_port, pull_port = ports
+            logging.debug(
+                f"Local chief {self.rank} connecting to the chief w/ ports {pub_port}/{pull_port}."
+            )
+            self._cross_worker_zmq = ipc.ZMQBroadcastClient(
+                srv_pub_url=f"tcp://{self._chief_ip}:{pub_port}",
+                srv_pull_url=f"tcp://{self._chief_ip}:{pull_port}",
+                zero_copy=self._zero_copy,
+            )
+            self._cross_worker_zmq.safe_start()
+
+        self._hierarchical = True
+
     @classmethod
-    def from_horovod(cls, hvd: Any, chief_ip: Optional[str] = None) -> "DistributedContext":
+    def from_horovod(
+        cls, hvd: Any, chief_ip: Optional[str] = None, hierarchical: Optional[bool] = None
+    ) -> "DistributedContext":
         """
         Create a ``DistributedContext`` using the provided ``hvd`` module to determine rank
         information.
@@ -178,7 +247,8 @@ class DistributedContext:
 
         The IP address for the chief worker is required whenever ``hvd.cross_size() > 1``. The value
         may be provided using the ``chief_ip`` argument or the ``DET_CHIEF_IP`` environment
-        variable.
+        variable.  Likewise, ``hierarchical`` defaults to the ``DET_HIERARCHICAL_COLLECTIVES``
+        environment variable.
         """
 
         return cls(
@@ -189,16 +259,20 @@ class DistributedContext:
             cross_rank=hvd.cross_rank(),
             cross_size=hvd.cross_size(),
             chief_ip=chief_ip or os.environ.get("DET_CHIEF_IP"),
+            hierarchical=_hierarchical_from_env() if hierarchical is None else hierarchical,
         )
 
     @classmethod
-    def from_deepspeed(cls, chief_ip: Optional[str] = None) -> "DistributedContext":
+    def from_deepspeed(
+        cls, chief_ip: Optional[str] = None, hierarchical: Optional[bool] = None
+    ) -> "DistributedContext":
         """
         Create a ``DistributedContext`` using the standard deepspeed environment variables to
         determine rank information.
 
         The IP address for the chief worker is required whenever CROSS_SIZE > 1.  The value may
         be provided using the chief_ip argument or the DET_CHIEF_IP environment variable.
+        Likewise, hierarchical defaults to the DET_HIERARCHICAL_COLLECTIVES environment variable.
         """
 
         return cls(
@@ -209,16 +283,20 @@ class DistributedContext:
             cross_rank=int(os.environ["CROSS_RANK"]),
             cross_size=int(os.environ["CROSS_SIZE"]),
             chief_ip=chief_ip or os.environ.get("DET_CHIEF_IP"),
+            hierarchical=_hierarchical_from_env() if hierarchical is None else hierarchical,
         )
 
     @classmethod
-    def from_torch_distributed(cls, chief_ip: Optional[str] = None) -> "DistributedContext":
+    def from_torch_distributed(
+        cls, chief_ip: Optional[str] = None, hierarchical: Optional[bool] = None
+    ) -> "DistributedContext":
         """
         Create a DistributedContext using the standard torch distributed environment variables to
         determine rank information.
 
         The IP address for the chief worker is required whenever CROSS_SIZE > 1.  The value may
         be provided via the chief_ip argument or the DET_CHIEF_IP environment variable.
+        Likewise, hierarchical defaults to the DET_HIERARCHICAL_COLLECTIVES environment variable.
         """
 
         return cls(
@@ -229,6 +307,7 @@ class DistributedContext:
             cross_rank=int(os.environ["GROUP_RANK"]),
             cross_size=int(os.environ["GROUP_WORLD_SIZE"]),
             chief_ip=chief_ip or os.environ.get("DET_CHIEF_IP"),
+            hierarchical=_hierarchical_from_env() if hierarchical is None else hierarchical,
         )
 
     def close(self) -> None:
@@ -236,6 +315,13 @@ class DistributedContext:
         if self._closed or self.size < 2:
             return
 
+        # Hierarchical connections between local chiefs.
+        if self._hierarchical:
+            if self._is_chief:
+                self._cross_chief_zmq.close()
+            elif self._is_local_chief:
+                self._cross_worker_zmq.close()
+
         # Global broadcast server.
         if self._is_chief:
             self._chief_zmq.close()
@@ -294,11 +380,15 @@ class DistributedContext:
         if self.size < 2:
             return [stuff]
         logging.debug(f"Worker {self.get_rank()} beginning zmq gather.")
-        if self._is_chief:
+        if self._hierarchical:
+            out = self._tree_gather(stuff)  # type: Optional[List]
+            # Synchronize, like in the star topology.
+            self._tree_broadcast(None)
+        elif self._is_chief:
             worker_stuff_ranked = self._chief_zmq.gather()
             worker_stuff = [value for _, value in sorted(worker_stuff_ranked)]
             self._chief_zmq.broadcast(None)
-            out = [stuff, *worker_stuff]  # type: Optional[List]
+            out = [stuff, *worker_stuff]
         else:
             self._worker_zmq.send((self.get_rank(), stuff))
             # Synchronize with the chief so that there is no risk of accidentally calling send()
@@ -343,7 +433,9 @@ class DistributedContext:
         if self.size < 2:
             return [stuff]
         logging.debug(f"Worker {self.get_rank()} beginning zmq allgather.")
-        if self._is_chief:
+        if self._hierarchical:
+            all_stuff = self._tree_broadcast(self._tree_gather(stuff))  # type: List
+        elif self._is_chief:
             worker_stuff_ranked = self._chief_zmq.gather()
             worker_stuff = [value for _, value in sorted(worker_stuff_ranked)]
             all_stuff = [stuff, *worker_stuff]
@@ -384,7 +476,9 @@ class DistributedContext:
         """
         if self.size < 2:
             return stuff
-        if self._is_chief:
+        if self._hierarchical:
+            stuff = self._tree_broadcast(stuff)
+        elif self._is_chief:
             self._chief_zmq.broadcast(stuff)
         else:
             stuff = self._worker_zmq.recv()
@@ -405,6 +499,40 @@ class DistributedContext:
             stuff = self._local_worker_zmq.recv()
         return stuff
 
+    def _tree_gather(self, stuff: Any) -> Optional[List]:
+        """
+        Gather stuff to each local chief, then from the local chiefs to the chief.  The chief
+        returns everything in rank order, and everybody else returns None.
+        """
+        if not self._is_local_chief:
+            self._local_worker_zmq.send((self.rank, stuff))
+            return None
+
+        ranked: List[Tuple[int, Any]] = [(self.rank, stuff), *self._local_chief_zmq.gather()]
+        if not self._is_chief:
+            self._cross_worker_zmq.send(ranked)
+            return None
+
+        for node_ranked in self._cross_chief_zmq.gather():
+            ranked.extend(node_ranked)
+        return [value for _, value in sorted(ranked, key=lambda x: x[0])]
+
+    def _tree_broadcast(self, stuff: Any) -> Any:
+        """
+        Broadcast stuff from the chief to each local chief, then from each local chief to its
+        local workers.
+        """
+        if self._is_chief:
+            self._cross_chief_zmq.broadcast(stuff)
+        elif self._is_local_chief:
+            stuff = self._cross_worker_zmq.recv()
+
+        if self._is_local_chief:
+            self._local_chief_zmq.broadcast(stuff)
+        else:
+            stuff = self._local_worker_zmq.recv()
+        return stuff
+
 
 class DummyDistributedContext(DistributedContext):
     def __init__(self) -> None:
@@ -1,7 +1,11 @@
+import collections
 import enum
 import logging
 import pathlib
-from typing import Any, Callable, Dict, List, Optional, Set
+import queue
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
 
 import determined as det
 from determined import tensorboard
@@ -18,10 +22,135 @@ class EarlyExitReason(enum.Enum):
     USER_REQUESTED_STOP = "EXITED_REASON_USER_REQUESTED_STOP"
 
 
+# Number of attempts to report a batch of metrics in the background before giving up.
+REPORT_MAX_ATTEMPTS = 5
+
+
+def _should_retry(e: Exception) -> bool:
+    if isinstance(e, errors.APIException):
+        return e.status_code >= 500
+    return isinstance(e, errors.MasterNotFoundException)
+
+
+class _MetricsReporterThread(threading.Thread):
+    """
+    Reports training metrics to the master in the background, in the order they were queued.
+
+    Whatever was queued while the previous request was in flight is sent as one batch, back to back
+    over the session's kept-alive connection.  Requests which fail because the master is
+    unreachable or returned a server error are retried with exponential backoff.  At most
+    max_queue_size reports may be waiting; beyond that, report() blocks.  A failed report is raised
+    from the next call to report() or flush().
+    """
+
+    def __init__(self, session: api.Session, max_queue_size: int) -> None:
+        self._session = session
+        self._work_queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._error: Optional[Exception] = None
+        # The times when the reports which have not been sent yet were queued.
+        self._queued: Deque[float] = collections.deque()
+
+        super().__init__(name="det-metrics-reporter", daemon=True)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of reports waiting to be sent.
+        """
+        return self._work_queue.qsize()
+
+    @property
+    def lag(self) -> float:
+        """
+        How long the oldest report which has not been sent yet has been waiting, in seconds.
+        """
+        try:
+            return time.time() - self._queued[0]
+        except IndexError:
+            return 0.0
+
+    def _post(self, path: str, data: str) -> None:
+        attempt = 1
+        while True:
+            try:
+                self._session.post(path, data=data)
+                return
+            except Exception as e:
+                if attempt >= REPORT_MAX_ATTEMPTS or not _should_retry(e):
+                    raise
+                delay = min(0.5 * 2 ** (attempt - 1), 10.0)
+                logger.warning(f"Reporting metrics failed ({e}), retrying in {delay}s")
+                time.sleep(delay)
+                attempt += 1
+
+    def run(self) -> None:
+        while True:
+            batch = [self._work_queue.get()]
+            while True:
+                try:
+                    batch.append(self._work_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for work in batch:
+                # None is the sentinel value to signal the thread to exit.
+                if work is None:
+                    continue
+                path, data = work
+                try:
+                    if self._error is None:
+                        self._post(path, data)
+                    else:
+                        # Don't send later metrics ahead of the ones which failed.
+                        logger.warning(f"Dropped metrics report to {path} after an earlier failure")
+                except Exception as e:
+                    logger.error(
+                        f"Reporting metrics to the master failed: {e}; later metrics are dropped "
+                        "until the error is raised from report_training_metrics() or flush()"
+                    )
+                    self._error = e
+                finally:
+                    self._queued.popleft()
+                    self._work_queue.task_done()
+
+            if None in batch:
+                self._work_queue.task_done()
+                return
+            logger.debug(f"Reported {len(batch)} batches of metrics to the master")
+
+    def _raise_error(self) -> None:
+        if self._error is None:
+            return
+        e, self._error = self._error, None
+        raise RuntimeError("reporting metrics to the master failed") from e
+
+    def report(self, path: str, data: str) -> None:
+        self._raise_error()
+        self._queued.append(time.time())
+        self._work_queue.put((path, data))
+
+    def flush(self) -> None:
+        self._work_queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        self._work_queue.put(None)
+        while self.is_alive():
+            logger.info("Waiting for metrics to be reported to the master")
+            self.join(10)
+        self._raise_error()
+
+
 class TrainContext:
     """
     ``TrainContext`` gives access to report training and validation metrics to the Determined master
     during trial tasks.
+
+    When ``async_reporting=True``, ``report_training_metrics()`` queues the metrics and returns
+    immediately; a background thread sends them to the master in batches, retrying on network and
+    server errors.  At most ``max_queued_reports`` reports may be waiting; beyond that, reporting
+    blocks.  Queued metrics are flushed by ``flush()``, before validation metrics or a checkpoint
+    are reported, and when the ``core.Context`` exits.
     """
 
     def __init__(
@@ -34,6 +163,8 @@ class TrainContext:
         tensorboard_mode: TensorboardMode,
         tensorboard_manager: tensorboard.TensorboardManager,
         tbd_writer: Optional[tensorboard.BatchMetricWriter],
+        async_reporting: bool = False,
+        max_queued_reports: int = 100,
     ) -> None:
         self._session = session
         self._trial_id = trial_id
@@ -43,6 +174,40 @@ class TrainContext:
         self._tensorboard_mode = tensorboard_mode
         self._tensorboard_manager = tensorboard_manager
         self._tbd_writer = tbd_writer
+        self._reporter = None
+        if async_reporting:
+            self._reporter = _MetricsReporterThread(session, max_queued_reports)
+
+    def _post_metrics(self, path: str, data: str) -> None:
+        if self._reporter is None:
+            self._session.post(path, data=data)
+            return
+        if self._reporter.ident is None:
+            # Start the thread lazily, so that a TrainContext which never reports costs nothing.
+            self._reporter.start()
+        self._reporter.report(path, data)
+
+    @property
+    def reporting_lag(self) -> Tuple[int, float]:
+        """
+        The number of training metric reports which are waiting to be sent to the master, and how
+        long the oldest of them has been waiting, in seconds.  Always ``(0, 0.0)`` without
+        ``async_reporting``.
+        """
+        if self._reporter is None:
+            return 0, 0.0
+        return self._reporter.queue_depth, self._reporter.lag
+
+    def flush(self) -> None:
+        """
+        Wait until all training metrics have been reported to the master.
+        """
+        if self._reporter is not None and self._reporter.is_alive():
+            self._reporter.flush()
+
+    def close(self) -> None:
+        if self._reporter is not None and self._reporter.is_alive():
+            self._reporter.close()
 
     def set_status(self, status: str) -> None:
         """
@@ -92,9 +257,8 @@ class TrainContext:
         logger.info(
             f"report_training_metrics(steps_completed={steps_completed}, metrics={metrics})"
         )
-        self._session.post(
-            f"/api/v1/trials/{self._trial_id}/training_metrics",
-            data=det.util.json_encode(body),
+        self._post_metrics(
+            f"/api/v1/trials/{self._trial_id}/training_metrics", det.util.json_encode(body)
         )
 
         if self._tensorboard_mode == TensorboardMode.AUTO:
@@ -176,6 +340,8 @@ class TrainContext:
         logger.info(
             f"report_validation_metrics(steps_completed={steps_completed}, metrics={metrics})"
         )
+        # Keep validation metrics ordered after the training metrics before them.
+        self.flush()
         self._session.post(
             f"/api/v1/trials/{self._trial_id}/validation_metrics",
             data=det.util.json_encode(body),
@@ -228,6 +394,7 @@ class TrainContext:
 class DummyTrainContext(TrainContext):
     def __init__(self, tensorboard_path: Optional[pathlib.Path] = None) -> None:
         self._tbd_directory = tensorboard_path
+        self._reporter = None
 
     def set_status(self, status: str) -> None:
         logger.info(f"status: {status}")
@@ -21,6 +21,11 @@ def delete_checkpoints(
     """
     logging.info("Deleting {} checkpoints".format(len(to_delete)))
 
+    if isinstance(manager, storage.ContentAddressedStorageManager) and not dry_run:
+        # Find the content which no other checkpoint references once, rather than per checkpoint.
+        manager.delete_many(to_delete)
+        return
+
     for storage_id in to_delete:
         if not dry_run:
             logging.info(f"Deleting checkpoint {storage_id}")
@@ -104,6 +109,13 @@ def main(argv: List[str]) -> None:
     logging.info("Using checkpoint storage: {}".format(storage_config))
 
     manager = storage.build(storage_config, container_path=constants.SHARED_FS_CONTAINER_PATH)
+    # Experiment configs can't turn on content-addressed storage, but det.core.init() can, so
+    # look for content-addressed checkpoints in any storage which supports them.  Other checkpoints
+    # are deleted as usual.
+    try:
+        manager = storage.ContentAddressedStorageManager(manager)
+    except ValueError:
+        pass
 
     args.delete = args.delete.strip()
     storage_ids = []
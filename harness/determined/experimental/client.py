@@ -49,6 +49,8 @@ import pathlib
 import warnings
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
 
+import numpy as np
+
 from determined.common.api import Session  # noqa: F401
 from determined.common.experimental.checkpoint import (  # noqa: F401
     Checkpoint,
@@ -94,6 +96,7 @@ def login(
     cert_path: Optional[str] = None,
     cert_name: Optional[str] = None,
     noverify: bool = False,
+    cache_ttl: Optional[float] = None,
 ) -> None:
     """
     ``login()`` will configure the default Determined() singleton used by all of the other functions
@@ -133,6 +136,8 @@ def login(
             the master is exposed on multiple networks that this value might need to be
             overridden. (default: ``None``)
         noverify (boolean, optional): disable all TLS verification entirely.  (default: ``False``)
+        cache_ttl (float, optional): cache responses from the master for this many seconds.  See
+            :class:`~determined.experimental.client.Determined`.  (default: ``None``)
     """
     global _determined
 
@@ -143,7 +148,7 @@ def login(
             "client.Determined() objects, which each expose the same functions as this module."
         )
 
-    _determined = Determined(master, user, password, cert_path, cert_name, noverify)
+    _determined = Determined(master, user, password, cert_path, cert_name, noverify, cache_ttl)
 
 
 @_require_singleton
@@ -439,3 +444,24 @@ def stream_trials_validation_metrics(trial_ids: List[int]) -> Iterable[Validatio
     """
     assert _determined is not None
     return _determined.stream_trials_validation_metrics(trial_ids)
+
+
+@_require_singleton
+def export_trials_metrics(
+    trial_ids: Sequence[int],
+    group: str = "training",
+    metric_names: Optional[Sequence[str]] = None,
+    min_steps: Optional[int] = None,
+    max_steps: Optional[int] = None,
+    parquet_path: Optional[Union[str, pathlib.Path]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Export the metrics of one or more trials as columns of NumPy arrays.
+
+    See :meth:`Determined.export_trials_metrics()
+    <determined.experimental.client.Determined.export_trials_metrics>`.
+    """
+    assert _determined is not None
+    return _determined.export_trials_metrics(
+        trial_ids, group, metric_names, min_steps, max_steps, parquet_path
+    )
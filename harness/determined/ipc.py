@@ -1,5 +1,6 @@
 import logging
 import os
+import pickle
 import selectors
 import signal
 import socket
@@ -31,6 +32,52 @@ class _SerialMessage:
         self.payload = payload
 
 
+# Zero-copy framing needs out-of-band buffers, which were added in pickle protocol 5 (python 3.8).
+ZERO_COPY_AVAILABLE: bool = pickle.HIGHEST_PROTOCOL >= 5
+
+
+def _check_zero_copy(zero_copy: bool) -> None:
+    if zero_copy and not ZERO_COPY_AVAILABLE:
+        raise ValueError("zero_copy framing requires pickle protocol 5 (python 3.8 or newer)")
+
+
+def _send(sock: Any, obj: Any, zero_copy: bool) -> None:
+    """
+    Send a python object on a zmq socket.
+
+    In zero-copy mode, the object is pickled with protocol 5 and every out-of-band buffer (the data
+    of numpy arrays, PickleBuffers, etc) is sent as its own frame, straight from the memory of the
+    object.  zmq only copies frames smaller than zmq.COPY_THRESHOLD.  Because zmq sends frames from
+    a background thread, we wait until it is done with the buffers, so that the caller is free to
+    modify the object as soon as _send() returns.
+    """
+    if not zero_copy:
+        sock.send_pyobj(obj)
+        return
+
+    buffers = []  # type: List[pickle.PickleBuffer]
+    header = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    if not buffers:
+        sock.send(header)
+        return
+    frames = [header] + [b.raw() for b in buffers]
+    tracker = sock.send_multipart(frames, copy=False, track=True)
+    tracker.wait()
+
+
+def _recv(sock: Any, zero_copy: bool) -> Any:
+    """
+    Receive a python object sent by _send().
+
+    In zero-copy mode, out-of-band buffers are rebuilt directly on top of the received zmq frames.
+    """
+    if not zero_copy:
+        return sock.recv_pyobj()
+
+    frames = sock.recv_multipart(copy=False)
+    return pickle.loads(frames[0].buffer, buffers=[f.buffer for f in frames[1:]])
+
+
 class ZMQBroadcastServer:
     """
     Similar to ZMQServer except with broadcast/gather semantics on exactly two ports.
@@ -56,12 +103,22 @@ class ZMQBroadcastServer:
     http://zguide.zeromq.org/page:all#Getting-the-Message-Out (look for "one more important thing")
     http://zguide.zeromq.org/page:all#Node-Coordination
     (link broke, use http://web.archive.org/web/20191011190012/http://zguide.zeromq.org/page:all)
+
+    With zero_copy=True, messages are sent as multipart zmq messages, with the buffers of large
+    payloads (like numpy arrays) as separate frames which are neither copied into nor parsed out
+    of a pickle.  The server and all of its clients must agree on zero_copy.
     """
 
     def __init__(
-        self, num_connections: int, pub_url: Optional[str] = None, pull_url: Optional[str] = None
+        self,
+        num_connections: int,
+        pub_url: Optional[str] = None,
+        pull_url: Optional[str] = None,
+        zero_copy: bool = False,
     ) -> None:
+        _check_zero_copy(zero_copy)
         self._num_connections = num_connections
+        self._zero_copy = zero_copy
 
         import zmq
 
@@ -102,18 +159,18 @@ class ZMQBroadcastServer:
         connections_made = 0
         while connections_made < self._num_connections:
             # Send a Hello.
-            self._pub_socket.send_pyobj(_HelloMessage())
+            _send(self._pub_socket, _HelloMessage(), self._zero_copy)
 
             # Check for an incoming connection.
             if self._pull_socket.poll(50) == 0:
                 continue
 
-            obj = self._pull_socket.recv_pyobj()
+            obj = _recv(self._pull_socket, self._zero_copy)
             if not isinstance(obj, _HelloMessage):
                 raise RuntimeError(f"got non-_HelloMessage: {type(obj).__name__}")
             connections_made += 1
 
-        self._pub_socket.send_pyobj(_FinalHelloMessage())
+        _send(self._pub_socket, _FinalHelloMessage(), self._zero_copy)
 
     def __enter__(self) -> "ZMQBroadcastServer":
         return self
@@ -140,7 +197,7 @@ class ZMQBroadcastServer:
         Broadcast a message object to each connection.
         """
 
-        self._pub_socket.send_pyobj(_SerialMessage(self._send_serial, obj))
+        _send(self._pub_socket, _SerialMessage(self._send_serial, obj), self._zero_copy)
         self._send_serial += 1
 
     def gather(self) -> List[Any]:
@@ -155,7 +212,7 @@ class ZMQBroadcastServer:
         Receive one _SerialMessage from the socket and confirm that it is in-order.
         """
 
-        obj = self._pull_socket.recv_pyobj()
+        obj = _recv(self._pull_socket, self._zero_copy)
 
         if not isinstance(obj, _SerialMessage):
             raise RuntimeError(f"non-_SerialMessage: {type(obj).__name__}")
@@ -169,7 +226,10 @@ class ZMQBroadcastServer:
 
 
 class ZMQBroadcastClient:
-    def __init__(self, srv_pub_url: str, srv_pull_url: str) -> None:
+    def __init__(self, srv_pub_url: str, srv_pull_url: str, zero_copy: bool = False) -> None:
+        _check_zero_copy(zero_copy)
+        self._zero_copy = zero_copy
+
         import zmq
 
         context = zmq.Context()
@@ -191,16 +251,16 @@ class ZMQBroadcastClient:
         """
 
         # Get the first HelloMessage to guarantee our SUB socket is connected.
-        obj = self._sub_socket.recv_pyobj()
+        obj = _recv(self._sub_socket, self._zero_copy)
         if not isinstance(obj, _HelloMessage):
             raise RuntimeError(f"got non-_HelloMessage: {type(obj).__name__}")
 
         # Send our own _HelloMessage.
-        self._push_socket.send_pyobj(_HelloMessage())
+        _send(self._push_socket, _HelloMessage(), self._zero_copy)
 
         while True:
             # Discard all further Hellos until the FinalHello.
-            obj = self._sub_socket.recv_pyobj()
+            obj = _recv(self._sub_socket, self._zero_copy)
             if isinstance(obj, _FinalHelloMessage):
                 break
             if not isinstance(obj, _HelloMessage):
@@ -219,10 +279,10 @@ class ZMQBroadcastClient:
     def send(self, obj: Any) -> None:
         message = _SerialMessage(self._send_serial, obj)
         self._send_serial += 1
-        self._push_socket.send_pyobj(message)
+        _send(self._push_socket, message, self._zero_copy)
 
     def recv(self) -> Any:
-        obj = self._sub_socket.recv_pyobj()
+        obj = _recv(self._sub_socket, self._zero_copy)
 
         if not isinstance(obj, _SerialMessage):
             raise RuntimeError(f"non-_SerialMessage: {type(obj).__name__}")
@@ -35,7 +35,7 @@ class _Sampler:
         shuffle_seed: int,
         prior_batches_trained: int,
     ) -> None:
-        self.indices = list(range(length))
+        self.indices = np.arange(length)
         self.num_shards = num_shards
         self.shuffle = shuffle
 
@@ -56,23 +56,20 @@ class _Sampler:
         #   epoch 4: (same as epoch 1)
         # In this example, the offset in the first three epochs is 0, then 2, then 1.
         # The initial offset is always shard_rank, and the offest is recalculated in _end_epoch().
-        self.offset = shard_rank
+        #
+        # Equivalently, this shard yields every num_shards'th index of the stream of all epochs,
+        # starting at shard_rank, so the epoch and offset to start in are computed directly from
+        # the number of batches already trained.
+        epoch, self.offset = divmod(shard_rank + num_shards * prior_batches_trained, length)
 
         if self.shuffle:
             assert shuffle_seed is not None
             self.rng = np.random.RandomState(shuffle_seed)
-            self.rng.shuffle(self.indices)
-
-        # Start in the correct epoch of shuffle.
-        batches_to_skip = prior_batches_trained
-        while len(self._this_epoch_indices()) <= batches_to_skip:
-            batches_to_skip -= len(self._this_epoch_indices())
-            self._end_epoch()
-
-        self.offset += self.num_shards * batches_to_skip
-
-    def _this_epoch_indices(self) -> range:
-        return range(self.offset, len(self.indices), self.num_shards)
+            # Start in the correct epoch of shuffle.  Shuffling the integer array in place draws
+            # the same random numbers as shuffling a list would, so the order of indices matches
+            # the one from before training was paused.
+            for _ in range(epoch + 1):
+                self.rng.shuffle(self.indices)
 
     def _end_epoch(self) -> None:
         """
@@ -85,8 +82,7 @@ class _Sampler:
             self.rng.shuffle(self.indices)
 
     def yield_epoch(self) -> Iterator:
-        for i in self._this_epoch_indices():
-            yield self.indices[i]
+        yield from self.indices[self.offset :: self.num_shards].tolist()
         self._end_epoch()
 
 
@@ -7,6 +7,7 @@ from tensorflow.python.training.tracking.tracking import AutoTrackable
 
 import determined as det
 from determined import keras
+from determined.common.util import extract_user_code
 
 
 def load_model_from_checkpoint_path(path: str, tags: Optional[List[str]] = None) -> AutoTrackable:
@@ -77,7 +78,7 @@ def load_model_from_checkpoint_path(path: str, tags: Optional[List[str]] = None)
         )
 
     trial_cls, trial_context = det._load_trial_for_checkpoint_export(
-        ckpt_dir.joinpath("code"),
+        extract_user_code(ckpt_dir),
         managed_training=False,
         trial_cls_spec=trial_cls_spec,
         config=experiment_config,
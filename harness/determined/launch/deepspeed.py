@@ -145,6 +145,7 @@ def create_deepspeed_env_file() -> None:
         "LD_LIBRARY_PATH",
         "USE_DEEPSPEED",
         "DET_CHIEF_IP",
+        "DET_HIERARCHICAL_COLLECTIVES",
         "DET_MANUAL_INIT_DISTRIBUTED",
         "DET_DEEPSPEED_HOSTFILE_PATH",
         "DET_MASTER_CERT_FILE",
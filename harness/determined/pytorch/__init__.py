@@ -7,7 +7,9 @@ from determined.pytorch._data import (
     data_length,
     to_device,
     _dataset_repro_warning,
+    _prefetch_to_device,
 )
+from determined.pytorch._streaming import StreamingDataset, _StreamingDataLoader
 from determined.pytorch._callback import PyTorchCallback
 from determined.pytorch._lr_scheduler import LRScheduler
 from determined.pytorch._reducer import (
@@ -19,8 +21,11 @@ from determined.pytorch._reducer import (
 )
 from determined.pytorch._metric_utils import (
     _combine_and_average_training_metrics,
+    _per_batch_metrics_to_numpy,
     _prepare_metrics_reducers,
     _reduce_metrics,
+    _reduce_metrics_across_processes,
+    _StreamingMetricsReducer,
     _convert_metrics_to_numpy,
     _log_tb_metrics,
 )
@@ -1,3 +1,4 @@
+import collections
 import logging
 from typing import (
     Any,
@@ -26,7 +27,7 @@ from torch.utils.data import (
     _utils,
 )
 
-from determined.pytorch import samplers
+from determined.pytorch import _streaming, samplers
 
 _Array = Union[np.ndarray, torch.Tensor]
 _Data = Union[Dict[str, _Array], Sequence[_Array], _Array]
@@ -68,6 +69,11 @@ class DataLoader:
 
     Note that the arguments are from PyTorch.
 
+    The dataset may also be a :class:`~determined.pytorch.StreamingDataset`, which is read
+    sequentially from a list of shards instead of sampled.  In that case, ``shuffle``,
+    ``sampler``, and ``batch_sampler`` cannot be set, and continuing training resumes each shard
+    from the position saved in the checkpoint.
+
     Arguments:
         dataset (Dataset): dataset from which to load the data.
         batch_size (int, optional): how many samples per batch to load (default: ``1``).
@@ -127,10 +133,12 @@ class DataLoader:
         prefetch_factor: int = 2,
         persistent_workers: bool = False,
     ):
-        # Don't allow IterableDatasets in our DataLoader.
-        if isinstance(dataset, torch.utils.data.IterableDataset):
+        # Don't allow IterableDatasets in our DataLoader, other than StreamingDatasets.
+        self._streaming = isinstance(dataset, _streaming.StreamingDataset)
+        if isinstance(dataset, torch.utils.data.IterableDataset) and not self._streaming:
             raise ValueError(
-                "IterableDatasets are not supported through det.pytorch.DataLoader().  Read about "
+                "IterableDatasets are not supported through det.pytorch.DataLoader(), unless they "
+                "are a det.pytorch.StreamingDataset.  Read about "
                 "the difference between IterableDatasets and MapDatasets at: "
                 "pytorch.org/docs/stable/data. "
                 "You can use an IterableDataset in Determined, but you will be responsible for "
@@ -138,6 +146,11 @@ class DataLoader:
                 "correctness of training.  See the in-depth guide at: "
                 "https://docs.determined.ai/latest/training-apis/api-pytorch-advanced.html"
             )
+        if self._streaming and (shuffle or sampler is not None or batch_sampler is not None):
+            raise ValueError(
+                "A StreamingDataset is read sequentially from its shards, so the shuffle, sampler, "
+                "and batch_sampler options are not supported with it."
+            )
 
         # Don't allow this rare combination of inputs that we would puke on later.
         if batch_sampler is None and batch_size is None:
@@ -237,16 +250,9 @@ class DataLoader:
 
     # END VENDORED CODE FROM PYTORCH
 
-    def get_data_loader(
-        self, repeat: bool = False, skip: int = 0, num_replicas: int = 1, rank: int = 0
-    ) -> torch.utils.data.DataLoader:
-        batch_sampler = cast(BatchSampler, self.batch_sampler)
-        batch_sampler = adapt_batch_sampler(
-            batch_sampler, repeat=repeat, skip=skip, num_replicas=num_replicas, rank=rank
-        )
-
+    def _extra_kwargs(self) -> Dict[str, Any]:
         # Try to no break any torch version as old as v1.0.
-        extra_kwargs = {}
+        extra_kwargs = {}  # type: Dict[str, Any]
         if version.parse(torch.__version__) >= version.parse("1.2.0"):
             extra_kwargs["multiprocessing_context"] = self.multiprocessing_context
         if version.parse(torch.__version__) >= version.parse("1.6.0"):
@@ -254,6 +260,23 @@ class DataLoader:
         if version.parse(torch.__version__) >= version.parse("1.7.0"):
             extra_kwargs["prefetch_factor"] = self.prefetch_factor
             extra_kwargs["persistent_workers"] = self.persistent_workers
+        return extra_kwargs
+
+    def get_data_loader(
+        self,
+        repeat: bool = False,
+        skip: int = 0,
+        num_replicas: int = 1,
+        rank: int = 0,
+        stream_state: Optional[Dict[str, Any]] = None,
+    ) -> torch.utils.data.DataLoader:
+        if self._streaming:
+            return self._get_streaming_data_loader(repeat, skip, num_replicas, rank, stream_state)
+
+        batch_sampler = cast(BatchSampler, self.batch_sampler)
+        batch_sampler = adapt_batch_sampler(
+            batch_sampler, repeat=repeat, skip=skip, num_replicas=num_replicas, rank=rank
+        )
 
         return torch.utils.data.DataLoader(
             self.dataset,
@@ -263,7 +286,56 @@ class DataLoader:
             pin_memory=self.pin_memory,
             timeout=self.timeout,
             worker_init_fn=self.worker_init_fn,
-            **extra_kwargs,
+            **self._extra_kwargs(),
+        )
+
+    def _get_streaming_data_loader(
+        self,
+        repeat: bool,
+        skip: int,
+        num_replicas: int,
+        rank: int,
+        stream_state: Optional[Dict[str, Any]],
+    ) -> torch.utils.data.DataLoader:
+        """
+        Shard a StreamingDataset across every dataloader worker of every training process.  When
+        continuing training, each worker seeks to its position from stream_state, which the
+        previous run's training loader saved in the checkpoint.
+        """
+        num_workers = max(self.num_workers, 1)
+        positions = {}
+        if stream_state is not None:
+            if stream_state["num_readers"] == num_replicas * num_workers:
+                positions = stream_state["positions"]
+                skip = 0
+            else:
+                logging.warning(
+                    f"The StreamingDataset was read by {stream_state['num_readers']} dataloader "
+                    f"workers across all training processes before, but now by "
+                    f"{num_replicas * num_workers}, so the saved positions in its shards cannot "
+                    f"be used; skipping {skip} batches instead."
+                )
+
+        stream = _streaming._ShardedStream(
+            cast(_streaming.StreamingDataset, self.dataset),
+            batch_size=self.batch_size,
+            drop_last=self.drop_last,
+            collate_fn=self.collate_fn,
+            repeat=repeat,
+            num_replicas=num_replicas,
+            rank=rank,
+            num_workers=num_workers,
+            positions=positions,
+        )
+        return _streaming._StreamingDataLoader(
+            stream,
+            skip=skip,
+            track=repeat,
+            num_workers=self.num_workers,
+            pin_memory=self.pin_memory,
+            timeout=self.timeout,
+            worker_init_fn=self.worker_init_fn,
+            **self._extra_kwargs(),
         )
 
     def __iter__(self) -> Iterator:
@@ -338,14 +410,29 @@ def data_length(data: _Data) -> int:
     raise TypeError("Data of incorrect type: {}".format(type(data)))
 
 
+def _tensor_to_device(
+    tensor: torch.Tensor, device: torch.device, non_blocking: bool
+) -> torch.Tensor:
+    if non_blocking and tensor.device.type == "cpu" and torch.device(device).type == "cuda":
+        # Copies from pageable memory are synchronous, so pin the tensor first.
+        if not tensor.is_pinned():
+            tensor = tensor.pin_memory()
+    return tensor.to(device, non_blocking=non_blocking)
+
+
 def to_device(
-    data: _Data, device: torch.device, warned_types: Optional[Set[Type]] = None
+    data: _Data,
+    device: torch.device,
+    warned_types: Optional[Set[Type]] = None,
+    non_blocking: bool = False,
 ) -> TorchData:
     """
     Accept np.ndarray, torch.Tensor, list, or dictionary. Recursively convert any ndarrays to
     tensors and call .to() on any tensors or data types that have custom serialization logic
     defined via a callable to() attribute.
 
+    With non_blocking=True, tensors are copied to the GPU asynchronously, from pinned memory.
+
     If the data cannot be moved to device, log a warning (only once per type) and return the
     original data.
     """
@@ -354,17 +441,22 @@ def to_device(
         warned_types = set()
 
     if isinstance(data, dict):
-        return {k: to_device(v, device, warned_types) for k, v in data.items()}  # type: ignore
+        return {
+            k: to_device(v, device, warned_types, non_blocking)  # type: ignore
+            for k, v in data.items()
+        }
     elif isinstance(data, list):
-        return [to_device(d, device, warned_types) for d in data]  # type: ignore
+        return [to_device(d, device, warned_types, non_blocking) for d in data]  # type: ignore
     elif isinstance(data, tuple):
-        return tuple(to_device(d, device, warned_types) for d in data)  # type: ignore
+        return tuple(to_device(d, device, warned_types, non_blocking) for d in data)  # type: ignore
     elif isinstance(data, np.ndarray):
         # Torch supports floats, complex floats, ints, uints, and bools as tensors.
         # Those correspond to numpy dtype kinds: "f", "c", "i", "u", and "b", respectively.
         # Do not attempt to convert any other kinds to tensors.
         if data.dtype.kind in "fciub":
-            return torch.from_numpy(data).to(device)
+            return _tensor_to_device(torch.from_numpy(data), device, non_blocking)
+    elif isinstance(data, torch.Tensor):
+        return _tensor_to_device(data, device, non_blocking)
     elif hasattr(data, "to") and callable(data.to):  # type: ignore
         return data.to(device)  # type: ignore
 
@@ -375,3 +467,55 @@ def to_device(
         )
 
     return data  # type:ignore
+
+
+def _record_stream(data: Any, stream: Any) -> None:
+    """
+    Mark every tensor in data as used by stream, so that the caching allocator does not reuse
+    their memory until the work queued on stream is done with them.
+    """
+    if isinstance(data, dict):
+        for v in data.values():
+            _record_stream(v, stream)
+    elif isinstance(data, (list, tuple)):
+        for d in data:
+            _record_stream(d, stream)
+    elif isinstance(data, torch.Tensor) and data.is_cuda:
+        data.record_stream(stream)
+
+
+def _prefetch_to_device(
+    batches: Iterator,
+    device: torch.device,
+    depth: int,
+    warned_types: Optional[Set[Type]] = None,
+) -> Iterator:
+    """
+    Yield the batches from an iterator, already moved to a CUDA device.
+
+    Up to depth batches are copied ahead of time, on a separate CUDA stream and from pinned memory,
+    so that the copies overlap with the work on the current stream.
+    """
+    stream = torch.cuda.Stream(device=device)  # type: ignore
+    staged = collections.deque()  # type: collections.deque
+
+    def stage() -> bool:
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return False
+        with torch.cuda.stream(stream):
+            staged.append(to_device(batch, device, warned_types, non_blocking=True))
+        return True
+
+    while len(staged) < depth and stage():
+        pass
+
+    while staged:
+        batch = staged.popleft()
+        current = torch.cuda.current_stream(device)
+        current.wait_stream(stream)  # type: ignore
+        _record_stream(batch, current)
+        # Start copying the next batch before this one is used.
+        stage()
+        yield batch
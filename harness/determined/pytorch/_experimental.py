@@ -18,6 +18,9 @@ class PyTorchExperimentalContext:
         self._auto_amp = False
         self._data_repro_checks_disabled = False
         self._auto_to_device = True
+        self._prefetch_depth = 0
+        self._defer_metrics_transfer = False
+        self._tensor_file_checkpoints = False
 
     def use_amp(self) -> None:
         """
@@ -82,3 +85,46 @@ class PyTorchExperimentalContext:
         """
         self._auto_to_device = False
         logging.info("disabled automatically moving data to device")
+
+    def prefetch_to_device(self, depth: int = 2) -> None:
+        """
+        Copy up to ``depth`` upcoming batches to the GPU while the current batch is being
+        processed, instead of moving each batch to the GPU right before ``train_batch`` or
+        ``evaluate_batch`` is called.
+
+        The batches are copied on a separate CUDA stream, from pinned memory.  Returning a
+        ``DataLoader`` with ``pin_memory=True`` avoids an extra copy into pinned memory.  Each
+        prefetched batch takes up GPU memory, so keep ``depth`` small.  This has no effect when
+        training on CPUs or after calling ``disable_auto_to_device()``.
+        """
+        if depth < 1:
+            raise ValueError(f"prefetch depth must be at least 1, got {depth}")
+        self._prefetch_depth = depth
+        logging.info(f"prefetching {depth} batches to device")
+
+    def defer_training_metrics_transfer(self) -> None:
+        """
+        Keep the tensors returned by ``train_batch`` on the GPU until training metrics are
+        reported, and then copy them to the CPU all at once.
+
+        Normally, each metric is copied to the CPU right after ``train_batch``, which waits for the
+        GPU to finish the batch.  With this option, the GPU can keep working on the next batches
+        in the meantime.  Metric tensors are copied on the GPU first, so they may be modified
+        after ``train_batch`` returns them.
+        """
+        self._defer_metrics_transfer = True
+        logging.info("deferring the transfer of training metrics from device")
+
+    def use_tensor_file_checkpoints(self) -> None:
+        """
+        Save the tensors of checkpoints into a flat file, ``state_dict.tensors``, next to a small
+        ``state_dict.index`` of everything else, instead of pickling them all into
+        ``state_dict.pth``.
+
+        Tensors are written into the file in parallel.  When restoring, the file is memory-mapped
+        and tensors are only read as they are loaded into the models and optimizers, rather than
+        all being read into host memory first, which matters for models of several GB.
+        Checkpoints in either format can always be restored.
+        """
+        self._tensor_file_checkpoints = True
+        logging.info("saving checkpoints as tensor files")
@@ -8,6 +8,8 @@ import torch
 
 import determined as det
 from determined import core, errors, load, pytorch, util
+from determined.common.util import extract_user_code
+from determined.pytorch import _tensor_file
 
 
 class CheckpointLoadContext(pytorch.PyTorchTrialContext):
@@ -89,6 +91,8 @@ def load_trial_from_checkpoint_path(
         torch_load_kwargs (optional): Keyword arguments for ``torch.load``. See documentation for
             `torch.load
             <https://pytorch.org/docs/stable/torch.html?highlight=torch%20load#torch.load>`_.
+            Checkpoints saved with ``use_tensor_file_checkpoints()`` are memory-mapped instead,
+            and their tensors are always loaded to the CPU first.
         **kwargs (deprecated): Use torch_load_kwargs instead.
     """
     trial_kwargs = trial_kwargs or {}
@@ -181,7 +185,7 @@ def load_trial_from_checkpoint_path(
         # Indirect usage of the Trainer API should always have experiment_config and hparams set.
         assert experiment_config is not None and hparams is not None
         trial_class, trial_context = _load_pytorch_trial_with_shims(
-            ckpt_dir.joinpath("code"),
+            extract_user_code(ckpt_dir),
             managed_training=False,
             trial_cls_spec=trial_cls_spec,
             config=experiment_config,
@@ -191,7 +195,7 @@ def load_trial_from_checkpoint_path(
         # Users using the Trainer API directly should not have any legacy shims.
         if trial_class is None:
             try:
-                with det.import_from_path(ckpt_dir.joinpath("code")):
+                with det.import_from_path(extract_user_code(ckpt_dir)):
                     trial_class = load.trial_class_from_entrypoint(trial_cls_spec)  # type: ignore
             except Exception as e:
                 raise ValueError(
@@ -203,9 +207,12 @@ def load_trial_from_checkpoint_path(
 
     trial = trial_class(trial_context, **trial_kwargs)  # type: ignore
 
-    checkpoint = torch.load(  # type: ignore
-        str(ckpt_dir.joinpath("state_dict.pth")), **torch_load_kwargs
-    )
+    if _tensor_file.exists(ckpt_dir):
+        checkpoint = _tensor_file.load(ckpt_dir)
+    else:
+        checkpoint = torch.load(  # type: ignore
+            str(ckpt_dir.joinpath("state_dict.pth")), **torch_load_kwargs
+        )
 
     # We are still backwards compatible with checkpoints saved in the pre-0.12.13 PyTorchTrial API,
     # but when we can guarantee that the pre-0.12.13 API was not in use, we avoid checking for a
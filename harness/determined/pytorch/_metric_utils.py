@@ -24,6 +24,41 @@ def _process_combined_metrics_and_batches(
     return metrics_lists, list(all_num_batches)
 
 
+def _average_metric(process_batches: List[List[Any]], num_batches: int) -> List[Any]:
+    """
+    Average the values of one metric across processes, for each batch.  Missing values (None) are
+    ignored, and values which are arrays are averaged over all of their elements.
+    """
+    try:
+        # Pack every process's timeseries into one (processes, batches, ...) array.  None values
+        # become NaN.
+        floats = np.array(process_batches, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Arrays of different shapes (or arrays mixed with None) can't be packed; average them one
+        # batch at a time.
+        averages = []
+        for batch_idx in range(num_batches):
+            values = [
+                np.ravel(np.asarray(batches[batch_idx], dtype=np.float64))
+                for batches in process_batches
+                if batches[batch_idx] is not None
+            ]
+            averages.append(np.mean(np.concatenate(values)) if values else np.float64(np.nan))
+        return averages
+
+    # Reduce over processes and over the elements of array values, but not over batches.
+    axes = (0, *range(2, floats.ndim))
+    if floats.ndim > 2 or not np.isnan(floats).any():
+        return list(floats.mean(axis=axes))
+
+    # Tell None apart from NaN values which were reported as such, which are kept so that they
+    # show up in the averages.
+    present = np.array(process_batches, dtype=object) != None  # noqa: E711
+    totals = np.where(present, floats, 0.0).sum(axis=axes)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return list(totals / present.sum(axis=axes))
+
+
 def _average_training_metrics(
     combined_timeseries: Dict[str, Any], combined_num_batches: List[int]
 ) -> List[Dict[str, Any]]:
@@ -39,22 +74,13 @@ def _average_training_metrics(
             array_metrics.append(metric_name)
 
     num_batches = combined_num_batches[0]  # num_batches matches across data parallel ranks.
-    num_processes = len(combined_num_batches)
     averaged_metrics_timeseries = {}  # type: Dict[str, List]
 
-    for metric_name in combined_timeseries.keys():
-        averaged_metrics_timeseries[metric_name] = []
-        for batch_idx in range(num_batches):
-            batch = [
-                combined_timeseries[metric_name][process_idx][batch_idx]
-                for process_idx in range(num_processes)
-            ]
-
-            np_batch = np.array(batch)
-            batch_avg = np.mean(np_batch[np_batch != None])  # noqa: E711
-            if metric_name in array_metrics:
-                batch_avg = np.array(batch_avg)
-            averaged_metrics_timeseries[metric_name].append(batch_avg)
+    for metric_name, process_batches in combined_timeseries.items():
+        averages = _average_metric(process_batches, num_batches)
+        if metric_name in array_metrics:
+            averages = [np.array(avg) for avg in averages]
+        averaged_metrics_timeseries[metric_name] = averages
     return util._dict_to_list(averaged_metrics_timeseries)
 
 
@@ -132,6 +158,35 @@ def _convert_metrics_to_numpy(metrics: Dict[str, Any]) -> Dict[str, Any]:
     return metrics
 
 
+def _per_batch_metrics_to_numpy(per_batch_metrics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Convert the tensors in a list of per-batch metrics to NumPy, with a single copy from each
+    device (per dtype) instead of a separate, synchronizing copy for every tensor.
+    """
+    # Tensors to copy, grouped by where they are and what they hold.
+    groups = {}  # type: Dict[Tuple[torch.device, torch.dtype], List[Tuple[int, str, torch.Tensor]]]
+    out = []
+    for batch_idx, metrics in enumerate(per_batch_metrics):
+        metrics = dict(metrics)
+        for name, value in metrics.items():
+            if not isinstance(value, torch.Tensor):
+                continue
+            if value.layout != torch.strided:
+                metrics[name] = value.cpu().detach().numpy()
+                continue
+            groups.setdefault((value.device, value.dtype), []).append((batch_idx, name, value))
+        out.append(metrics)
+
+    for entries in groups.values():
+        flat = torch.cat([t.detach().reshape(-1) for _, _, t in entries]).cpu().numpy()
+        offset = 0
+        for batch_idx, name, tensor in entries:
+            size = tensor.numel()
+            out[batch_idx][name] = flat[offset : offset + size].reshape(tuple(tensor.shape))
+            offset += size
+    return out
+
+
 def _reduce_metrics(
     context: det.core.DistributedContext,
     batch_metrics: List,
@@ -149,10 +204,24 @@ def _reduce_metrics(
             for name in keys or []
         }
 
+    return _reduce_metrics_across_processes(
+        context, metrics, len(batch_metrics), keys, metrics_reducers
+    )
+
+
+def _reduce_metrics_across_processes(
+    context: det.core.DistributedContext,
+    metrics: Dict[str, Any],
+    num_batches: int,
+    keys: Any,
+    metrics_reducers: Dict[str, pytorch.Reducer],
+) -> Dict[str, Any]:
+    """
+    Combine the metrics that each process reduced over its own num_batches batches.
+    """
     if context.size > 1:
         # If using distributed training, combine metrics across all processes.
         # Only the chief process will receive all the metrics.
-        num_batches = len(batch_metrics)
         combined_metrics, batches_per_process = _combine_metrics_across_processes(
             context, metrics, num_batches
         )
@@ -174,6 +243,68 @@ def _reduce_metrics(
     return metrics
 
 
+class _StreamingMetricsReducer:
+    """
+    Reduce the metrics of each batch as soon as it is evaluated, with the built-in Reducers.
+
+    The running reductions are kept on the device where evaluate_batch() returns its metrics, so
+    that there is no need to wait for the device after every batch, and they are copied to the
+    host all at once by reduce().  The result matches _reduce_metrics() on the whole list of batch
+    metrics: each reducer applies to every element of a metric, across all batches.
+    """
+
+    def __init__(self, metrics_reducers: Dict[str, pytorch.Reducer]) -> None:
+        self._reducers = metrics_reducers
+        # Running sums, maximums, or minimums.
+        self._state = {}  # type: Dict[str, torch.Tensor]
+        # The number of elements summed for Reducer.AVG metrics.
+        self._counts = {}  # type: Dict[str, int]
+        self.num_batches = 0
+
+    def update(self, metrics: Dict[str, Any]) -> None:
+        for name, value in metrics.items():
+            if not isinstance(value, torch.Tensor):
+                # Let numpy pick the dtype, since torch would make python floats into float32.
+                value = torch.as_tensor(np.asarray(value))
+            value = value.detach()
+            reducer = self._reducers[name]
+            if reducer in (pytorch.Reducer.AVG, pytorch.Reducer.SUM):
+                dtype = torch.float64 if value.is_floating_point() else torch.int64
+                if reducer == pytorch.Reducer.AVG:
+                    dtype = torch.float64
+                    self._counts[name] = self._counts.get(name, 0) + value.numel()
+                update = value.sum(dtype=dtype)
+            elif reducer == pytorch.Reducer.MAX:
+                update = value.max()
+            elif reducer == pytorch.Reducer.MIN:
+                update = value.min()
+            else:
+                raise NotImplementedError
+
+            if name not in self._state:
+                self._state[name] = update
+                continue
+            state = self._state[name]
+            update = update.to(state.device)
+            if reducer == pytorch.Reducer.MAX:
+                self._state[name] = torch.maximum(state, update)
+            elif reducer == pytorch.Reducer.MIN:
+                self._state[name] = torch.minimum(state, update)
+            else:
+                self._state[name] = state + update
+        self.num_batches += 1
+
+    def reduce(self) -> Dict[str, Any]:
+        """
+        Return the reduced metrics as numpy scalars.
+        """
+        final = {
+            name: state / self._counts[name] if name in self._counts else state
+            for name, state in self._state.items()
+        }
+        return {name: value[()] for name, value in _per_batch_metrics_to_numpy([final])[0].items()}
+
+
 def _log_tb_metrics(
     writer: Any,
     metric_type: str,
@@ -20,6 +20,7 @@ from torch import distributed as dist
 import determined as det
 from determined import core, profiler, pytorch, tensorboard, util
 from determined.horovod import hvd
+from determined.pytorch import _tensor_file
 
 # Apex is included only for GPU trials.
 try:
@@ -39,6 +40,14 @@ def dataloader_next(profiler: det.profiler.ProfilerAgent, dataloader_iter: Itera
         yield batch
 
 
+def _known_len(data_loader: torch.utils.data.DataLoader) -> Optional[int]:
+    """Return the length of a data loader, or None for streaming data loaders without one."""
+    try:
+        return len(data_loader)
+    except TypeError:
+        return None
+
+
 class TrainUnit:
     """
     TrainUnit is the base class for the supported training units (Batch, Epoch) containing
@@ -224,6 +233,8 @@ class _PyTorchTrialController:
 
         self.state = _TrialState(trial_id=self.trial_id)
         self.start_from_batch = steps_completed
+        # Set when training from a StreamingDataset, whose positions are saved in checkpoints.
+        self._stream_loader = None  # type: Optional[pytorch._StreamingDataLoader]
         self.val_from_previous_run = self.core_context.train._get_last_validation()
         self.step_zero_validation = step_zero_validation
 
@@ -309,6 +320,10 @@ class _PyTorchTrialController:
         # torch.backends.cudnn.benchmark = False
 
     def _aggregate_training_metrics(self, training_metrics: List[Dict]) -> Dict:
+        if self.context.experimental._defer_metrics_transfer:
+            with self.prof.record_timing("from_device"):
+                training_metrics = pytorch._per_batch_metrics_to_numpy(training_metrics)
+
         # Aggregate and reduce training metrics from all the training processes.
         if self.context.distributed.size > 1:
             with self.prof.record_timing("average_training_metrics"):
@@ -383,19 +398,25 @@ class _PyTorchTrialController:
         self.state.last_ckpt = self.state.batches_trained
 
         try:
+            stream_states = None
+            if self._stream_loader is not None:
+                stream_states = self.context.distributed.gather(self._stream_loader._state_dict())
+
             uuid = ""
             if self.is_chief:
                 metadata = {
                     "determined_version": det.__version__,
                     "steps_completed": self.state.batches_trained,
                     "framework": f"torch-{torch.__version__}",
-                    "format": "pickle",
+                    "format": "tensor_file"
+                    if self.context.experimental._tensor_file_checkpoints
+                    else "pickle",
                 }
                 with self.context._core.checkpoint.store_path(metadata) as (
                     path,
                     storage_id,
                 ):
-                    self._save(path)
+                    self._save(path, stream_states)
                     uuid = storage_id
             uuid = self.context.distributed.broadcast(uuid)
             for callback in self.callbacks.values():
@@ -426,7 +447,7 @@ class _PyTorchTrialController:
     def _evaluate_full_dataset_defined(self) -> bool:
         return util.is_overridden(self.trial.evaluate_full_dataset, PyTorchTrial)
 
-    def _set_data_loaders(self) -> None:
+    def _set_data_loaders(self, load_path: Optional[pathlib.Path] = None) -> None:
         skip_batches = self.state.batches_trained
 
         num_replicas = self.context.distributed.size
@@ -435,8 +456,14 @@ class _PyTorchTrialController:
         train_data = self.trial.build_training_data_loader()
         if isinstance(train_data, pytorch.DataLoader):
             self.training_loader = train_data.get_data_loader(
-                repeat=True, skip=skip_batches, num_replicas=num_replicas, rank=rank
+                repeat=True,
+                skip=skip_batches,
+                num_replicas=num_replicas,
+                rank=rank,
+                stream_state=self._load_stream_state(load_path),
             )
+            if isinstance(self.training_loader, pytorch._StreamingDataLoader):
+                self._stream_loader = self.training_loader
         else:
             # Non-determined DataLoader; ensure the user meant to do this.
             if not self.context.experimental._data_repro_checks_disabled:
@@ -489,6 +516,8 @@ class _PyTorchTrialController:
 
     def _step_batch(self) -> None:
         self.state.batches_trained += 1
+        if self._stream_loader is not None:
+            self._stream_loader._commit_batch()
 
         epoch_len = self.context._epoch_len
         assert epoch_len, "Training dataloader not initialized."
@@ -559,34 +588,41 @@ class _PyTorchTrialController:
                     defer(on_shutdown, callback.__class__.__name__, callback.on_trial_shutdown)
                 )
 
-            self._set_data_loaders()
+            with contextlib.ExitStack() as restore_stack:
+                # The checkpoint is restored before the data loaders are built, since a streaming
+                # training loader continues from the positions saved in it.
+                load_path = None
+                if self.latest_checkpoint is not None:
+                    logging.info(f"Restoring trial from checkpoint {self.latest_checkpoint}")
+                    load_path = restore_stack.enter_context(
+                        self.context._core.checkpoint.restore_path(self.latest_checkpoint)
+                    )
 
-            # We create the training_iterator (and training enumerator) here rather than in
-            # __init__ because we have to be careful to trigger its shutdown explicitly, to avoid
-            # hangs in when the user is using multiprocessing-based parallelism for their
-            # dataloader.
-            #
-            # We create it before loading state because we don't want the training_iterator
-            # shuffling values after we load state.
-            self.training_iterator = iter(self.training_loader)
-            self.training_enumerator = enumerate(
-                dataloader_next(self.prof, self.training_iterator), start=self.start_from_batch
-            )
+                self._set_data_loaders(load_path)
+
+                # We create the training_iterator (and training enumerator) here rather than in
+                # __init__ because we have to be careful to trigger its shutdown explicitly, to
+                # avoid hangs in when the user is using multiprocessing-based parallelism for their
+                # dataloader.
+                #
+                # We create it before loading state because we don't want the training_iterator
+                # shuffling values after we load state.
+                self.training_iterator = iter(self.training_loader)
+                self.training_enumerator = enumerate(
+                    self._prefetch(dataloader_next(self.prof, self.training_iterator)),
+                    start=self.start_from_batch,
+                )
 
-            def cleanup_iterator() -> None:
-                # Explicitly trigger the training iterator's shutdown (which happens in __del__).
-                # See the rather long note in pytorch/torch/utils/data/dataloader.py.
-                del self.training_iterator
-                del self.training_enumerator
+                def cleanup_iterator() -> None:
+                    # Explicitly trigger the training iterator's shutdown (which happens in
+                    # __del__).  See the rather long note in pytorch/torch/utils/data/dataloader.py.
+                    del self.training_iterator
+                    del self.training_enumerator
 
-            exit_stack.enter_context(defer(cleanup_iterator))
+                exit_stack.enter_context(defer(cleanup_iterator))
 
-            # If a load path is provided load weights and restore the data location.
-            if self.latest_checkpoint is not None:
-                logging.info(f"Restoring trial from checkpoint {self.latest_checkpoint}")
-                with self.context._core.checkpoint.restore_path(
-                    self.latest_checkpoint
-                ) as load_path:
+                # If a load path is provided load weights and restore the data location.
+                if load_path is not None:
                     self._load(load_path)
 
             if self.context.distributed.size > 1 and self.use_horovod:
@@ -829,6 +865,26 @@ class _PyTorchTrialController:
             return False
         return self.context._should_communicate_and_update()
 
+    def _prefetching(self) -> bool:
+        return (
+            self.context.experimental._auto_to_device
+            and self.context.experimental._prefetch_depth > 0
+            and self.context.device.type == "cuda"
+        )
+
+    def _prefetch(self, batches: Iterator) -> Iterator:
+        """
+        Move batches to the device ahead of time, if prefetching is enabled.
+        """
+        if not self._prefetching():
+            return batches
+        return pytorch._prefetch_to_device(
+            batches,
+            self.context.device,
+            self.context.experimental._prefetch_depth,
+            self.context._to_device_warned_types,
+        )
+
     def _train_batch(self, batch: pytorch.TorchData, epoch_idx: int, batch_idx: int) -> Dict:
         # Reset loss IDs for AMP
         self.context._loss_ids = {}
@@ -837,7 +893,7 @@ class _PyTorchTrialController:
         batch_start_time = time.time()
         self.prof.update_batch_idx(batch_idx)
 
-        if self.context.experimental._auto_to_device:
+        if self.context.experimental._auto_to_device and not self._prefetching():
             with self.prof.record_timing("to_device", accumulate=True):
                 batch = self.context.to_device(batch)  # type: ignore
 
@@ -872,14 +928,21 @@ class _PyTorchTrialController:
             for lr_scheduler in self.context.lr_schedulers:
                 self._auto_step_lr_scheduler_per_batch(batch_idx, lr_scheduler)
 
-        with self.prof.record_timing("from_device"):
+        if self.context.experimental._defer_metrics_transfer:
+            # Snapshot the metrics without waiting for the device; they are converted to NumPy
+            # together in _aggregate_training_metrics().
             for name, metric in training_metrics.items():
-                # Convert PyTorch metric values to NumPy, so that
-                # `det.util.encode_json` handles them properly without
-                # needing a dependency on PyTorch.
                 if isinstance(metric, torch.Tensor):
-                    metric = metric.cpu().detach().numpy()
-                training_metrics[name] = metric
+                    training_metrics[name] = metric.detach().clone()
+        else:
+            with self.prof.record_timing("from_device"):
+                for name, metric in training_metrics.items():
+                    # Convert PyTorch metric values to NumPy, so that
+                    # `det.util.encode_json` handles them properly without
+                    # needing a dependency on PyTorch.
+                    if isinstance(metric, torch.Tensor):
+                        metric = metric.cpu().detach().numpy()
+                    training_metrics[name] = metric
 
         batch_dur = time.time() - batch_start_time
         samples_per_second = self.trial.get_batch_length(batch) / batch_dur
@@ -917,15 +980,24 @@ class _PyTorchTrialController:
         if self._evaluate_batch_defined():
             keys = None
             batch_metrics = []
+            metrics_reducers = None  # type: Optional[Dict[str, pytorch.Reducer]]
+            # Reduce metrics as they are evaluated, unless a callback needs every batch's metrics.
+            streaming = not any(
+                util.is_overridden(c.on_validation_epoch_end, pytorch.PyTorchCallback)
+                for c in self.callbacks.values()
+            )
+            streaming_reducer = None  # type: Optional[pytorch._StreamingMetricsReducer]
 
             assert isinstance(self.validation_loader, torch.utils.data.DataLoader)
-            if len(self.validation_loader) == 0:
+            if _known_len(self.validation_loader) == 0:
                 raise RuntimeError("validation_loader is empty.")
             for callback in self.callbacks.values():
                 callback.on_validation_epoch_start()
 
-            for idx, batch in enumerate(iter(self.validation_loader)):
-                if self.context.experimental._auto_to_device:
+            local_batches = 0
+            for idx, batch in enumerate(self._prefetch(iter(self.validation_loader))):
+                local_batches += 1
+                if self.context.experimental._auto_to_device and not self._prefetching():
                     with self.prof.record_timing("to_device", accumulate=True):
                         batch = self.context.to_device(batch)
                 num_inputs += self.trial.get_batch_length(batch)
@@ -937,6 +1009,11 @@ class _PyTorchTrialController:
                 # Verify validation metric names are the same across batches.
                 if keys is None:
                     keys = vld_metrics.keys()
+                    metrics_reducers = pytorch._prepare_metrics_reducers(
+                        self.trial.evaluation_reducer(), keys=keys
+                    )
+                    if streaming:
+                        streaming_reducer = pytorch._StreamingMetricsReducer(metrics_reducers)
                 else:
                     if keys != vld_metrics.keys():
                         raise ValueError(
@@ -950,25 +1027,53 @@ class _PyTorchTrialController:
                         "metrics; "
                         f"got {vld_metrics}.",
                     )
-                # TODO: For performance perform -> cpu() only at the end of validation.
-                batch_metrics.append(pytorch._convert_metrics_to_numpy(vld_metrics))
+                if streaming_reducer is not None:
+                    streaming_reducer.update(vld_metrics)
+                else:
+                    batch_metrics.append(pytorch._convert_metrics_to_numpy(vld_metrics))
                 if self.test_mode:
                     break
 
+            if _known_len(self.validation_loader) is None:
+                # A streaming loader may give a rank no batches at all, e.g. when there are fewer
+                # shards than readers.  That rank still takes part in reducing the metrics, with
+                # the metric names of the other ranks.
+                all_keys = self.context.distributed.allgather(
+                    list(keys) if keys is not None else None
+                )
+                other_keys = [k for k in all_keys if k is not None]
+                if not other_keys:
+                    raise RuntimeError("validation_loader is empty.")
+                if keys is None:
+                    keys = dict.fromkeys(other_keys[0]).keys()
+                    metrics_reducers = pytorch._prepare_metrics_reducers(
+                        self.trial.evaluation_reducer(), keys=keys
+                    )
+                    if streaming:
+                        streaming_reducer = pytorch._StreamingMetricsReducer(metrics_reducers)
+
             for callback in self.callbacks.values():
                 callback.on_validation_epoch_end(batch_metrics)
 
-            metrics = pytorch._reduce_metrics(
-                self.context.distributed,
-                batch_metrics=batch_metrics,
-                keys=keys,
-                metrics_reducers=pytorch._prepare_metrics_reducers(
-                    self.trial.evaluation_reducer(), keys=keys
-                ),
-            )
+            assert metrics_reducers is not None
+            if streaming_reducer is not None:
+                metrics = pytorch._reduce_metrics_across_processes(
+                    self.context.distributed,
+                    streaming_reducer.reduce(),
+                    streaming_reducer.num_batches,
+                    keys,
+                    metrics_reducers,
+                )
+            else:
+                metrics = pytorch._reduce_metrics(
+                    self.context.distributed,
+                    batch_metrics=batch_metrics,
+                    keys=keys,
+                    metrics_reducers=metrics_reducers,
+                )
 
             # Gather a list of per-worker (num_inputs, num_batches) tuples.
-            input_counts = self.context.distributed.gather((num_inputs, idx + 1))
+            input_counts = self.context.distributed.gather((num_inputs, local_batches))
             if self.is_chief:
                 assert input_counts is not None
                 # Reshape and sum.
@@ -986,7 +1091,9 @@ class _PyTorchTrialController:
                     )
 
                 metrics = pytorch._convert_metrics_to_numpy(metrics)
-                num_inputs = self.context.get_per_slot_batch_size() * len(self.validation_loader)
+                num_inputs = self.context.get_per_slot_batch_size() * (
+                    _known_len(self.validation_loader) or 0
+                )
 
         metrics.update(
             pytorch._convert_metrics_to_numpy(self.context.reduce_metrics(for_training=False))
@@ -1074,11 +1181,15 @@ class _PyTorchTrialController:
         ]
 
         checkpoint: Optional[Dict[str, Any]] = None
-        for ckpt_path in potential_paths:
-            maybe_ckpt = load_path.joinpath(*ckpt_path)
-            if maybe_ckpt.exists():
-                checkpoint = torch.load(str(maybe_ckpt), map_location="cpu")  # type: ignore
-                break
+        tensor_file = _tensor_file.exists(load_path)
+        if tensor_file:
+            checkpoint = _tensor_file.load(load_path)
+        else:
+            for ckpt_path in potential_paths:
+                maybe_ckpt = load_path.joinpath(*ckpt_path)
+                if maybe_ckpt.exists():
+                    checkpoint = torch.load(str(maybe_ckpt), map_location="cpu")  # type: ignore
+                    break
 
         if checkpoint is None or not isinstance(checkpoint, dict):
             return
@@ -1131,6 +1242,13 @@ class _PyTorchTrialController:
         else:
             for idx, optimizer in enumerate(self.context.optimizers):
                 optimizer.load_state_dict(checkpoint["optimizers_state_dict"][idx])
+                if tensor_file:
+                    # Optimizers keep CPU tensors as they are loaded, so copy them out of the
+                    # memory-mapped checkpoint, which may be deleted while training continues.
+                    for state in optimizer.state.values():
+                        for key, value in state.items():
+                            if isinstance(value, torch.Tensor) and value.device.type == "cpu":
+                                state[key] = value.clone()
 
         if "lr_scheduler" in checkpoint:
             # Backward compatible with older checkpoint format.
@@ -1219,6 +1337,27 @@ class _PyTorchTrialController:
                 with wlsq_path.open("rb") as f:
                     self._load_wlsq_state(pickle.load(f))
 
+    def _load_stream_state(self, load_path: Optional[pathlib.Path]) -> Optional[Dict[str, Any]]:
+        """
+        Return this process's positions in the shards of a StreamingDataset from a checkpoint.
+        """
+        if load_path is None or not load_path.joinpath("stream_state.pkl").exists():
+            return None
+        with load_path.joinpath("stream_state.pkl").open("rb") as f:
+            state = pickle.load(f)
+
+        # Like the trial state, saved positions only apply when continuing the same trial.
+        if state["trial_id"] != self.trial_id:
+            return None
+        if len(state["ranks"]) != self.context.distributed.size:
+            logging.warning(
+                f"The checkpoint has StreamingDataset positions for {len(state['ranks'])} "
+                f"training processes, but there are {self.context.distributed.size} now; the "
+                "training data will be read from the start of its shards."
+            )
+            return None
+        return cast(Dict[str, Any], state["ranks"][self.context.distributed.rank])
+
     def _load_state(self, state: Any) -> None:
         # Load our state from the checkpoint if we are continuing training after a pause or restart.
         # If the trial_id doesn't match our current trial id, we're continuing training a previous
@@ -1255,7 +1394,7 @@ class _PyTorchTrialController:
         if self.state.batches_trained == self.val_from_previous_run:
             self.state.last_val = self.state.batches_trained
 
-    def _save(self, path: pathlib.Path) -> None:
+    def _save(self, path: pathlib.Path, stream_states: Optional[List[Any]] = None) -> None:
         path.mkdir(parents=True, exist_ok=True)
 
         util.write_user_code(path, not self.local_training)
@@ -1297,11 +1436,18 @@ class _PyTorchTrialController:
         for callback in self.callbacks.values():
             callback.on_checkpoint_save_start(checkpoint)
 
-        torch.save(checkpoint, str(path.joinpath("state_dict.pth")))
+        if self.context.experimental._tensor_file_checkpoints:
+            _tensor_file.save(checkpoint, path)
+        else:
+            torch.save(checkpoint, str(path.joinpath("state_dict.pth")))
 
         with path.joinpath("trial_state.pkl").open("wb") as f:
             pickle.dump(vars(self.state), f)
 
+        if stream_states is not None:
+            with path.joinpath("stream_state.pkl").open("wb") as f:
+                pickle.dump({"trial_id": self.trial_id, "ranks": stream_states}, f)
+
         trial_cls = type(self.trial)
         with open(path.joinpath("load_data.json"), "w") as f2:
             try:
@@ -0,0 +1,169 @@
+import collections
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Sequence, Tuple
+
+import torch
+
+# The position of one reader in its shards: the index of the shard it is reading, and the offset
+# returned by read_shard() for the last record it read from that shard.
+_ReaderPosition = Tuple[int, Any]
+
+
+class StreamingDataset(torch.utils.data.IterableDataset):
+    """
+    StreamingDataset is the base class for datasets which are read sequentially from a list of
+    shards, like files in object storage, rather than by random access.
+
+    A StreamingDataset can be passed to :class:`determined.pytorch.DataLoader` in place of a
+    map-style ``Dataset``. The shards are divided round-robin between the dataloader workers of
+    every training process, and each shard is read by exactly one of them, so there should be at
+    least ``slots_per_trial * num_workers`` shards. Training repeats through the shards
+    indefinitely, while validation reads each shard once.
+
+    Along with each record, :meth:`read_shard` returns the offset of that record in its shard,
+    like a byte offset in a file. The offsets reached by the records that have been trained on are
+    saved in every checkpoint, and continuing training seeks directly to them, without re-reading
+    any data.
+
+    Subclasses must implement :meth:`shards` and :meth:`read_shard`:
+
+    .. code:: python
+
+        class JSONLinesDataset(det.pytorch.StreamingDataset):
+            def __init__(self, paths):
+                self.paths = paths
+
+            def shards(self):
+                return self.paths
+
+            def read_shard(self, shard, offset):
+                with open(shard, "rb") as f:
+                    f.seek(offset or 0)
+                    for line in iter(f.readline, b""):
+                        yield json.loads(line), f.tell()
+    """
+
+    def shards(self) -> Sequence[Any]:
+        """
+        Return the shards of the dataset, in the same order every time.
+        """
+        raise NotImplementedError
+
+    def read_shard(self, shard: Any, offset: Optional[Any]) -> Iterator[Tuple[Any, Any]]:
+        """
+        Yield ``(record, offset)`` tuples from a shard, starting from the beginning of the shard
+        when ``offset`` is ``None``.
+
+        Each offset must be picklable, and ``read_shard(shard, offset)`` must continue with the
+        record that follows the one which that offset was returned with.
+        """
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator:
+        for shard in self.shards():
+            for record, _ in self.read_shard(shard, None):
+                yield record
+
+
+def _passthrough(batch: Any) -> Any:
+    return batch
+
+
+class _ShardedStream(torch.utils.data.IterableDataset):
+    """
+    _ShardedStream reads the shards of a StreamingDataset which belong to one training process.
+
+    Each dataloader worker is a separate reader of its own shards, and yields collated batches
+    along with its reader id and its position after the last record of the batch.
+    """
+
+    def __init__(
+        self,
+        dataset: StreamingDataset,
+        batch_size: Optional[int],
+        drop_last: bool,
+        collate_fn: Callable,
+        repeat: bool,
+        num_replicas: int,
+        rank: int,
+        num_workers: int,
+        positions: Dict[int, _ReaderPosition],
+    ) -> None:
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.drop_last = drop_last
+        self.collate_fn = collate_fn
+        self.repeat = repeat
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.num_workers = num_workers
+        self.positions = positions
+
+    @property
+    def num_readers(self) -> int:
+        return self.num_replicas * self.num_workers
+
+    def __iter__(self) -> Iterator[Tuple[Any, int, _ReaderPosition]]:
+        worker_info = torch.utils.data.get_worker_info()  # type: ignore
+        reader = self.rank * self.num_workers + (worker_info.id if worker_info else 0)
+        shards = list(self.dataset.shards())[reader :: self.num_readers]
+        shard_idx, offset = self.positions.get(reader, (0, None))
+
+        records = []
+        while shards:
+            full_pass = shard_idx == 0 and offset is None
+            read_any = False
+            while shard_idx < len(shards):
+                for record, offset in self.dataset.read_shard(shards[shard_idx], offset):
+                    read_any = True
+                    if self.batch_size is None:
+                        # Without auto-collation, every record is a batch of its own.
+                        yield self.collate_fn(record), reader, (shard_idx, offset)
+                        continue
+                    records.append(record)
+                    if len(records) == self.batch_size:
+                        yield self.collate_fn(records), reader, (shard_idx, offset)
+                        records = []
+                shard_idx, offset = shard_idx + 1, None
+            # Stop after a full pass through empty shards too, rather than spinning forever.
+            if not self.repeat or (full_pass and not read_any):
+                break
+            shard_idx = 0
+
+        if records and not self.drop_last:
+            yield self.collate_fn(records), reader, (shard_idx, offset)
+
+
+class _StreamingDataLoader(torch.utils.data.DataLoader):
+    """
+    _StreamingDataLoader is the torch DataLoader which det.pytorch.DataLoader builds for a
+    StreamingDataset.  It strips reader positions from the batches it yields, and, when tracking,
+    keeps the position of every reader as of the last batch which has been trained on.
+
+    Batches are trained on some time after they are yielded, since they may be prefetched, so the
+    positions of yielded batches wait in a queue until _commit_batch() is called for them.
+    """
+
+    def __init__(self, stream: _ShardedStream, skip: int, track: bool, **kwargs: Any) -> None:
+        super().__init__(stream, batch_size=None, collate_fn=_passthrough, **kwargs)
+        self._num_readers = stream.num_readers
+        self._skip = skip
+        self._track = track
+        self._positions = dict(stream.positions)
+        self._pending: Deque[Tuple[int, _ReaderPosition]] = collections.deque()
+
+    def __iter__(self) -> Iterator:  # type: ignore
+        batches = super().__iter__()
+        skip, self._skip = self._skip, 0
+        for _ in range(skip):
+            next(batches, None)
+        for batch, reader, position in batches:
+            if self._track:
+                self._pending.append((reader, position))
+            yield batch
+
+    def _commit_batch(self) -> None:
+        reader, position = self._pending.popleft()
+        self._positions[reader] = position
+
+    def _state_dict(self) -> Dict[str, Any]:
+        return {"num_readers": self._num_readers, "positions": dict(self._positions)}
@@ -0,0 +1,129 @@
+import collections
+import concurrent.futures
+import mmap
+import os
+import pathlib
+from typing import Any, Callable, Dict, List, Tuple
+
+import torch
+
+TENSORS_FILE = "state_dict.tensors"
+INDEX_FILE = "state_dict.index"
+
+# Every tensor starts at a multiple of this many bytes in the tensors file, so that the
+# memory-mapped tensors are aligned for any dtype and for vectorized copies.
+ALIGNMENT = 64
+
+# Number of threads writing tensors into the tensors file at once.
+WRITE_THREADS = 8
+
+
+class _TensorRef:
+    """A placeholder in the index for a tensor stored in the tensors file."""
+
+    def __init__(self, offset: int, dtype: str, shape: Tuple[int, ...]) -> None:
+        self.offset = offset
+        self.dtype = dtype
+        self.shape = shape
+
+
+def _is_plain(tensor: torch.Tensor) -> bool:
+    return tensor.layout == torch.strided and not tensor.is_quantized
+
+
+def _map_containers(obj: Any, fn: Callable[[Any], Any]) -> Any:
+    """Apply fn to the values of a dict, list, or tuple, or return None for other objects."""
+    if type(obj) in (dict, collections.OrderedDict):
+        new = type(obj)((k, fn(v)) for k, v in obj.items())
+        # Module state_dicts keep version information in their _metadata attribute.
+        if hasattr(obj, "__dict__"):
+            new.__dict__.update(obj.__dict__)
+        return new
+    if type(obj) in (list, tuple):
+        return type(obj)(fn(v) for v in obj)
+    return None
+
+
+def _flatten(
+    obj: Any, tensors: List[Tuple[int, torch.Tensor]], refs: Dict[int, _TensorRef], size: List[int]
+) -> Any:
+    """
+    Copy the nested containers of obj, replacing tensors with _TensorRefs and assigning each
+    tensor an offset in the tensors file.  Other objects, including tensors which are not plain
+    strided tensors, are left to be pickled into the index.
+    """
+    if isinstance(obj, torch.Tensor) and _is_plain(obj):
+        # Tensors which appear more than once, like tied weights, are only stored once.
+        if id(obj) not in refs:
+            offset = -(-size[0] // ALIGNMENT) * ALIGNMENT
+            refs[id(obj)] = _TensorRef(offset, str(obj.dtype).split(".")[-1], tuple(obj.shape))
+            tensors.append((offset, obj))
+            size[0] = offset + obj.numel() * obj.element_size()
+        return refs[id(obj)]
+    new = _map_containers(obj, lambda v: _flatten(v, tensors, refs, size))
+    return obj if new is None else new
+
+
+def save(obj: Any, path: pathlib.Path) -> None:
+    """
+    Save obj, a nested structure of dicts, lists, and tuples like a trial's checkpoint, as a flat
+    file of tensors and an index of everything else, which are both written into directory path.
+
+    Tensors are copied to the host and written into the tensors file in parallel.
+    """
+    tensors = []  # type: List[Tuple[int, torch.Tensor]]
+    size = [0]
+    index = _flatten(obj, tensors, {}, size)
+
+    with path.joinpath(TENSORS_FILE).open("wb") as f:
+        f.truncate(size[0])
+        fd = f.fileno()
+
+        def write(offset: int, tensor: torch.Tensor) -> None:
+            data = tensor.detach().cpu().contiguous().reshape(-1).view(torch.uint8).numpy()
+            written = 0
+            while written < len(data):
+                written += os.pwrite(fd, data[written:], offset + written)
+
+        with concurrent.futures.ThreadPoolExecutor(WRITE_THREADS) as pool:
+            for future in [pool.submit(write, *t) for t in tensors]:
+                future.result()
+
+    # Tensors which were not flattened still need torch's pickling.
+    torch.save(index, str(path.joinpath(INDEX_FILE)))
+
+
+def _unflatten(obj: Any, buf: mmap.mmap) -> Any:
+    if isinstance(obj, _TensorRef):
+        dtype = getattr(torch, obj.dtype)
+        count = 1
+        for dim in obj.shape:
+            count *= dim
+        if count == 0:
+            return torch.empty(obj.shape, dtype=dtype)
+        return torch.frombuffer(buf, dtype=dtype, count=count, offset=obj.offset).view(obj.shape)
+    new = _map_containers(obj, lambda v: _unflatten(v, buf))
+    return obj if new is None else new
+
+
+def load(path: pathlib.Path) -> Any:
+    """
+    Load an object saved by save() from directory path.
+
+    The tensors are CPU tensors backed by a copy-on-write memory map of the tensors file, so their
+    data is only read from disk as it is used, and modifying them does not change the file.
+    """
+    index = torch.load(str(path.joinpath(INDEX_FILE)), map_location="cpu")  # type: ignore
+
+    with path.joinpath(TENSORS_FILE).open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap can't map an empty file, but then there are no non-empty tensors to read.
+            buf = mmap.mmap(-1, 1)
+        else:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    return _unflatten(index, buf)
+
+
+def exists(path: pathlib.Path) -> bool:
+    return path.joinpath(INDEX_FILE).exists()
@@ -1,9 +1,103 @@
-from typing import Iterator
+import collections
+import itertools
+from typing import Any, Iterator, List, cast
 
 import numpy as np
 import torch
 
 
+def _iter_from(sampler: Any, start: int) -> Iterator:
+    """
+    Equivalent to itertools.islice(iter(sampler), start, None).
+
+    Samplers which define _iter_from() compute the position to start from directly, so that
+    skipping ahead when continuing training does not depend on how far training had progressed.
+    Other samplers are advanced without yielding the skipped items.
+    """
+    if hasattr(sampler, "_iter_from"):
+        return cast(Iterator, sampler._iter_from(start))
+    if type(sampler) is torch.utils.data.SequentialSampler:
+        return iter(range(start, len(sampler)))
+    if _is_seeded_random_sampler(sampler):
+        return _random_sampler_from(sampler, start)
+    if type(sampler) is torch.utils.data.BatchSampler:
+        return _batch(
+            _iter_from(sampler.sampler, start * sampler.batch_size),
+            sampler.batch_size,
+            sampler.drop_last,
+        )
+    return itertools.islice(iter(sampler), start, None)
+
+
+def _skip_epoch(sampler: Any) -> None:
+    """
+    Equivalent to exhausting iter(sampler), for samplers whose order depends on how many epochs
+    they have already been iterated through.
+    """
+    if hasattr(sampler, "_skip_epoch"):
+        sampler._skip_epoch()
+    elif type(sampler) is torch.utils.data.SequentialSampler:
+        pass
+    elif _is_seeded_random_sampler(sampler):
+        # Every permutation is drawn, but only the empty slices past the end are converted.
+        collections.deque(_random_sampler_from(sampler, sampler.num_samples), maxlen=0)
+    elif type(sampler) is torch.utils.data.BatchSampler:
+        _skip_epoch(sampler.sampler)
+    else:
+        collections.deque(iter(sampler), maxlen=0)
+
+
+def _is_seeded_random_sampler(sampler: Any) -> bool:
+    return (
+        type(sampler) is torch.utils.data.RandomSampler
+        and not sampler.replacement
+        and sampler.generator is not None
+    )
+
+
+def _random_sampler_from(sampler: torch.utils.data.RandomSampler, start: int) -> Iterator:
+    """
+    Equivalent to itertools.islice(iter(sampler), start, None) for a RandomSampler without
+    replacement and with its own generator.
+
+    Like RandomSampler.__iter__, this draws num_samples // n permutations of range(n) followed by
+    one more for the remaining num_samples % n samples, so the generator ends up in the same state.
+    Permutations which are skipped entirely are drawn but never converted to lists.
+    """
+    n = len(sampler.data_source)
+    num_samples = sampler.num_samples
+    sizes = [n] * (num_samples // n) + [num_samples % n]
+    for size in sizes:
+        perm = torch.randperm(n, generator=sampler.generator)
+        if start >= size:
+            start -= size
+            continue
+        yield from perm[start:size].tolist()
+        start = 0
+
+
+def _batch(sample_iter: Iterator, batch_size: int, drop_last: bool) -> Iterator[List]:
+    """Group indices into batches, like torch.utils.data.BatchSampler does."""
+    while True:
+        batch = list(itertools.islice(sample_iter, batch_size))
+        if not batch or (drop_last and len(batch) < batch_size):
+            return
+        yield batch
+
+
+def _repeat_from(sampler: Any, start: int) -> Iterator:
+    """Seek to position start in the infinite stream of repeating sampler."""
+    length = len(sampler)
+    if length == 0:
+        return
+    epochs, start = divmod(start, length)
+    for _ in range(epochs):
+        _skip_epoch(sampler)
+    yield from _iter_from(sampler, start)
+    while True:
+        yield from sampler
+
+
 class RepeatSampler(torch.utils.data.Sampler):
     """
     RepeatSampler yields infinite batches indices by repeatedly iterating
@@ -21,6 +115,9 @@ class RepeatSampler(torch.utils.data.Sampler):
         while True:
             yield from self._sampler
 
+    def _iter_from(self, start: int) -> Iterator:
+        return _repeat_from(self._sampler, start)
+
 
 class RepeatBatchSampler(torch.utils.data.BatchSampler):
     """
@@ -39,6 +136,9 @@ class RepeatBatchSampler(torch.utils.data.BatchSampler):
         while True:
             yield from self.batch_sampler
 
+    def _iter_from(self, start: int) -> Iterator:
+        return _repeat_from(self.batch_sampler, start)
+
 
 class DistributedSampler(torch.utils.data.Sampler):
     """
@@ -70,6 +170,14 @@ class DistributedSampler(torch.utils.data.Sampler):
                 if i % self._num_workers == self._rank:
                     yield batch
 
+    def _iter_from(self, start: int) -> Iterator:
+        # This shard's start'th sample is the underlying sampler's (rank + start * num_workers)'th.
+        iterator = _iter_from(self._sampler, self._rank + start * self._num_workers)
+        return itertools.islice(iterator, 0, None, self._num_workers)
+
+    def _skip_epoch(self) -> None:
+        _skip_epoch(self._sampler)
+
 
 class DistributedBatchSampler(torch.utils.data.BatchSampler):
     """
@@ -118,6 +226,13 @@ class DistributedBatchSampler(torch.utils.data.BatchSampler):
                 if i % self.num_workers == self.rank:
                     yield batch
 
+    def _iter_from(self, start: int) -> Iterator:
+        iterator = _iter_from(self.batch_sampler, self.rank + start * self.num_workers)
+        return itertools.islice(iterator, 0, None, self.num_workers)
+
+    def _skip_epoch(self) -> None:
+        _skip_epoch(self.batch_sampler)
+
 
 class SkipSampler(torch.utils.data.BatchSampler):
     """
@@ -148,13 +263,13 @@ class SkipSampler(torch.utils.data.BatchSampler):
         return len(self._sampler)
 
     def __iter__(self) -> Iterator:
-        iterator = iter(self._sampler)
-        for _ in range(self._skip):
-            try:
-                next(iterator)
-            except StopIteration:
-                return
-        yield from iterator
+        return _iter_from(self._sampler, self._skip)
+
+    def _iter_from(self, start: int) -> Iterator:
+        return _iter_from(self._sampler, self._skip + start)
+
+    def _skip_epoch(self) -> None:
+        _skip_epoch(self._sampler)
 
 
 class SkipBatchSampler(torch.utils.data.BatchSampler):
@@ -168,6 +283,10 @@ class SkipBatchSampler(torch.utils.data.BatchSampler):
     checkpoint during evaluation), and because the training dataset should always be repeated
     before applying the skip (so you only skip once rather than many times), the length reported
     is always the length of the underlying sampler, regardless of the size of the skip.
+
+    When the underlying samplers are the ones from this module, or torch's SequentialSampler and
+    BatchSampler, the position to continue from is computed directly, rather than by iterating
+    through every skipped batch.
     """
 
     def __init__(self, batch_sampler: torch.utils.data.BatchSampler, skip: int) -> None:
@@ -179,13 +298,13 @@ class SkipBatchSampler(torch.utils.data.BatchSampler):
         return len(self.batch_sampler)
 
     def __iter__(self) -> Iterator:
-        iterator = iter(self.batch_sampler)
-        for _ in range(self.skip):
-            try:
-                next(iterator)
-            except StopIteration:
-                return
-        yield from iterator
+        return _iter_from(self.batch_sampler, self.skip)
+
+    def _iter_from(self, start: int) -> Iterator:
+        return _iter_from(self.batch_sampler, self.skip + start)
+
+    def _skip_epoch(self) -> None:
+        _skip_epoch(self.batch_sampler)
 
 
 class ReproducibleShuffleSampler(torch.utils.data.Sampler):
@@ -208,6 +327,12 @@ class ReproducibleShuffleSampler(torch.utils.data.Sampler):
         self._rng.shuffle(indices)
         return iter(indices)
 
+    def _skip_epoch(self) -> None:
+        # Shuffling an integer array draws the same random numbers as shuffling the list of indices
+        # in __iter__ would, without building that list.
+        _skip_epoch(self._sampler)
+        self._rng.shuffle(np.arange(len(self._sampler)))  # type: ignore
+
     def __len__(self) -> int:
         # Check the original sampler in case its length changes every epoch.
         # TODO: that would likely cause reproducibility issues.
@@ -240,6 +365,10 @@ class ReproducibleShuffleBatchSampler(torch.utils.data.Sampler):
         self._rng.shuffle(indices)
         return iter(indices)
 
+    def _skip_epoch(self) -> None:
+        _skip_epoch(self._batch_sampler)
+        self._rng.shuffle(np.arange(len(self._batch_sampler)))
+
     def __len__(self) -> int:
         # Check the original batch_sampler in case its length changes every epoch.
         # TODO: that would likely cause reproducibility issues.
@@ -1,20 +1,37 @@
 import abc
+import concurrent.futures
 import logging
+import os
 import pathlib
-import queue
 import threading
 import time
 from dataclasses import dataclass
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 from determined import tensorboard
 from determined.common import util
 
+# Number of Tensorboard files uploaded in parallel.
+DEFAULT_UPLOAD_WORKERS = 4
+
+# Environment variables (e.g. from environment_variables in the experiment config) which configure
+# background uploads; the checkpoint_storage schema has no place for them.
+UPLOAD_WORKERS_ENV = "DET_TENSORBOARD_UPLOAD_WORKERS"
+MIN_UPLOAD_INTERVAL_ENV = "DET_TENSORBOARD_MIN_UPLOAD_INTERVAL"
+
 
 @dataclass
 class PathUploadInfo:
     path: pathlib.Path
     mangled_relative_path: pathlib.Path
+    # The number of leading bytes of an append-only file which are already uploaded.  Managers
+    # which can append to the uploaded file only need to upload the rest of it.
+    offset: int = 0
+
+
+def _is_append_only(path: pathlib.Path) -> bool:
+    # Tensorboard only ever appends to tfevents files.
+    return "tfevents" in path.name
 
 
 class TensorboardManager(metaclass=abc.ABCMeta):
@@ -27,6 +44,10 @@ class TensorboardManager(metaclass=abc.ABCMeta):
 
     Each supported persistent storage backend must define a subclass which
     implements the sync method.
+
+    With async_upload, files are uploaded in the background by `upload_workers` threads, at most
+    once every `min_upload_interval` seconds; the queue_depth and lag of upload_thread show how
+    far behind the uploads are.
     """
 
     def __init__(
@@ -34,14 +55,41 @@ class TensorboardManager(metaclass=abc.ABCMeta):
         base_path: pathlib.Path,
         sync_path: pathlib.Path,
         async_upload: bool = True,
+        upload_workers: int = DEFAULT_UPLOAD_WORKERS,
+        min_upload_interval: float = 0.0,
     ) -> None:
         self.base_path = base_path
         self.sync_path = sync_path
         self.last_sync = 0.0
+        # The (inode, size, mtime) of each file as of when it was last synced.
+        self._synced: Dict[pathlib.Path, Tuple[int, int, int]] = {}
 
         self.upload_thread = None
         if async_upload:
-            self.upload_thread = _TensorboardUploadThread(self._sync_impl)
+            self.upload_thread = _TensorboardUploadThread(
+                self._upload, upload_workers, min_upload_interval
+            )
+
+    def _scan(self) -> Iterator[Tuple[pathlib.Path, os.stat_result]]:
+        """
+        Yield every file under base_path with its stat.  os.scandir reports file types without a
+        stat call, so each file costs a single stat.
+        """
+        dirs = [str(self.base_path)]
+        while dirs:
+            try:
+                with os.scandir(dirs.pop()) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                dirs.append(entry.path)
+                            elif entry.is_file():
+                                yield pathlib.Path(entry.path), entry.stat()
+                        except FileNotFoundError:
+                            # The file was removed while we were listing.
+                            continue
+            except FileNotFoundError:
+                continue
 
     def list_tb_files(
         self,
@@ -52,30 +100,46 @@ class TensorboardManager(metaclass=abc.ABCMeta):
         list_files returns Tensorboard-relevant file names located in the base_path directory
         and all sub-directories that have been modified since a certain time.
 
-        If many files have been created, the syscall to stat on each of them can be quite
-        expensive, taking on the order of 1ms for every 100 files. Each file gets stat'd every call
-        to this function, which can be a bottleneck late in training or in local training when many
-        files exist but few or none need to be re-synced.
+        sync() does not use this; it only uploads files which changed since they were last synced.
         """
 
         if not self.base_path.exists():
             logging.warning(f"{self.base_path} directory does not exist.")
             return []
-        return [
-            file
-            for file in self.base_path.rglob("*")
-            if file.stat().st_mtime > since and file.is_file() and selector(file)
-        ]
+        return [path for path, st in self._scan() if st.st_mtime > since and selector(path)]
+
+    def _changed_files(
+        self,
+        selector: Callable[[pathlib.Path], bool],
+    ) -> List[Tuple[pathlib.Path, int]]:
+        """
+        Return the files which changed since they were last synced, each with the offset from
+        which it needs to be uploaded: appended-to tfevents files only need their new bytes.
+        """
+        self.last_sync = time.time()
+        changed = []
+        for path, st in self._scan():
+            state = (st.st_ino, st.st_size, st.st_mtime_ns)
+            prev = self._synced.get(path)
+            if prev == state or not selector(path):
+                continue
+            offset = 0
+            if (
+                prev is not None
+                and _is_append_only(path)
+                and prev[0] == st.st_ino
+                and prev[1] <= st.st_size
+            ):
+                offset = prev[1]
+            self._synced[path] = state
+            changed.append((path, offset))
+        return changed
 
     def to_sync(
         self,
         selector: Callable[[pathlib.Path], bool],
     ) -> List[pathlib.Path]:
-        sync_start = time.time()
-        sync_paths = self.list_tb_files(self.last_sync, selector)
-        self.last_sync = sync_start
-
-        return sync_paths
+        return [path for path, _ in self._changed_files(selector)]
 
     @abc.abstractmethod
     def _sync_impl(self, path_info_list: List[PathUploadInfo]) -> None:
@@ -84,22 +148,34 @@ class TensorboardManager(metaclass=abc.ABCMeta):
         """
         pass
 
+    def _upload(self, path_info_list: List[PathUploadInfo]) -> None:
+        try:
+            self._sync_impl(path_info_list)
+        except Exception:
+            # Upload these files in full on the next sync.
+            for path_info in path_info_list:
+                self._synced.pop(path_info.path, None)
+            raise
+
     def sync(
         self,
         selector: Callable[[pathlib.Path], bool] = lambda _: True,
         mangler: Callable[[pathlib.Path, int], pathlib.Path] = lambda p, __: p,
         rank: int = 0,
     ) -> None:
-        paths = self.to_sync(selector)
         path_list = []
-        for path in paths:
+        for path, offset in self._changed_files(selector):
             relative_path = path.relative_to(self.base_path)
             mangled_relative_path = mangler(relative_path, rank)
-            path_list.append(PathUploadInfo(path=path, mangled_relative_path=mangled_relative_path))
+            path_list.append(
+                PathUploadInfo(
+                    path=path, mangled_relative_path=mangled_relative_path, offset=offset
+                )
+            )
         if self.upload_thread is not None and self.upload_thread.is_alive():
             self.upload_thread.upload(path_list)
         else:
-            util.preserve_random_state(self._sync_impl)(path_list)
+            util.preserve_random_state(self._upload)(path_list)
 
     @abc.abstractmethod
     def delete(self) -> None:
@@ -140,38 +216,100 @@ def get_metric_writer() -> tensorboard.BatchMetricWriter:
 
 
 class _TensorboardUploadThread(threading.Thread):
+    """
+    Upload Tensorboard files in the background.
+
+    Queued uploads of the same file are coalesced into a single upload of its latest version, and
+    queued files are uploaded by a pool of `workers` threads.  A new batch of uploads starts at
+    most once every `min_interval` seconds, so that frequent syncs of the same growing files don't
+    turn into redundant uploads.
+    """
+
     def __init__(
         self,
         upload_function: Callable[[List[PathUploadInfo]], None],
-        work_queue_max_size: int = 50,
+        workers: int = DEFAULT_UPLOAD_WORKERS,
+        min_interval: float = 0.0,
     ) -> None:
         self._upload_function = upload_function
+        self._workers = workers
+        self._min_interval = min_interval
 
-        self._work_queue: queue.Queue = queue.Queue(maxsize=work_queue_max_size)
+        self._cond = threading.Condition()
+        # Queued uploads by source and destination, with the time each was first queued.
+        self._pending: Dict[Tuple[pathlib.Path, pathlib.Path], Tuple[PathUploadInfo, float]] = {}
+        self._closing = False
 
         super().__init__()
 
-    def run(self) -> None:
-        while True:
-            path_info_list = self._work_queue.get()
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of files waiting to be uploaded.
+        """
+        with self._cond:
+            return len(self._pending)
 
-            # None is the sentinel value
-            # to signal the thread to exit
-            if path_info_list is None:
-                return
+    @property
+    def lag(self) -> float:
+        """
+        How long the oldest queued upload has been waiting, in seconds.
+        """
+        with self._cond:
+            if not self._pending:
+                return 0.0
+            return time.time() - min(queued for _, queued in self._pending.values())
+
+    def _next_batch(self, not_before: float) -> List[PathUploadInfo]:
+        with self._cond:
+            while not self._closing and (not self._pending or time.time() < not_before):
+                self._cond.wait(max(not_before - time.time(), 0) if self._pending else None)
+            if self._pending:
+                logging.debug(
+                    f"Uploading {len(self._pending)} Tensorboard files, {self.lag:.1f}s behind"
+                )
+            batch = [info for info, _ in self._pending.values()]
+            self._pending = {}
+            return batch
+
+    def _upload_one(self, path_info: PathUploadInfo) -> None:
+        # A failed upload must not stop the thread or the rest of the batch.
+        try:
+            self._upload_function([path_info])
+        except Exception as e:
+            logging.warning(f"Sync of Tensorboard file {path_info.path} failed with error: {e}")
 
-            # Try-catch is used to avoid exception from
-            # one failed sync attempt to cause the thread to exit.
-            try:
-                self._upload_function(path_info_list)
-            except Exception as e:
-                logging.warning(f"Sync of Tensorboard files failed with error: {e}")
+    def run(self) -> None:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="det-tensorboard-upload"
+        ) as pool:
+            last_batch = 0.0
+            while True:
+                batch = self._next_batch(last_batch + self._min_interval)
+                # An empty batch means that the thread was closed.
+                if not batch:
+                    return
+                last_batch = time.time()
+                list(pool.map(self._upload_one, batch))
 
     def upload(self, path_info_list: List[PathUploadInfo]) -> None:
-        self._work_queue.put(path_info_list)
+        with self._cond:
+            now = time.time()
+            for path_info in path_info_list:
+                key = (path_info.path, path_info.mangled_relative_path)
+                if key in self._pending:
+                    queued_info, queued = self._pending[key]
+                    # The queued upload never happened, so upload from its offset.
+                    path_info.offset = min(path_info.offset, queued_info.offset)
+                else:
+                    queued = now
+                self._pending[key] = (path_info, queued)
+            self._cond.notify()
 
     def close(self) -> None:
-        self._work_queue.put(None)
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
         while self.is_alive():
             logging.info("Waiting for Tensorboard files to finish uploading")
             self.join(10)
@@ -54,6 +54,9 @@ def build(
 
     container_path, if set, will replace the host_path when determining the storage_path for the
     SharedFSTensorboardManager.
+
+    The DET_TENSORBOARD_UPLOAD_WORKERS and DET_TENSORBOARD_MIN_UPLOAD_INTERVAL environment
+    variables configure the background upload of a manager with async_upload.
     """
     type_name = checkpoint_config.get("type")
 
@@ -64,6 +67,11 @@ def build(
         raise TypeError("`type` parameter of storage configuration must be a string")
 
     base_path = get_base_path(checkpoint_config)
+    upload_kwargs: Dict[str, Any] = {
+        "async_upload": async_upload,
+        "upload_workers": int(os.environ.get(base.UPLOAD_WORKERS_ENV, base.DEFAULT_UPLOAD_WORKERS)),
+        "min_upload_interval": float(os.environ.get(base.MIN_UPLOAD_INTERVAL_ENV, 0.0)),
+    }
 
     if trial_id:
         sync_path = get_sync_path(cluster_id, experiment_id, trial_id)
@@ -77,7 +85,7 @@ def build(
             _full_storage_path(host_path, storage_path, container_path),
             base_path,
             sync_path,
-            async_upload=async_upload,
+            **upload_kwargs,
         )
 
     elif type_name == "gcs":
@@ -86,7 +94,7 @@ def build(
             checkpoint_config.get("prefix", None),
             base_path,
             sync_path,
-            async_upload=async_upload,
+            **upload_kwargs,
         )
 
     elif type_name == "s3":
@@ -98,7 +106,7 @@ def build(
             checkpoint_config.get("prefix", None),
             base_path,
             sync_path,
-            async_upload=async_upload,
+            **upload_kwargs,
         )
 
     elif type_name == "azure":
@@ -114,7 +122,7 @@ def build(
             checkpoint_config.get("credential", None),
             base_path,
             sync_path,
-            async_upload=async_upload,
+            **upload_kwargs,
         )
 
     # Return the base_path.TensorboardManager for known but unsupported storage
@@ -127,7 +135,7 @@ def build(
             checkpoint_config.get("user"),
             base_path,
             sync_path,
-            async_upload=async_upload,
+            **upload_kwargs,
         )
 
     else:
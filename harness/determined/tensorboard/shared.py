@@ -39,7 +39,26 @@ class SharedFSTensorboardManager(base.TensorboardManager):
             pathlib.Path.mkdir(mangled_path.parent, parents=True, exist_ok=True)
             logger.debug(f"SharedFSTensorboardManager saving {path} to {mangled_path}")
 
+            if path_info.offset and self._append(path, mangled_path, path_info.offset):
+                continue
             shutil.copy(path, mangled_path)
 
+    @staticmethod
+    def _append(src: pathlib.Path, dst: pathlib.Path, offset: int) -> bool:
+        """
+        Copy the bytes of src after offset to dst, if dst already has the bytes before it.
+        """
+        try:
+            if dst.stat().st_size < offset:
+                return False
+        except FileNotFoundError:
+            return False
+        with src.open("rb") as fsrc, dst.open("r+b") as fdst:
+            fsrc.seek(offset)
+            fdst.seek(offset)
+            shutil.copyfileobj(fsrc, fdst)
+            fdst.truncate()
+        return True
+
     def delete(self) -> None:
         shutil.rmtree(self.shared_fs_base, False)
@@ -1,7 +1,9 @@
+import atexit
 import collections
 import contextlib
 import datetime
 import enum
+import gzip
 import inspect
 import json
 import logging
@@ -16,6 +18,8 @@ import signal
 import socket
 import stat
 import subprocess
+import tarfile
+import tempfile
 import time
 import uuid
 from typing import Any, Callable, Dict, Iterator, List, Optional, Set, SupportsFloat, Tuple, cast
@@ -23,6 +27,7 @@ from typing import Any, Callable, Dict, Iterator, List, Optional, Set, SupportsF
 import determined as det
 from determined import constants
 from determined.common import check, util
+from determined.common.constants import USER_CODE_ARCHIVE, USER_CODE_DIR
 
 
 @util.preserve_random_state
@@ -192,25 +197,92 @@ def json_encode(obj: Any, indent: Optional[str] = None, sort_keys: bool = False)
     return json.dumps(jsonable(obj), indent=indent, sort_keys=sort_keys)
 
 
+# Code archives which were already created by this process, by the directory they were created from.
+_user_code_archives: Dict[str, str] = {}
+
+
+def _write_user_code_archive(model_dir: str, archive: str) -> None:
+    """
+    Write model_dir into a gzipped tar archive.
+
+    The archive only depends on the contents of model_dir: entries are sorted, and timestamps and
+    owners are cleared.  With content-addressed checkpoint storage, every checkpoint of every trial
+    with the same code then references one stored copy of it.
+    """
+
+    def add(tf: tarfile.TarFile, path: str, arcname: str) -> None:
+        info = tf.gettarinfo(path, arcname)
+        if info is None:
+            # Sockets and other special files can't be archived (nor copied).
+            return
+        info.mtime = 0
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        if info.isreg():
+            with open(path, "rb") as f:
+                tf.addfile(info, f)
+        else:
+            tf.addfile(info)
+
+    with open(archive, "wb") as f, gzip.GzipFile("", "wb", 6, f, mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w", dereference=True) as tf:  # type: ignore
+            for root, dirs, files in os.walk(model_dir, followlinks=True):
+                dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+                rel_root = os.path.relpath(root, model_dir)
+                if rel_root != ".":
+                    add(tf, root, rel_root)
+                for name in sorted(f for f in files if f != "__pycache__"):
+                    arcname = os.path.normpath(os.path.join(rel_root, name))
+                    add(tf, os.path.join(root, name), arcname)
+
+
+def _user_code_archive(model_dir: str) -> str:
+    """
+    Snapshot model_dir into an archive once per process, and return its path.  Only use this for
+    directories which do not change while the process runs.
+    """
+    model_dir = os.path.abspath(model_dir)
+    if model_dir in _user_code_archives:
+        return _user_code_archives[model_dir]
+
+    tmp = tempfile.mkdtemp(prefix="det-code-")
+    atexit.register(shutil.rmtree, tmp, True)
+    archive = os.path.join(tmp, USER_CODE_ARCHIVE)
+    _write_user_code_archive(model_dir, archive)
+
+    _user_code_archives[model_dir] = archive
+    return archive
+
+
 def write_user_code(path: pathlib.Path, on_cluster: bool) -> None:
-    code_path = path.joinpath("code")
+    code_path = path.joinpath(USER_CODE_DIR)
+    archive_path = path.joinpath(USER_CODE_ARCHIVE)
 
-    # When restarting from checkpoint, it is possible that the code path is already present
+    # When restarting from checkpoint, it is possible that the code is already present
     # in the checkpoint directory. This happens for EstimatorTrial because we overwrite the
     # estimator model directory with the checkpoint folder at the start of training.
     if code_path.exists():
         shutil.rmtree(str(code_path))
+    if archive_path.exists():
+        archive_path.unlink()
 
     # Most models can only be restored from a checkpoint if the original code is present. However,
     # since it is rather common that users mount large, non-model files into their working directory
     # (like data or their entire HOME directory), when we are training on-cluster we use a
     # specially-prepared clean copy of the model rather than the working directory.
-    if on_cluster:
-        model_dir = constants.MANAGED_TRAINING_MODEL_COPY
-    else:
-        model_dir = "."
-    shutil.copytree(model_dir, code_path, ignore=shutil.ignore_patterns("__pycache__"))
-    os.chmod(code_path, 0o755)
+    # Loading a checkpoint restores the code directory from its archive with extract_user_code().
+    if not on_cluster:
+        # The working directory may change between checkpoints, e.g. in a notebook.
+        _write_user_code_archive(".", str(archive_path))
+        return
+
+    # The model copy never changes, so it is only snapshotted once per trial, and every checkpoint
+    # shares the same archive.
+    archive = _user_code_archive(constants.MANAGED_TRAINING_MODEL_COPY)
+    try:
+        os.link(archive, archive_path)
+    except OSError:
+        shutil.copyfile(archive, archive_path)
 
 
 def filter_duplicates(
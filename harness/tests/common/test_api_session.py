@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import http.server
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import pytest
+
+from determined.common import api
+
+N_REQUESTS = 5
+
+
+@contextlib.contextmanager
+def run_counting_server(connections: List[int], paths: Optional[List[str]] = None) -> Iterator[str]:
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            connections.append(1)
+
+        def do_GET(self) -> None:
+            if paths is not None:
+                paths.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        do_POST = do_GET
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=[0.1])
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+@pytest.mark.parametrize("keep_alive", [True, False])
+def test_session_reuses_connections(keep_alive: bool) -> None:
+    connections: List[int] = []
+    with run_counting_server(connections) as master_url:
+        with api.Session(master_url, None, None, None, keep_alive=keep_alive) as sess:
+            for _ in range(N_REQUESTS):
+                sess.get("/api/v1/me", headers={"Authorization": "Bearer token"})
+
+    assert len(connections) == (1 if keep_alive else N_REQUESTS)
+
+
+def test_session_cache() -> None:
+    paths: List[str] = []
+    with run_counting_server([], paths) as master_url:
+        sess = api.Session(master_url, None, None, None, cache_ttl=1)
+        for _ in range(3):
+            sess.get("/api/v1/experiments/1")
+            sess.get("/api/v1/experiments", params={"offset": 100})
+        assert paths == ["/api/v1/experiments/1", "/api/v1/experiments?offset=100"]
+
+        # Changes clear the cache.
+        sess.post("/api/v1/experiments/1/archive")
+        sess.get("/api/v1/experiments/1")
+        assert paths[2:] == ["/api/v1/experiments/1/archive", "/api/v1/experiments/1"]
+
+        # Responses expire after the ttl.
+        time.sleep(1.1)
+        sess.get("/api/v1/experiments/1")
+        assert paths[4:] == ["/api/v1/experiments/1"]
+
+        # Caching is opt-in.
+        sess = api.Session(master_url, None, None, None)
+        sess.get("/api/v1/experiments/1")
+        sess.get("/api/v1/experiments/1")
+        assert len(paths) == 7
+
+
+def test_async_session() -> None:
+    def get_thing(session: api.Session, *, thing: int) -> Dict[str, Any]:
+        return dict(session.get(f"/api/v1/things/{thing}").json(), thing=thing)
+
+    def get_stream(session: api.Session, *, count: int) -> Iterator[int]:
+        for i in range(count):
+            yield session.get("/api/v1/things").json().get("i", i)
+
+    async def run(sess: api.Session) -> None:
+        async with api.AsyncSession(sess) as asess:
+            results = await asyncio.gather(
+                *(asess.call(get_thing, thing=i) for i in range(N_REQUESTS))
+            )
+            assert [r["thing"] for r in results] == list(range(N_REQUESTS))
+
+            assert [i async for i in asess.stream(get_stream, count=3)] == [0, 1, 2]
+
+            resp = await asess.get("/api/v1/me")
+            assert resp.json() == {}
+
+    connections: List[int] = []
+    with run_counting_server(connections) as master_url:
+        with api.Session(master_url, None, None, None, pool_maxsize=4) as sess:
+            asyncio.run(run(sess))
+    # Concurrent requests share the pooled connections, since there are no more request threads.
+    assert len(connections) <= 4
@@ -0,0 +1,38 @@
+import threading
+from typing import List
+
+import pytest
+
+from determined.common import api
+from determined.common.api import bindings
+
+TOTAL = 95
+PAGE_SIZE = 10
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_read_paginated(max_concurrency: int) -> None:
+    offsets: List[int] = []
+    lock = threading.Lock()
+
+    def get_with_offset(offset: int) -> bindings.v1GetModelsResponse:
+        with lock:
+            offsets.append(offset)
+        end = min(offset + PAGE_SIZE, TOTAL)
+        return bindings.v1GetModelsResponse(
+            models=[],
+            pagination=bindings.v1Pagination(
+                offset=offset, startIndex=offset, endIndex=end, total=TOTAL
+            ),
+        )
+
+    resps = list(api.read_paginated(get_with_offset, max_concurrency=max_concurrency))
+
+    # Pages are returned in order, each fetched once.
+    expected = list(range(0, TOTAL, PAGE_SIZE))
+    assert [r.pagination.offset for r in resps if r.pagination] == expected
+    assert sorted(offsets) == expected
+
+    offsets.clear()
+    resps = list(api.read_paginated(get_with_offset, offset=20, pages=api.PageOpts.single))
+    assert offsets == [20]
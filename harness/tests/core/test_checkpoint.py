@@ -1,5 +1,9 @@
 import contextlib
+import json
+import os
 import pathlib
+import threading
+import time
 from typing import Any, Callable, Dict, Iterator, List, Optional
 from unittest import mock
 
@@ -7,7 +11,10 @@ import pytest
 import requests
 
 from determined import core
+from determined.common import storage
+from determined.common.storage import cloud
 from tests import parallel
+from tests.storage import util as storage_util
 
 
 def make_mock_storage_manager(basedir: pathlib.Path) -> Any:
@@ -29,6 +36,7 @@ def make_mock_storage_manager(basedir: pathlib.Path) -> Any:
     storage_manager.store_path = mock.MagicMock(side_effect=store_path)
     storage_manager.restore_path = mock.MagicMock(side_effect=restore_path)
     storage_manager._list_directory = mock.MagicMock(return_value={"one": 1, "two": 2})
+    storage_manager._evicted_resources = mock.MagicMock(return_value={})
 
     return storage_manager
 
@@ -221,3 +229,197 @@ def test_merge_metadata(
     merged, conflicts = core._checkpoint.merge_metadata(metadata)
     assert conflicts == expected_conflicts
     assert merged == expected_merged
+
+
+def test_async_upload(tmp_path: pathlib.Path) -> None:
+    storage_manager = storage.SharedFSStorageManager(str(tmp_path.joinpath("storage")))
+    real_upload = storage_manager.upload
+    release = threading.Event()
+
+    def slow_upload(*args: Any, **kwargs: Any) -> None:
+        assert release.wait(10)
+        real_upload(*args, **kwargs)
+
+    storage_manager.upload = mock.MagicMock(side_effect=slow_upload)  # type: ignore
+
+    session = mock.MagicMock()
+    response = requests.Response()
+    response.status_code = 200
+    session._do_request.return_value = response
+    checkpoint_context = core.CheckpointContext(
+        core.DummyDistributedContext(),
+        storage_manager,
+        session=session,
+        task_id="task-id",
+        allocation_id="allocation-id",
+        tbd_sync_mode=core.TensorboardMode.MANUAL,
+        tensorboard_manager=mock.MagicMock(),
+        async_upload=True,
+        max_in_flight_uploads=1,
+    )
+
+    ckpt_dir = tmp_path.joinpath("ckpt-dir")
+    ckpt_dir.mkdir()
+    ckpt_dir.joinpath("weights").write_text("first")
+
+    # upload() returns before the upload finishes, and ckpt_dir can be reused right away.
+    storage_id = checkpoint_context.upload(ckpt_dir, metadata={"steps_completed": 1})
+    ckpt_dir.joinpath("weights").write_text("second")
+    session._do_request.assert_not_called()
+
+    release.set()
+    checkpoint_context.flush()
+    session._do_request.assert_called_once()
+    stored = tmp_path.joinpath("storage", storage_id)
+    assert stored.joinpath("weights").read_text() == "first"
+    assert json.loads(stored.joinpath("metadata.json").read_text()) == {"steps_completed": 1}
+
+    # store_path() also finishes in the background.
+    with checkpoint_context.store_path(metadata={"steps_completed": 2}) as (path, storage_id):
+        path.joinpath("weights").write_text("third")
+    checkpoint_context.flush()
+    assert tmp_path.joinpath("storage", storage_id, "weights").read_text() == "third"
+    assert session._do_request.call_count == 2
+
+    # A failed upload is raised from the next flush.
+    storage_manager.upload.side_effect = ValueError("no space left")
+    storage_id = checkpoint_context.upload(ckpt_dir, metadata={"steps_completed": 3})
+    with pytest.raises(RuntimeError, match=f"upload of checkpoint {storage_id} failed"):
+        checkpoint_context.flush()
+    assert session._do_request.call_count == 2
+
+    checkpoint_context.close()
+
+
+def test_async_store_path_errors(tmp_path: pathlib.Path) -> None:
+    storage_manager = storage_util.LocalCloudStorageManager(
+        str(tmp_path.joinpath("tmp")), tmp_path.joinpath("remote")
+    )
+    flush_metrics = mock.MagicMock()
+    checkpoint_context = core.CheckpointContext(
+        core.DummyDistributedContext(),
+        storage_manager,
+        session=mock.MagicMock(),
+        task_id="task-id",
+        allocation_id="allocation-id",
+        tbd_sync_mode=core.TensorboardMode.MANUAL,
+        tensorboard_manager=mock.MagicMock(),
+        async_upload=True,
+        flush_metrics=flush_metrics,
+    )
+
+    # Metrics are flushed by the caller, before the upload is queued.
+    with mock.patch.object(core._checkpoint.bindings, "post_ReportCheckpoint") as report:
+        flush_metrics.side_effect = RuntimeError("reporting metrics to the master failed")
+        with pytest.raises(RuntimeError, match="reporting metrics"):
+            with checkpoint_context.store_path(metadata={"steps_completed": 1}) as (path, _):
+                path.joinpath("weights").write_text("first")
+        assert not path.exists()
+
+        flush_metrics.side_effect = None
+        with checkpoint_context.store_path(metadata={"steps_completed": 2}) as (path, _):
+            path.joinpath("weights").write_text("second")
+        checkpoint_context.flush()
+        assert flush_metrics.call_count == 2
+        report.assert_called_once()
+
+    # An error in the with block removes the local directory.
+    with pytest.raises(ValueError):
+        with checkpoint_context.store_path(metadata={"steps_completed": 3}) as (path, _):
+            path.joinpath("weights").write_text("third")
+            raise ValueError("out of memory")
+    assert not path.exists()
+
+    checkpoint_context.close()
+
+
+def test_store_path_reports_evicted_files(tmp_path: pathlib.Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(cloud, "STREAMING_POLL_INTERVAL", 0.01)
+    remote = tmp_path.joinpath("remote")
+    storage_manager = storage_util.LocalCloudStorageManager(
+        str(tmp_path.joinpath("tmp")),
+        remote,
+        streaming_upload=True,
+        streaming_disk_budget=15,
+    )
+    checkpoint_context = core.CheckpointContext(
+        core.DummyDistributedContext(),
+        storage_manager,
+        session=mock.MagicMock(),
+        task_id="task-id",
+        allocation_id="allocation-id",
+        tbd_sync_mode=core.TensorboardMode.MANUAL,
+        tensorboard_manager=mock.MagicMock(),
+    )
+
+    def wait_for(condition: Callable[[], bool]) -> None:
+        deadline = time.time() + 10
+        while not condition():
+            assert time.time() < deadline, "timed out"
+            time.sleep(0.01)
+
+    with mock.patch.object(core._checkpoint.bindings, "post_ReportCheckpoint") as report:
+        with checkpoint_context.store_path(metadata={"steps_completed": 1}) as (path, storage_id):
+            path.joinpath("a").write_text("0123456789")
+            wait_for(lambda: remote.joinpath(storage_id, "a").exists())
+            path.joinpath("b").write_text("0123456789")
+            # Going over the disk budget deletes the uploaded file locally.
+            wait_for(lambda: not path.joinpath("a").exists())
+
+    # The deleted file is still reported as part of the checkpoint.
+    report.assert_called_once()
+    assert report.call_args.kwargs["body"].resources == {"a": "10", "b": "10"}
+    assert remote.joinpath(storage_id, "a").read_text() == "0123456789"
+    assert remote.joinpath(storage_id, "metadata.json").exists()
+
+
+@pytest.mark.parametrize("fast", [False, True], ids=lambda x: f"fast:{x}")
+def test_resolve_conflicts(fast: bool, tmp_path: pathlib.Path) -> None:
+    file_digests = mock.MagicMock(wraps=core._checkpoint._file_digests)
+    with mock.patch.object(core._checkpoint, "_file_digests", file_digests):
+        with parallel.Execution(2) as pex:
+
+            @pex.run
+            def do_test() -> None:
+                checkpoint_context = core.DummyCheckpointContext(
+                    pex.distributed, mock.MagicMock(), fast_conflict_check=fast
+                )
+                ckpt_dir = tmp_path.joinpath(f"rank{pex.rank}")
+                ckpt_dir.mkdir()
+                files = {
+                    "same": "same content",
+                    "same_size": f"content {pex.rank}",
+                    "other_size": "x" * (pex.rank + 1),
+                }
+                for name, content in files.items():
+                    ckpt_dir.joinpath(name).write_text(content)
+                    os.utime(ckpt_dir.joinpath(name), ns=(0, 0))
+                resources = {name: len(content) for name, content in files.items()}
+                conflicts = {name: [0, 1] for name in files}
+
+                # Files with different sizes are conflicts without reading them.
+                with pytest.raises(RuntimeError, match="other_size") as exc_info:
+                    checkpoint_context._resolve_conflicts(resources, conflicts, str(ckpt_dir))
+
+                if fast:
+                    # Files with the same size and mtime are not read at all.
+                    file_digests.assert_not_called()
+                    assert "same_size" not in str(exc_info.value)
+                else:
+                    # The remaining files are hashed in one batch, and compared by content.
+                    assert (
+                        file_digests.call_args_list.count(
+                            mock.call(str(ckpt_dir), ["same", "same_size"])
+                        )
+                        == 1
+                    )
+                    assert "same_size" in str(exc_info.value)
+                assert "same\n" not in str(exc_info.value)
+
+                # Without conflicts, the lowest rank uploads files shared by several ranks.
+                del resources["other_size"]
+                conflicts = {"same": [0, 1]}
+                resolved = checkpoint_context._resolve_conflicts(
+                    resources, conflicts, str(ckpt_dir)
+                )
+                assert ("same" in resolved) == (pex.rank == 0)
@@ -0,0 +1,47 @@
+from typing import Any
+from unittest import mock
+
+import pytest
+
+from determined import core
+
+
+def make_context() -> Any:
+    train = mock.MagicMock()
+    train.close.side_effect = RuntimeError("reporting metrics to the master failed")
+    checkpoint = mock.MagicMock()
+    checkpoint.close.side_effect = RuntimeError("upload of checkpoint failed")
+    return core.Context(
+        checkpoint=checkpoint,
+        distributed=mock.MagicMock(),
+        preempt=mock.MagicMock(),
+        train=train,
+        _tensorboard_manager=mock.MagicMock(),
+    )
+
+
+def assert_all_closed(context: core.Context) -> None:
+    for component in (
+        context.train,
+        context.checkpoint,
+        context.preempt,
+        context.distributed,
+        context._tensorboard_manager,
+    ):
+        component.close.assert_called_once()  # type: ignore
+
+
+def test_close_error_is_raised() -> None:
+    context = make_context()
+    with pytest.raises(RuntimeError, match="upload of checkpoint failed"):
+        with context:
+            pass
+    assert_all_closed(context)
+
+
+def test_close_error_does_not_hide_exception() -> None:
+    context = make_context()
+    with pytest.raises(ValueError, match="from the with block"):
+        with context:
+            raise ValueError("from the with block")
+    assert_all_closed(context)
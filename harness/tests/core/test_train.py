@@ -0,0 +1,87 @@
+import threading
+from typing import Any, List
+from unittest import mock
+
+import pytest
+
+from determined import core
+from determined.common.api import errors
+
+
+def make_train_context(session: Any) -> core.TrainContext:
+    return core.TrainContext(
+        session,
+        trial_id=1,
+        run_id=1,
+        exp_id=1,
+        distributed=core.DummyDistributedContext(),
+        tensorboard_mode=core.TensorboardMode.MANUAL,
+        tensorboard_manager=mock.MagicMock(),
+        tbd_writer=None,
+        async_reporting=True,
+    )
+
+
+def test_async_reporting() -> None:
+    release = threading.Event()
+    posts: List[str] = []
+
+    def post(path: str, data: Any = None, **kwargs: Any) -> None:
+        release.wait()
+        posts.append(path.rsplit("/", 1)[-1])
+        if len(posts) == 1:
+            # The first report is retried after the master could not be reached.
+            raise errors.MasterNotFoundException("master unreachable")
+
+    session = mock.MagicMock()
+    session.post.side_effect = post
+    train = make_train_context(session)
+
+    for steps_completed in range(3):
+        # Reporting doesn't wait for the master.
+        train.report_training_metrics(steps_completed, {"loss": 1.0})
+    depth, lag = train.reporting_lag
+    assert depth >= 2 and lag > 0
+
+    release.set()
+    # Validation metrics are reported after all of the training metrics before them.
+    train.report_validation_metrics(3, {"loss": 1.0})
+    assert posts == ["training_metrics"] * 4 + ["validation_metrics"]
+    assert train.reporting_lag == (0, 0.0)
+    train.close()
+
+
+def test_async_reporting_error() -> None:
+    session = mock.MagicMock()
+    session.post.side_effect = errors.BadRequestException("bad metrics")
+    train = make_train_context(session)
+
+    train.report_training_metrics(0, {"loss": 1.0})
+    with pytest.raises(RuntimeError, match="reporting metrics to the master failed"):
+        train.flush()
+    # Client errors are not retried.
+    assert session.post.call_count == 1
+    train.close()
+
+
+def test_async_reporting_error_is_logged(caplog: pytest.LogCaptureFixture) -> None:
+    release = threading.Event()
+
+    def post(path: str, data: Any = None, **kwargs: Any) -> None:
+        release.wait()
+        raise errors.BadRequestException("bad metrics")
+
+    session = mock.MagicMock()
+    session.post.side_effect = post
+    train = make_train_context(session)
+
+    for steps_completed in range(3):
+        train.report_training_metrics(steps_completed, {"loss": 1.0})
+    release.set()
+    with pytest.raises(RuntimeError, match="reporting metrics to the master failed"):
+        train.flush()
+    # The failure is logged when it happens, and so are the reports which were dropped after it.
+    assert session.post.call_count == 1
+    assert "Reporting metrics to the master failed: bad metrics" in caplog.text
+    assert caplog.text.count("Dropped metrics report") == 2
+    train.close()
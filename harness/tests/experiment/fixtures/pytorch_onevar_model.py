@@ -57,6 +57,17 @@ class OnesDataset(torch.utils.data.Dataset):
         return torch.Tensor([float(1)]), torch.Tensor([float(1)])
 
 
+class OnesStreamingDataset(pytorch.StreamingDataset):
+    """The records of OnesDataset, streamed from 8 shards of 8 records each."""
+
+    def shards(self) -> List[int]:
+        return list(range(8))
+
+    def read_shard(self, shard: int, offset: Optional[int]) -> Iterable[Tuple[Tuple, int]]:
+        for i in range(0 if offset is None else offset + 1, 8):
+            yield OnesDataset()[shard * 8 + i], i
+
+
 class TriangleLabelSum(pytorch.MetricReducer):
     """Return a sum of (label_sum * batch_index) for every batch (labels are always 1 here)."""
 
@@ -156,6 +167,10 @@ class BaseOneVarTrial(pytorch.PyTorchTrial):
         self.checkpoint_callback = CheckpointCallback()
         if self.hparams.get("disable_dataset_reproducibility_checks"):
             self.context.experimental.disable_dataset_reproducibility_checks()
+        if self.hparams.get("defer_training_metrics_transfer"):
+            self.context.experimental.defer_training_metrics_transfer()
+        if self.hparams.get("tensor_file_checkpoints"):
+            self.context.experimental.use_tensor_file_checkpoints()
 
     def train_batch(
         self, batch: pytorch.TorchData, epoch_idx: int, batch_idx: int
@@ -215,6 +230,10 @@ class BaseOneVarTrial(pytorch.PyTorchTrial):
             return pytorch.DataLoader(
                 OnesDataset(), batch_size=self.context.get_per_slot_batch_size()
             )
+        elif self.hparams["dataloader_type"] == "streaming":
+            return pytorch.DataLoader(
+                OnesStreamingDataset(), batch_size=self.context.get_per_slot_batch_size()
+            )
         elif self.hparams["dataloader_type"] == "torch":
             dataset = OnesDataset()
             seed = self.context.get_trial_seed()
@@ -239,6 +258,10 @@ class BaseOneVarTrial(pytorch.PyTorchTrial):
             return pytorch.DataLoader(
                 OnesDataset(), batch_size=self.context.get_per_slot_batch_size()
             )
+        elif self.hparams["dataloader_type"] == "streaming":
+            return pytorch.DataLoader(
+                OnesStreamingDataset(), batch_size=self.context.get_per_slot_batch_size()
+            )
         elif self.hparams["dataloader_type"] == "torch":
             dataset = OnesDataset()
             num_workers = self.context.distributed.get_size()
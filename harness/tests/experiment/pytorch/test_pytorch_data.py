@@ -1,4 +1,5 @@
 # type: ignore
+import itertools
 import logging
 import queue
 import typing
@@ -9,6 +10,7 @@ import pytest
 import torch
 
 import determined as det
+from determined import pytorch
 from determined.pytorch import data_length, samplers, to_device
 
 
@@ -53,6 +55,59 @@ def test_skip_batch_sampler():
         assert samp == skip_samp
 
 
+@pytest.mark.parametrize("skip", [0, 3, 7, 50, 123])
+@pytest.mark.parametrize("rank", [0, 2])
+def test_skip_batch_sampler_seeks(skip: int, rank: int) -> None:
+    def make_batch_sampler(shuffle: bool) -> torch.utils.data.BatchSampler:
+        sampler = torch.utils.data.SequentialSampler(range(15))
+        if shuffle:
+            sampler = samplers.ReproducibleShuffleSampler(sampler, 777)
+        sampler = samplers.RepeatSampler(sampler)
+        sampler = samplers.DistributedSampler(sampler, num_workers=3, rank=rank)
+        return torch.utils.data.BatchSampler(sampler, batch_size=2, drop_last=False)
+
+    def make_adapted_batch_sampler(skip: int) -> torch.utils.data.BatchSampler:
+        sampler = torch.utils.data.SequentialSampler(range(15))
+        sampler = samplers.ReproducibleShuffleSampler(sampler, 777)
+        batch_sampler = torch.utils.data.BatchSampler(sampler, batch_size=2, drop_last=True)
+        batch_sampler = samplers.ReproducibleShuffleBatchSampler(batch_sampler, 777)
+        return pytorch.adapt_batch_sampler(
+            batch_sampler, repeat=True, skip=skip, num_replicas=3, rank=rank
+        )
+
+    # Seeking must yield exactly what iterating through the skipped batches would have.
+    for shuffle in (False, True):
+        expect = itertools.islice(iter(make_batch_sampler(shuffle)), skip, skip + 20)
+        got = itertools.islice(
+            iter(samplers.SkipBatchSampler(make_batch_sampler(shuffle), skip)), 20
+        )
+        assert list(got) == list(expect)
+
+    expect = itertools.islice(iter(make_adapted_batch_sampler(0)), skip, skip + 20)
+    got = itertools.islice(iter(make_adapted_batch_sampler(skip)), 20)
+    assert list(got) == list(expect)
+
+
+@pytest.mark.parametrize("skip", [0, 3, 7, 50, 123])
+@pytest.mark.parametrize("num_samples", [None, 10, 20])
+def test_skip_batch_sampler_seeks_random_sampler(skip: int, num_samples: typing.Optional[int]):
+    def make_adapted_batch_sampler(skip: int) -> torch.utils.data.BatchSampler:
+        generator = torch.Generator()
+        generator.manual_seed(777)
+        sampler = torch.utils.data.RandomSampler(
+            range(15), num_samples=num_samples, generator=generator
+        )
+        batch_sampler = torch.utils.data.BatchSampler(sampler, batch_size=2, drop_last=False)
+        return pytorch.adapt_batch_sampler(
+            batch_sampler, repeat=True, skip=skip, num_replicas=3, rank=1
+        )
+
+    # Seeking advances the generator exactly as iterating through the skipped batches would have.
+    expect = itertools.islice(iter(make_adapted_batch_sampler(0)), skip, skip + 20)
+    got = itertools.islice(iter(make_adapted_batch_sampler(skip)), 20)
+    assert list(got) == list(expect)
+
+
 def test_repeat_sampler():
     sampler = torch.utils.data.SequentialSampler(range(10))
     repeat_sampler = samplers.RepeatSampler(sampler)
@@ -214,6 +269,22 @@ def test_to_device() -> None:
 
     assert to_device(data_structure, "cpu") == data_structure
     assert np.array_equal(to_device(np.array([0, 1, 2]), "cpu"), np.array([0, 1, 2]))
+    # Asynchronous copies are just regular copies without a GPU.
+    assert to_device(data_structure, "cpu", non_blocking=True) == data_structure
+
+
+@pytest.mark.gpu
+def test_prefetch_to_device() -> None:
+    device = torch.device("cuda", 0)
+    batches = [
+        {"x": np.full((16, 16), i, dtype=np.float32), "y": torch.full((4,), i)} for i in range(5)
+    ]
+    out = list(pytorch._prefetch_to_device(iter(batches), device, depth=2))
+    assert len(out) == len(batches)
+    for i, batch in enumerate(out):
+        assert batch["x"].device == device and batch["y"].device == device
+        assert torch.equal(batch["x"].cpu(), torch.full((16, 16), float(i)))
+        assert torch.equal(batch["y"].cpu(), torch.full((4,), i))
 
 
 @pytest.mark.parametrize("dedup_between_calls", [True, False])
@@ -235,3 +306,56 @@ def test_to_device_warnings(dedup_between_calls) -> None:
     finally:
         # Restore logging as it was before.
         logger.removeHandler(handler)
+
+
+class RangeShards(pytorch.StreamingDataset):
+    """Records 0 to 47, streamed from shards of 8 records with record offsets."""
+
+    def shards(self):
+        return list(range(6))
+
+    def read_shard(self, shard, offset):
+        for i in range(0 if offset is None else offset + 1, 8):
+            yield shard * 8 + i, i
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_streaming_data_loader_shards(num_workers: int) -> None:
+    records = []
+    for rank in range(3):
+        loader = pytorch.DataLoader(RangeShards(), batch_size=4, num_workers=num_workers)
+        for batch in loader.get_data_loader(num_replicas=3, rank=rank):
+            records += batch.tolist()
+
+    # Every record is read once, by the one reader of its shard.
+    assert sorted(records) == list(range(48))
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_streaming_data_loader_resume(num_workers: int) -> None:
+    def make_loader(stream_state=None):
+        loader = pytorch.DataLoader(RangeShards(), batch_size=3, num_workers=num_workers)
+        return loader.get_data_loader(
+            repeat=True, num_replicas=2, rank=1, stream_state=stream_state
+        )
+
+    loader = make_loader()
+    expect = [batch.tolist() for batch in itertools.islice(loader, 30)]
+
+    # Read ahead of the batches which are trained on, like prefetching would.
+    loader = make_loader()
+    batches = iter(loader)
+    for _ in range(12):
+        next(batches)
+    for _ in range(10):
+        loader._commit_batch()
+    state = loader._state_dict()
+    del batches
+
+    loader = make_loader(state)
+    assert [batch.tolist() for batch in itertools.islice(loader, 20)] == expect[10:]
+
+
+def test_streaming_data_loader_rejects_shuffle() -> None:
+    with pytest.raises(ValueError, match="StreamingDataset"):
+        pytorch.DataLoader(RangeShards(), batch_size=3, shuffle=True)
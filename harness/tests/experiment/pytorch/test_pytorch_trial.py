@@ -2,6 +2,7 @@
 import importlib
 import os
 import pathlib
+import pickle
 import random
 import sys
 import typing
@@ -116,6 +117,35 @@ class TestPyTorchTrial:
         for metric in metrics:
             assert "mse" in metric
 
+    def test_defer_training_metrics_transfer(self) -> None:
+        def train(defer: bool) -> typing.List[typing.Dict[str, typing.Any]]:
+            _, trial_controller = create_trial_and_trial_controller(
+                trial_class=pytorch_onevar_model.OneVarTrial,
+                hparams={**self.hparams, "defer_training_metrics_transfer": defer},
+                trial_seed=self.trial_seed,
+            )
+            _, metrics = trial_controller._train_with_boundaries(
+                training_enumerator=enumerate(trial_controller.training_iterator),
+                train_boundaries=[
+                    pytorch._TrainBoundary(
+                        step_type=pytorch._TrainBoundaryType.TRAIN, unit=pytorch.Batch(10)
+                    )
+                ],
+            )
+            return metrics
+
+        deferred = train(True)
+        # Metrics stay tensors until they are reported.
+        assert isinstance(deferred[0]["loss"], torch.Tensor)
+        deferred = pytorch._per_batch_metrics_to_numpy(deferred)
+
+        expected = train(False)
+        assert len(deferred) == len(expected)
+        for got, exp in zip(deferred, expected):
+            assert got.keys() == exp.keys()
+            for name in exp:
+                assert np.array_equal(got[name], exp[name]), name
+
     def test_nonscalar_validation(self) -> None:
         trial, trial_controller = create_trial_and_trial_controller(
             trial_class=pytorch_onevar_model.OneVarTrialWithNonScalarValidation,
@@ -135,6 +165,15 @@ class TestPyTorchTrial:
         }
         self.checkpoint_and_restore(updated_hparams, tmp_path, (100, 100))
 
+    def test_tensor_file_checkpointing_and_restoring(self, tmp_path: pathlib.Path) -> None:
+        updated_hparams = {"tensor_file_checkpoints": True, **self.hparams}
+        self.checkpoint_and_restore(updated_hparams, tmp_path, (100, 100))
+
+        for checkpoint in tmp_path.joinpath("checkpoint").iterdir():
+            assert checkpoint.joinpath("state_dict.tensors").exists()
+            assert checkpoint.joinpath("state_dict.index").exists()
+            assert not checkpoint.joinpath("state_dict.pth").exists()
+
     @pytest.mark.skipif(not torch.cuda.is_available(), reason="no gpu available")
     @pytest.mark.gpu
     @pytest.mark.parametrize(
@@ -628,6 +667,23 @@ class TestPyTorchTrial:
         for older, newer in zip(training_metrics, training_metrics[1:]):
             assert newer["loss"] <= older["loss"]
 
+    def test_streaming_dataloader(self, tmp_path: pathlib.Path) -> None:
+        hparams = dict(self.hparams)
+        hparams["dataloader_type"] = "streaming"
+
+        self.checkpoint_and_restore(hparams, tmp_path, (10, 10))
+
+        # Every checkpoint holds the position of the last record trained on, in 8 shards of 8.
+        for checkpoint in tmp_path.joinpath("checkpoint").iterdir():
+            with checkpoint.joinpath("trial_state.pkl").open("rb") as f:
+                batches_trained = pickle.load(f)["batches_trained"]
+            with checkpoint.joinpath("stream_state.pkl").open("rb") as f:
+                stream_state = pickle.load(f)
+            last_record = (batches_trained * 4 - 1) % 64
+            assert stream_state["ranks"] == [
+                {"num_readers": 1, "positions": {0: divmod(last_record, 8)}}
+            ]
+
     def test_gradient_aggregation(self) -> None:
         AGG_FREQ = 2
         exp_config = utils.make_default_exp_config(
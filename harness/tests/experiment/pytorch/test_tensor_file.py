@@ -0,0 +1,59 @@
+import collections
+import pathlib
+
+import numpy as np
+import torch
+
+from determined.pytorch import _tensor_file
+
+
+def test_tensor_file_round_trip(tmp_path: pathlib.Path) -> None:
+    model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.BatchNorm1d(4))
+    optimizer = torch.optim.Adam(model.parameters())
+    model(torch.randn(5, 3)).sum().backward()
+    optimizer.step()
+
+    weight = torch.arange(6, dtype=torch.float64).reshape(2, 3)
+    checkpoint = {
+        "models_state_dict": [model.state_dict()],
+        "optimizers_state_dict": [optimizer.state_dict()],
+        "np_rng_state": np.random.get_state(),
+        "tensors": collections.OrderedDict(
+            bfloat16=torch.ones(3, dtype=torch.bfloat16),
+            empty=torch.zeros(0, 2),
+            scalar=torch.tensor(3.5),
+            bools=torch.tensor([True, False]),
+            # Non-contiguous tensors are stored contiguously.
+            transposed=weight.t(),
+            tied=(weight, weight),
+        ),
+    }
+    _tensor_file.save(checkpoint, tmp_path)
+    assert _tensor_file.exists(tmp_path)
+    loaded = _tensor_file.load(tmp_path)
+
+    # Module state_dicts keep their version metadata.
+    state_dict = loaded["models_state_dict"][0]
+    assert state_dict._metadata == checkpoint["models_state_dict"][0]._metadata
+    for name, tensor in checkpoint["models_state_dict"][0].items():
+        assert torch.equal(state_dict[name], tensor), name
+    new_model = torch.nn.Sequential(torch.nn.Linear(3, 4), torch.nn.BatchNorm1d(4))
+    new_model.load_state_dict(state_dict)
+
+    new_optimizer = torch.optim.Adam(new_model.parameters())
+    new_optimizer.load_state_dict(loaded["optimizers_state_dict"][0])
+    assert new_optimizer.state_dict()["param_groups"] == optimizer.state_dict()["param_groups"]
+
+    assert loaded["np_rng_state"][0] == checkpoint["np_rng_state"][0]
+    assert np.array_equal(loaded["np_rng_state"][1], checkpoint["np_rng_state"][1])
+
+    for name, tensor in checkpoint["tensors"].items():
+        if isinstance(tensor, tuple):
+            assert all(torch.equal(a, b) for a, b in zip(loaded["tensors"][name], tensor))
+        else:
+            assert loaded["tensors"][name].dtype == tensor.dtype, name
+            assert torch.equal(loaded["tensors"][name], tensor), name
+
+    # Loaded tensors are copy-on-write, so modifying them leaves the file alone.
+    loaded["tensors"]["scalar"].add_(1)
+    assert _tensor_file.load(tmp_path)["tensors"]["scalar"] == 3.5
@@ -0,0 +1,121 @@
+import os
+import pathlib
+from typing import Any
+
+import pytest
+
+from determined import errors
+from determined.common import storage
+from tests.storage import util
+
+
+@pytest.fixture()
+def inner(tmp_path: pathlib.Path) -> util.LocalCloudStorageManager:
+    return util.LocalCloudStorageManager(str(tmp_path / "tmp"), tmp_path / "remote")
+
+
+def make_manager(
+    tmp_path: pathlib.Path, inner: storage.StorageManager, max_size: int = 1000
+) -> storage.CachingStorageManager:
+    cache = storage.CheckpointCache(str(tmp_path / "cache"), max_size=max_size)
+    return storage.CachingStorageManager(inner, cache)
+
+
+def test_checkpoint_lifecycle(tmp_path: pathlib.Path, inner: util.LocalCloudStorageManager) -> None:
+    util.run_storage_lifecycle_test(make_manager(tmp_path, inner))
+
+
+def test_cache_hits(tmp_path: pathlib.Path, inner: util.LocalCloudStorageManager) -> None:
+    manager = make_manager(tmp_path, inner)
+    with manager.store_path("ckpt") as path:
+        util.create_checkpoint(path)
+
+    for i in range(3):
+        # Each download gets its own writable copy.
+        out = tmp_path / f"out{i}"
+        manager.download("ckpt", out)
+        util.validate_checkpoint(out, util.EXPECTED_FILES)
+        out.joinpath("root.txt").write_text("modified")
+
+    with manager.restore_path("ckpt") as path:
+        util.validate_checkpoint(path, util.EXPECTED_FILES)
+
+    def selector(path: str) -> bool:
+        return path == "subdir/file1.txt"
+
+    out = tmp_path / "selected"
+    manager.download("ckpt", out, selector=selector)
+    util.validate_checkpoint(out, {"subdir/": None, "subdir/file1.txt": "nested file 1"})
+
+    # The checkpoint was only fetched from storage once.
+    assert inner.downloads == ["ckpt"]
+
+    # Deleting the checkpoint also drops it from the cache.
+    manager.delete("ckpt")
+    with pytest.raises(errors.CheckpointNotFound):
+        manager.download("ckpt", tmp_path / "deleted")
+
+
+def test_cache_eviction(tmp_path: pathlib.Path, inner: util.LocalCloudStorageManager) -> None:
+    # Each checkpoint is 10 bytes, so only two fit.
+    manager = make_manager(tmp_path, inner, max_size=25)
+    for name in ("a", "b", "c"):
+        with manager.store_path(name) as path:
+            path.joinpath("weights").write_text("0123456789")
+
+    def download(name: str) -> None:
+        manager.download(name, tmp_path / "out" / name)
+
+    download("a")
+    download("b")
+    download("a")
+    # "b" is the least recently used entry, so "c" replaces it.
+    download("c")
+    download("a")
+    assert inner.downloads == ["a", "b", "c"]
+    download("b")
+    assert inner.downloads == ["a", "b", "c", "b"]
+
+    # A checkpoint bigger than the whole cache is downloaded without caching it.
+    with manager.store_path("big") as path:
+        path.joinpath("weights").write_text("x" * 100)
+    download("big")
+    download("big")
+    assert inner.downloads[-2:] == ["big", "big"]
+    assert sorted(os.listdir(tmp_path / "cache" / "entries")) == ["a", "b"]
+
+
+def test_build_with_cache(tmp_path: pathlib.Path, monkeypatch: Any) -> None:
+    config = {"type": "shared_fs", "host_path": str(tmp_path)}
+    monkeypatch.setenv("DET_CHECKPOINT_CACHE_PATH", str(tmp_path / "cache"))
+    # Checkpoints on a shared filesystem are never cached.
+    assert isinstance(storage.build(config, container_path=None), storage.SharedFSStorageManager)
+
+    manager = storage.build({**config, "content_addressed": True}, container_path=None)
+    assert isinstance(manager, storage.CachingStorageManager)
+    assert isinstance(manager.inner, storage.ContentAddressedStorageManager)
+
+
+def test_cache_shared_between_users(
+    tmp_path: pathlib.Path, inner: util.LocalCloudStorageManager
+) -> None:
+    manager = make_manager(tmp_path, inner)
+    with manager.store_path("ckpt") as path:
+        util.create_checkpoint(path)
+
+    old_umask = os.umask(0o077)
+    try:
+        manager.download("ckpt", tmp_path / "out")
+    finally:
+        os.umask(old_umask)
+
+    # Containers running as other users can read the entry, evict it, and take the locks.
+    cache = tmp_path / "cache"
+    for d in ("entries", "tmp", "locks"):
+        assert cache.joinpath(d).stat().st_mode & 0o777 == 0o777
+    entry = cache / "entries" / "ckpt"
+    for p in [entry, *entry.rglob("*")]:
+        mode = p.stat().st_mode & 0o777
+        assert mode == (0o777 if p.is_dir() else 0o444), p
+    for lock in cache.joinpath("locks").iterdir():
+        assert lock.stat().st_mode & 0o777 == 0o666, lock
@@ -0,0 +1,90 @@
+import os
+import pathlib
+import time
+from typing import Any
+
+import pytest
+
+from determined.common.storage import cloud
+from tests.storage import util
+
+
+def wait_for(condition: Any, timeout: float = 10) -> None:
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_store_path_without_streaming(tmp_path: pathlib.Path) -> None:
+    manager = util.LocalCloudStorageManager(str(tmp_path / "tmp"), tmp_path / "remote")
+    with manager.store_path("ckpt") as path:
+        util.create_checkpoint(path)
+    assert manager.uploads == [None]
+    util.validate_checkpoint(tmp_path / "remote" / "ckpt", util.EXPECTED_FILES)
+    assert not os.path.exists(path)
+
+
+def test_store_path_streaming(tmp_path: pathlib.Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(cloud, "STREAMING_POLL_INTERVAL", 0.01)
+    remote = tmp_path / "remote" / "ckpt"
+    manager = util.LocalCloudStorageManager(
+        str(tmp_path / "tmp"),
+        tmp_path / "remote",
+        streaming_upload=True,
+        streaming_disk_budget=15,
+    )
+    with manager.store_path("ckpt") as path:
+        path.joinpath("subdir").mkdir()
+        path.joinpath("subdir", "first").write_text("0123456789")
+
+        # Finished files are uploaded while the checkpoint is still being written.
+        wait_for(lambda: remote.joinpath("subdir", "first").exists())
+
+        with path.joinpath("second").open("w") as f:
+            f.write("0123456789")
+            f.flush()
+            time.sleep(0.1)
+            # Open files are not uploaded.
+            assert not remote.joinpath("second").exists()
+
+        # Going over the disk budget removes uploaded files locally.
+        wait_for(lambda: not path.joinpath("subdir", "first").exists())
+
+        # Files changed after they were streamed are uploaded again at the end.
+        wait_for(lambda: remote.joinpath("second").exists())
+        path.joinpath("second").write_text("changed")
+        path.joinpath("empty_dir").mkdir()
+
+    util.validate_checkpoint(
+        remote,
+        {
+            "subdir/": None,
+            "subdir/first": "0123456789",
+            "second": "changed",
+            "empty_dir/": None,
+        },
+    )
+    assert not os.path.exists(path)
+
+
+def test_store_path_streaming_failure(tmp_path: pathlib.Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(cloud, "STREAMING_POLL_INTERVAL", 0.01)
+    remote = tmp_path / "remote" / "ckpt"
+    manager = util.LocalCloudStorageManager(
+        str(tmp_path / "tmp"), tmp_path / "remote", streaming_upload=True
+    )
+    with pytest.raises(RuntimeError, match="training failed"):
+        with manager.store_path("ckpt") as path:
+            path.joinpath("first").write_text("0123456789")
+            wait_for(lambda: remote.joinpath("first").exists())
+            raise RuntimeError("training failed")
+
+    # Nothing would ever delete the files of a checkpoint which was never reported.
+    assert not remote.exists()
+    assert not os.path.exists(path)
+
+
+def test_streaming_disk_budget_requires_streaming(tmp_path: pathlib.Path) -> None:
+    with pytest.raises(ValueError, match="requires streaming_upload"):
+        util.LocalCloudStorageManager(str(tmp_path), tmp_path, streaming_disk_budget=1)
@@ -0,0 +1,140 @@
+import io
+import os
+import pathlib
+import tarfile
+from typing import Any, Set
+from unittest import mock
+
+import pytest
+
+from determined import errors
+from determined.common import storage
+from determined.common.experimental import checkpoint
+from determined.common.experimental.checkpoint import _checkpoint
+from determined.common.storage import content_addressed
+from tests.storage import util
+
+
+@pytest.fixture()
+def inner(tmp_path: pathlib.Path) -> storage.SharedFSStorageManager:
+    return storage.SharedFSStorageManager(str(tmp_path / "storage"))
+
+
+@pytest.fixture()
+def manager(
+    tmp_path: pathlib.Path, inner: storage.SharedFSStorageManager
+) -> storage.ContentAddressedStorageManager:
+    return storage.ContentAddressedStorageManager(inner, temp_dir=str(tmp_path / "tmp"))
+
+
+def _blobs(inner: storage.SharedFSStorageManager) -> Set[str]:
+    blobs_dir = os.path.join(inner._base_path, content_addressed.BLOBS_DIR)
+    return set(os.listdir(blobs_dir)) if os.path.exists(blobs_dir) else set()
+
+
+def test_checkpoint_lifecycle(
+    manager: storage.ContentAddressedStorageManager, inner: storage.SharedFSStorageManager
+) -> None:
+    def post_delete_cb(storage_id: str) -> None:
+        assert storage_id not in os.listdir(inner._base_path)
+
+    util.run_storage_lifecycle_test(manager, post_delete_cb)
+
+    # Every checkpoint was deleted, so no content may be left behind.
+    assert _blobs(inner) == set()
+
+
+def test_dedup_and_refcounted_delete(
+    tmp_path: pathlib.Path,
+    manager: storage.ContentAddressedStorageManager,
+    inner: storage.SharedFSStorageManager,
+) -> None:
+    ckpt_a = tmp_path / "a"
+    ckpt_b = tmp_path / "b"
+    util.create_checkpoint(ckpt_a, {"frozen.bin": "shared weights", "head.bin": "head a"})
+    util.create_checkpoint(ckpt_b, {"frozen.bin": "shared weights", "head.bin": "head b"})
+
+    manager.upload(ckpt_a, "a")
+    assert len(_blobs(inner)) == 2
+    manager.upload(ckpt_b, "b")
+    # The shared file is only stored once.
+    assert len(_blobs(inner)) == 3
+
+    shared_digest = content_addressed._sha256(str(ckpt_a / "frozen.bin"))
+
+    manager.delete("a")
+    assert shared_digest in _blobs(inner)
+    assert len(_blobs(inner)) == 2
+
+    out = tmp_path / "out"
+    manager.download("b", out)
+    util.validate_checkpoint(out, {"frozen.bin": "shared weights", "head.bin": "head b"})
+
+    manager.delete("b")
+    assert _blobs(inner) == set()
+
+
+def test_plain_checkpoints_still_readable(
+    tmp_path: pathlib.Path,
+    manager: storage.ContentAddressedStorageManager,
+    inner: storage.SharedFSStorageManager,
+) -> None:
+    ckpt = tmp_path / "plain"
+    util.create_checkpoint(ckpt)
+    inner.upload(ckpt, "plain")
+
+    out = tmp_path / "out"
+    manager.download("plain", out)
+    util.validate_checkpoint(out, util.EXPECTED_FILES)
+
+    manager.delete("plain")
+    assert "plain" not in os.listdir(inner._base_path)
+
+
+def test_build_content_addressed(tmp_path: pathlib.Path) -> None:
+    config: Any = {"type": "shared_fs", "host_path": str(tmp_path), "content_addressed": True}
+    manager = storage.build(config, container_path=None)
+    assert isinstance(manager, storage.ContentAddressedStorageManager)
+    assert isinstance(manager.inner, storage.SharedFSStorageManager)
+
+
+def test_sdk_download(
+    tmp_path: pathlib.Path,
+    manager: storage.ContentAddressedStorageManager,
+    inner: storage.SharedFSStorageManager,
+) -> None:
+    ckpt = tmp_path / "ckpt"
+    util.create_checkpoint(ckpt)
+    manager.upload(ckpt, "a")
+
+    checkpoint_storage = {"type": "shared_fs", "host_path": inner._base_path}
+    sdk_checkpoint = checkpoint.Checkpoint(
+        session=mock.MagicMock(),
+        task_id=None,
+        allocation_id=None,
+        uuid="a",
+        report_time=None,
+        resources={},
+        metadata={},
+        state=checkpoint.CheckpointState.COMPLETED,
+        training=_checkpoint.CheckpointTrainingMetadata(
+            experiment_config={"checkpoint_storage": checkpoint_storage},
+            experiment_id=1,
+            trial_id=1,
+            hparams={},
+            validation_metrics={},
+        ),
+    )
+
+    # Direct downloads read the files through the content-addressed layer.
+    out = sdk_checkpoint.download(str(tmp_path / "direct"), mode=checkpoint.DownloadMode.DIRECT)
+    util.validate_checkpoint(pathlib.Path(out), {**util.EXPECTED_FILES, "metadata.json": "{}"})
+
+    # The master only has the manifest to send.
+    tarball = io.BytesIO()
+    with tarfile.open(fileobj=tarball, mode="w:gz") as tf:
+        tf.add(os.path.join(inner._base_path, "a"), arcname=".")
+    tarball.seek(0)
+    sdk_checkpoint._session.get.return_value = mock.MagicMock(ok=True, raw=tarball)
+    with pytest.raises(errors.ProxiedDownloadFailed, match="stored by content"):
+        sdk_checkpoint.download(str(tmp_path / "master"), mode=checkpoint.DownloadMode.MASTER)
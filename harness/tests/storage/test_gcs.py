@@ -2,6 +2,7 @@ import os
 import uuid
 from pathlib import Path
 from typing import Dict, Iterator, List, Optional
+from unittest import mock
 
 import google.auth.exceptions
 import google.cloud.storage
@@ -141,3 +142,45 @@ def test_tensorboard_fetcher_gcs(
             fetcher.client.bucket(BUCKET_NAME).blob(filepath).delete()
 
     util.run_tensorboard_fetcher_test(local_sync_dir, fetcher, storage_relpath, put_files, rm_files)
+
+
+@mock.patch("google.cloud.storage.Client")
+def test_gcs_delete_batches(client_cls: mock.MagicMock) -> None:
+    import google.api_core.exceptions
+
+    names = [f"ckpt/{i}" for i in range(250)]
+    deleted: List[str] = []
+
+    def delete_blob(name: str) -> None:
+        if name in deleted:
+            raise google.api_core.exceptions.NotFound(name)  # type: ignore
+        deleted.append(name)
+
+    client = client_cls.return_value
+    bucket = client.bucket.return_value
+    bucket.client = client
+    bucket.list_blobs.return_value = [mock.Mock() for _ in names]
+    for blob, name in zip(bucket.list_blobs.return_value, names):
+        blob.name = name
+    bucket.blob.side_effect = lambda name: mock.Mock(delete=lambda: delete_blob(name))
+    # The first batch request fails after its deletions went through, the others succeed.
+    client.batch.return_value.__exit__.side_effect = [RuntimeError("batch failed"), None, None]
+
+    manager = storage.GCSStorageManager(bucket="bucket", max_concurrency=1)
+    manager.delete("ckpt")
+
+    assert client.batch.call_count == 3
+    assert sorted(deleted) == sorted(names)
+
+
+@mock.patch("google.cloud.storage.Client")
+def test_gcs_reuses_transfer_clients(client_cls: mock.MagicMock, tmp_path: Path) -> None:
+    for i in range(20):
+        tmp_path.joinpath(str(i)).write_text(str(i))
+
+    manager = storage.GCSStorageManager(bucket="bucket", max_concurrency=4)
+    for _ in range(3):
+        manager.upload(tmp_path, "ckpt")
+
+    # The main client, plus at most one client per transfer thread, across all transfers.
+    assert 1 < client_cls.call_count <= 1 + 4
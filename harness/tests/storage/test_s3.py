@@ -5,11 +5,12 @@ import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
+import boto3.exceptions
 import botocore.exceptions
 import pytest
 
 from determined.common import storage
-from determined.common.storage.s3 import normalize_prefix
+from determined.common.storage.s3 import _is_retryable, normalize_prefix
 from determined.tensorboard.fetchers.s3 import S3Fetcher
 from tests import parallel
 from tests.storage import util
@@ -90,6 +91,21 @@ def test_storage_prefix_normalization(
         assert should_fail and "prefix must not match" in str(exc)
 
 
+@pytest.mark.parametrize(
+    "code,retryable",
+    [("SlowDown", True), ("503", True), ("AccessDenied", False), ("NoSuchBucket", False)],
+)
+def test_upload_failure_retryable_by_client_error_code(code: str, retryable: bool) -> None:
+    client_error = botocore.exceptions.ClientError({"Error": {"Code": code}}, "PutObject")
+    try:
+        try:
+            raise client_error
+        except botocore.exceptions.ClientError as e:
+            raise boto3.exceptions.S3UploadFailedError(f"Failed to upload: {e}")
+    except boto3.exceptions.S3UploadFailedError as e:
+        assert _is_retryable(e) is retryable
+
+
 @pytest.mark.cloud
 @pytest.mark.parametrize("prefix", [None, "my/test/prefix"])
 def test_live_s3_lifecycle(require_secrets: bool, tmp_path: Path, prefix: Optional[str]) -> None:
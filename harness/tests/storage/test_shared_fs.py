@@ -1,3 +1,4 @@
+import functools
 import os
 import shutil
 import unittest.mock
@@ -130,12 +131,17 @@ def test_checkpoint_sharded_store_restore(manager: storage.SharedFSStorageManage
             util.run_storage_store_restore_sharded_test(pex, manager, clean_up)
 
 
-def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> None:
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_copytree(
+    tmp_path: Path, manager: storage.SharedFSStorageManager, max_concurrency: int
+) -> None:
+    copytree = functools.partial(shared.copytree, max_concurrency=max_concurrency)
+
     src_dir = tmp_path.joinpath("src")
     util.create_checkpoint(src_dir, util.EXPECTED_FILES)
 
     dst_dir = tmp_path.joinpath("dst0")
-    shared.copytree(str(src_dir), str(dst_dir), selector=None)
+    copytree(str(src_dir), str(dst_dir), selector=None)
     util.validate_checkpoint(dst_dir, expected_files=util.EXPECTED_FILES)
 
     dst_dir = tmp_path.joinpath("dst1")
@@ -143,7 +149,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     def selector1(x: str) -> bool:
         return False
 
-    shared.copytree(str(src_dir), str(dst_dir), selector=selector1)
+    copytree(str(src_dir), str(dst_dir), selector=selector1)
     assert not dst_dir.exists()
 
     dst_dir = tmp_path.joinpath("dst2")
@@ -151,7 +157,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     def selector2(x: str) -> bool:
         return True
 
-    shared.copytree(str(src_dir), str(dst_dir), selector=selector2)
+    copytree(str(src_dir), str(dst_dir), selector=selector2)
     util.validate_checkpoint(dst_dir, expected_files=util.EXPECTED_FILES)
 
     dst_dir = tmp_path.joinpath("dst3")
@@ -159,7 +165,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     def selector3(x: str) -> bool:
         return x == "empty_dir/"
 
-    shared.copytree(str(src_dir), str(dst_dir), selector=selector3)
+    copytree(str(src_dir), str(dst_dir), selector=selector3)
     util.validate_checkpoint(dst_dir, expected_files={"empty_dir/": None})
 
     dst_dir = tmp_path.joinpath("dst4")
@@ -167,7 +173,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     def selector4(x: str) -> bool:
         return x in ["root.txt", "subdir/"]
 
-    shared.copytree(str(src_dir), str(dst_dir), selector=selector4)
+    copytree(str(src_dir), str(dst_dir), selector=selector4)
     util.validate_checkpoint(dst_dir, expected_files={"root.txt": "root file", "subdir/": None})
 
     dst_dir = tmp_path.joinpath("dst5")
@@ -175,7 +181,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     def selector5(x: str) -> bool:
         return x == "subdir/file2.txt"
 
-    shared.copytree(str(src_dir), str(dst_dir), selector=selector5)
+    copytree(str(src_dir), str(dst_dir), selector=selector5)
     util.validate_checkpoint(
         dst_dir, expected_files={"subdir/file2.txt": "nested file 2", "subdir/": None}
     )
@@ -195,7 +201,7 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
     )
 
     dst_dir = tmp_path.joinpath("dst6")
-    shared.copytree(str(src_dir1), str(dst_dir))
+    copytree(str(src_dir1), str(dst_dir))
 
     util.validate_checkpoint(
         dst_dir,
@@ -205,3 +211,50 @@ def test_copytree(tmp_path: Path, manager: storage.SharedFSStorageManager) -> No
             "subdir/file_nested": "nested file",
         },
     )
+
+
+@pytest.mark.parametrize("hardlink", [False, True])
+def test_copytree_parallel(tmp_path: Path, hardlink: bool, monkeypatch: Any) -> None:
+    # Split files bigger than 10 bytes into chunks.
+    monkeypatch.setattr(shared, "COPY_CHUNK_SIZE", 10)
+    expected_files = {
+        "small": "small",
+        "large": "0123456789" * 10 + "end",
+        "subdir/": None,
+        "subdir/large": "abcdefghij" * 5,
+    }
+    src_dir = tmp_path.joinpath("src")
+    util.create_checkpoint(src_dir, expected_files)
+
+    dst_dir = tmp_path.joinpath("dst")
+    shared.copytree(str(src_dir), str(dst_dir), max_concurrency=4, hardlink=hardlink)
+    util.validate_checkpoint(dst_dir, expected_files=expected_files)
+
+    for name in ("small", "large", "subdir/large"):
+        src_stat = src_dir.joinpath(name).stat()
+        dst_stat = dst_dir.joinpath(name).stat()
+        assert src_stat.st_mtime == dst_stat.st_mtime
+        assert (src_stat.st_ino == dst_stat.st_ino) == hardlink
+
+
+@pytest.mark.parametrize("supported", [False, True])
+def test_copytree_probes_reflink_once(tmp_path: Path, supported: bool, monkeypatch: Any) -> None:
+    monkeypatch.setattr(shared, "COPY_CHUNK_SIZE", 10)
+    expected_files = {f"file_{i}": f"content {i}" for i in range(5)}
+    expected_files["large"] = "0123456789" * 10
+    src_dir = tmp_path.joinpath("src")
+    util.create_checkpoint(src_dir, expected_files)
+
+    def fake_reflink(src: str, dst: str) -> bool:
+        if supported:
+            shutil.copyfile(src, dst)
+        return supported
+
+    reflink = unittest.mock.Mock(side_effect=fake_reflink)
+    monkeypatch.setattr(shared, "reflink", reflink)
+
+    dst_dir = tmp_path.joinpath("dst")
+    shared.copytree(str(src_dir), str(dst_dir), max_concurrency=4)
+    util.validate_checkpoint(dst_dir, expected_files=expected_files)
+    # A destination which can't reflink is only asked once, not for every file.
+    assert reflink.call_count == (len(expected_files) if supported else 1)
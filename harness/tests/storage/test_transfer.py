@@ -0,0 +1,72 @@
+import threading
+from typing import List
+from unittest import mock
+
+import pytest
+
+from determined.common.storage import transfer
+
+
+@pytest.mark.parametrize("max_concurrency", [1, 4])
+def test_transfer_all_items(max_concurrency: int) -> None:
+    lock = threading.Lock()
+    seen: List[int] = []
+
+    def fn(item: int) -> None:
+        with lock:
+            seen.append(item)
+
+    items = list(range(100))
+    stats = transfer.run(fn, items, size_of=lambda x: x, max_concurrency=max_concurrency)
+
+    assert sorted(seen) == items
+    if max_concurrency == 1:
+        assert seen == items
+    assert stats.files_done == stats.total_files == 100
+    assert stats.bytes_done == stats.total_bytes == sum(items)
+    assert stats.retries == 0
+
+
+@mock.patch("time.sleep")
+def test_transfer_retries(sleep: mock.MagicMock) -> None:
+    attempts = {"a": 0, "b": 0}
+
+    def fn(item: str) -> None:
+        attempts[item] += 1
+        if attempts[item] < 3:
+            raise ConnectionError("flaky")
+
+    stats = transfer.run(fn, ["a", "b"], size_of=lambda x: 1, max_concurrency=2, max_attempts=3)
+    assert attempts == {"a": 3, "b": 3}
+    assert stats.retries == 4
+    assert stats.files_done == 2
+
+
+@mock.patch("time.sleep")
+def test_transfer_failure(sleep: mock.MagicMock) -> None:
+    attempts = {"good": 0, "bad": 0, "fatal": 0}
+
+    def fn(item: str) -> None:
+        attempts[item] += 1
+        if item == "bad":
+            raise ConnectionError("flaky")
+        if item == "fatal":
+            raise PermissionError("denied")
+
+    def should_retry(e: Exception) -> bool:
+        return isinstance(e, ConnectionError)
+
+    with pytest.raises(ConnectionError, match="flaky"):
+        transfer.run(fn, ["bad"], size_of=lambda x: 0, max_attempts=2, should_retry=should_retry)
+    assert attempts["bad"] == 2
+
+    with pytest.raises(PermissionError, match="denied"):
+        transfer.run(
+            fn,
+            ["good", "fatal"],
+            size_of=lambda x: 0,
+            max_concurrency=2,
+            max_attempts=5,
+            should_retry=should_retry,
+        )
+    assert attempts["fatal"] == 1
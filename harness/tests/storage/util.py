@@ -3,7 +3,7 @@ import pathlib
 import shutil
 import time
 import uuid
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from unittest import mock
 
 import pytest
@@ -45,6 +45,52 @@ EXPECTED_FILES_N1 = {
 }
 
 
+class LocalCloudStorageManager(storage.CloudStorageManager):
+    """A CloudStorageManager which "uploads" by copying into another local directory."""
+
+    def __init__(self, temp_dir: str, remote: pathlib.Path, **kwargs: Any) -> None:
+        super().__init__(temp_dir, **kwargs)
+        self.remote = remote
+        self.uploads: List[Optional[storage.Paths]] = []
+        self.downloads: List[str] = []
+
+    def upload(
+        self, src: Union[str, os.PathLike], dst: str, paths: Optional[storage.Paths] = None
+    ) -> None:
+        self.uploads.append(paths)
+        upload_paths = paths if paths is not None else self._list_directory(src)
+        for rel_path in sorted(upload_paths):
+            remote_path = self.remote.joinpath(dst, rel_path)
+            if rel_path.endswith("/"):
+                remote_path.mkdir(parents=True, exist_ok=True)
+            else:
+                remote_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(os.path.join(src, rel_path), remote_path)
+
+    def download(
+        self,
+        src: str,
+        dst: Union[str, os.PathLike],
+        selector: Optional[storage.Selector] = None,
+    ) -> None:
+        self.downloads.append(src)
+        remote_dir = self.remote.joinpath(src)
+        if not remote_dir.exists():
+            raise errors.CheckpointNotFound(f"Did not find checkpoint {src}")
+        for rel_path in sorted(self._list_directory(remote_dir)):
+            if selector is not None and not selector(rel_path):
+                continue
+            path = pathlib.Path(dst).joinpath(rel_path)
+            if rel_path.endswith("/"):
+                path.mkdir(parents=True, exist_ok=True)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(remote_dir.joinpath(rel_path), path)
+
+    def delete(self, tgt: str) -> None:
+        shutil.rmtree(self.remote.joinpath(tgt), ignore_errors=True)
+
+
 def create_checkpoint(checkpoint_dir: pathlib.Path, expected_files: Optional[Dict] = None) -> None:
     """Create a new checkpoint."""
     if expected_files is None:
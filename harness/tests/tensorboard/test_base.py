@@ -1,9 +1,13 @@
 import pathlib
+import threading
+import time
+from typing import Any, List, Tuple
 from unittest import mock
 
 import pytest
 
 from determined import tensorboard
+from determined.common import storage
 from tests.tensorboard import test_util
 
 HOST_PATH = pathlib.Path(__file__).resolve().parent.joinpath("test_tensorboard_host")
@@ -79,6 +83,24 @@ def test_setting_storage_path(tmp_path: pathlib.Path) -> None:
     assert manager.storage_path == STORAGE_PATH
 
 
+def test_upload_settings_from_environment(tmp_path: pathlib.Path, monkeypatch: Any) -> None:
+    monkeypatch.setenv(tensorboard.base.UPLOAD_WORKERS_ENV, "8")
+    monkeypatch.setenv(tensorboard.base.MIN_UPLOAD_INTERVAL_ENV, "2.5")
+    checkpoint_config = {"type": "shared_fs", "host_path": str(tmp_path)}
+
+    # The same config still builds a storage manager.
+    assert isinstance(
+        storage.build(checkpoint_config, container_path=None), storage.SharedFSStorageManager
+    )
+    env = test_util.get_dummy_env()
+    manager = tensorboard.build(
+        env.det_cluster_id, env.det_experiment_id, env.det_trial_id, checkpoint_config
+    )
+    assert manager.upload_thread is not None
+    assert manager.upload_thread._workers == 8
+    assert manager.upload_thread._min_interval == 2.5
+
+
 def test_unknown_type() -> None:
     checkpoint_config = {
         "type": "unknown",
@@ -143,3 +165,108 @@ def test_upload_thread_normal_case() -> None:
     upload_thread.close()
 
     assert upload_function.call_count == 2
+
+
+def test_upload_thread_coalesces_uploads() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    uploaded: List[Tuple[str, int]] = []
+
+    def upload_function(path_info_list: List[tensorboard.base.PathUploadInfo]) -> None:
+        started.set()
+        release.wait()
+        uploaded.extend((str(i.path), i.offset) for i in path_info_list)
+
+    def info(name: str, offset: int) -> tensorboard.base.PathUploadInfo:
+        return tensorboard.base.PathUploadInfo(
+            path=pathlib.Path(name), mangled_relative_path=pathlib.Path(name), offset=offset
+        )
+
+    upload_thread = tensorboard.base._TensorboardUploadThread(upload_function, workers=2)
+    upload_thread.start()
+    upload_thread.upload([info("busy", 0)])
+    started.wait()
+
+    # Repeated syncs of the same file while the uploader is busy are coalesced.
+    upload_thread.upload([info("events", 0), info("other", 0)])
+    upload_thread.upload([info("events", 5)])
+    upload_thread.upload([info("events", 9)])
+    assert upload_thread.queue_depth == 2
+    assert upload_thread.lag > 0
+
+    release.set()
+    upload_thread.close()
+    assert sorted(uploaded) == [("busy", 0), ("events", 0), ("other", 0)]
+    assert upload_thread.queue_depth == 0
+
+
+def test_upload_thread_min_interval() -> None:
+    upload_times: List[float] = []
+
+    upload_thread = tensorboard.base._TensorboardUploadThread(
+        lambda _: upload_times.append(time.time()), min_interval=0.2
+    )
+    upload_thread.start()
+    for name in ("a", "b"):
+        upload_thread.upload(
+            [
+                tensorboard.base.PathUploadInfo(
+                    path=pathlib.Path(name), mangled_relative_path=pathlib.Path(name)
+                )
+            ]
+        )
+        time.sleep(0.05)
+    time.sleep(0.3)
+    upload_thread.close()
+
+    assert len(upload_times) == 2
+    assert upload_times[1] - upload_times[0] >= 0.2
+
+
+def test_incremental_sync(tmp_path: pathlib.Path) -> None:
+    base_path = tmp_path.joinpath("tensorboard")
+    base_path.mkdir()
+    manager = tensorboard.SharedFSTensorboardManager(
+        str(tmp_path.joinpath("storage")), base_path, pathlib.Path("sync"), async_upload=False
+    )
+    events = base_path.joinpath("events.out.tfevents.host")
+    events.write_bytes(b"first")
+    base_path.joinpath("plugins").mkdir()
+    profile = base_path.joinpath("plugins", "host.xplane.pb")
+    profile.write_bytes(b"profile")
+
+    uploaded = manager.shared_fs_base
+    with mock.patch.object(manager, "_sync_impl", wraps=manager._sync_impl) as sync_impl:
+        manager.sync()
+        assert {(i.path, i.offset) for i in sync_impl.call_args[0][0]} == {
+            (events, 0),
+            (profile, 0),
+        }
+
+        # Unchanged files are not uploaded again.
+        manager.sync()
+        assert sync_impl.call_args[0][0] == []
+
+        # Only the new bytes of a tfevents file are uploaded; other files are uploaded in full.
+        with events.open("ab") as f:
+            f.write(b"second")
+        profile.write_bytes(b"new profile")
+        manager.sync()
+        assert {(i.path, i.offset) for i in sync_impl.call_args[0][0]} == {
+            (events, 5),
+            (profile, 0),
+        }
+
+    assert uploaded.joinpath("events.out.tfevents.host").read_bytes() == b"firstsecond"
+    assert uploaded.joinpath("plugins", "host.xplane.pb").read_bytes() == b"new profile"
+
+    # A failed upload is retried in full.
+    with events.open("ab") as f:
+        f.write(b"third")
+    with mock.patch.object(manager, "_sync_impl", side_effect=RuntimeError("failed")):
+        with pytest.raises(RuntimeError):
+            manager.sync()
+    with mock.patch.object(manager, "_sync_impl", wraps=manager._sync_impl) as sync_impl:
+        manager.sync()
+        assert [(i.path, i.offset) for i in sync_impl.call_args[0][0]] == [(events, 0)]
+    assert uploaded.joinpath("events.out.tfevents.host").read_bytes() == b"firstsecondthird"
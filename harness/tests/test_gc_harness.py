@@ -1,11 +1,15 @@
+import json
 import os
 import pathlib
 import uuid
 from typing import Any, List
+from unittest import mock
 
 import pytest
 
-from determined.common import storage
+from determined.common import constants, storage
+from determined.common.storage import content_addressed
+from determined.exec import gc_checkpoints
 from determined.exec.gc_checkpoints import delete_checkpoints
 from tests.storage import util as storage_util
 
@@ -36,3 +40,44 @@ def test_delete_checkpoints(manager: storage.StorageManager, to_delete: List[str
 def test_dry_run(manager: storage.StorageManager, to_delete: List[str]) -> None:
     delete_checkpoints(manager, to_delete, dry_run=True)
     assert len(os.listdir(manager._base_path)) == len(to_delete)
+
+
+def test_gc_content_addressed(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    storage_path = tmp_path.joinpath("storage")
+    inner = storage.SharedFSStorageManager(str(storage_path))
+    manager = storage.ContentAddressedStorageManager(inner)
+    for storage_id in ("a", "b", "c"):
+        ckpt = tmp_path.joinpath(storage_id)
+        storage_util.create_checkpoint(ckpt, {"frozen.bin": "shared", "head.bin": storage_id})
+        manager.upload(ckpt, storage_id)
+    storage_util.create_checkpoint(tmp_path.joinpath("plain"))
+    inner.upload(tmp_path.joinpath("plain"), "plain")
+
+    # Experiment configs can't set content_addressed, so GC has to detect such checkpoints.
+    config_path = tmp_path.joinpath("storage.json")
+    config_path.write_text(json.dumps({"type": "shared_fs", "host_path": str(storage_path)}))
+    monkeypatch.setattr(constants, "SHARED_FS_CONTAINER_PATH", str(storage_path))
+
+    def gc(storage_ids: List[str]) -> None:
+        argv = ["--storage-config", str(config_path), "--delete", ",".join(storage_ids)]
+        with mock.patch.object(
+            storage.ContentAddressedStorageManager,
+            "_read_all_manifests",
+            autospec=True,
+            side_effect=content_addressed.ContentAddressedStorageManager._read_all_manifests,
+        ) as read_all_manifests:
+            gc_checkpoints.main(argv)
+        # The remaining references are read once for the whole batch.
+        assert read_all_manifests.call_count == 1
+
+    blobs_dir = storage_path.joinpath(content_addressed.BLOBS_DIR)
+    gc(["a", "b", "plain"])
+    assert sorted(os.listdir(storage_path)) == [content_addressed.CAS_DIR, "c"]
+    assert len(os.listdir(blobs_dir)) == 2
+
+    out = tmp_path.joinpath("out")
+    manager.download("c", out)
+    storage_util.validate_checkpoint(out, {"frozen.bin": "shared", "head.bin": "c"})
+
+    gc(["c"])
+    assert os.listdir(blobs_dir) == []
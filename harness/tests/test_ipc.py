@@ -5,12 +5,14 @@ import sys
 import textwrap
 import time
 import traceback
-from typing import Any, List, Optional, cast
+from typing import Any, Dict, List, Optional, cast
+from unittest import mock
 
+import numpy as np
 import pytest
 
 import determined as det
-from determined import core, ipc
+from determined import constants, core, ipc
 from tests import parallel
 
 
@@ -76,17 +78,26 @@ class SubprocGroup(list):
 
 class BroadcastClientSubproc(Subproc):
     def __init__(
-        self, rank: int, size: int, pub_url: str, pull_url: str, exp_msgs: List[int]
+        self,
+        rank: int,
+        size: int,
+        pub_url: str,
+        pull_url: str,
+        exp_msgs: List[Any],
+        zero_copy: bool = False,
     ) -> None:
         self._rank = rank
         self._size = size
         self._pub_url = pub_url
         self._pull_url = pull_url
         self._exp_msgs = exp_msgs
+        self._zero_copy = zero_copy
         super().__init__()
 
     def main(self) -> None:
-        with ipc.ZMQBroadcastClient(self._pub_url, self._pull_url) as broadcast_client:
+        with ipc.ZMQBroadcastClient(
+            self._pub_url, self._pull_url, zero_copy=self._zero_copy
+        ) as broadcast_client:
             # Start the server-client communication test.
             broadcast_client.safe_start()
             for exp in self._exp_msgs:
@@ -95,6 +106,21 @@ class BroadcastClientSubproc(Subproc):
                 broadcast_client.send(2 * msg)
 
 
+class ArrayClientSubproc(BroadcastClientSubproc):
+    def main(self) -> None:
+        with ipc.ZMQBroadcastClient(
+            self._pub_url, self._pull_url, zero_copy=self._zero_copy
+        ) as broadcast_client:
+            broadcast_client.safe_start()
+            for exp in self._exp_msgs:
+                msg = broadcast_client.recv()
+                assert np.array_equal(msg["array"], exp["array"]), msg
+                assert msg["bytes"] == exp["bytes"]
+                # Received arrays are writable.
+                msg["array"] *= 2
+                broadcast_client.send(msg)
+
+
 def test_broadcast_server_client() -> None:
     num_subprocs = 3
 
@@ -115,10 +141,43 @@ def test_broadcast_server_client() -> None:
                 assert all(g == 2 * msg for g in gathered)
 
 
+@pytest.mark.skipif(not ipc.ZERO_COPY_AVAILABLE, reason="requires pickle protocol 5")
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_broadcast_arrays(zero_copy: bool) -> None:
+    num_subprocs = 2
+
+    with ipc.ZMQBroadcastServer(num_connections=num_subprocs, zero_copy=zero_copy) as server:
+        pub_url = f"tcp://localhost:{server.get_pub_port()}"
+        pull_url = f"tcp://localhost:{server.get_pull_port()}"
+        # Big enough that zmq does not copy the frames, plus small and non-contiguous arrays.
+        msgs: List[Dict[str, Any]] = [
+            {"array": np.arange(1 << 20, dtype=np.float32), "bytes": b"x" * 100000},
+            {"array": np.arange(10), "bytes": b""},
+            {"array": np.arange(100).reshape(10, 10)[:, ::2], "bytes": b"y"},
+        ]
+
+        with SubprocGroup(
+            ArrayClientSubproc(i, num_subprocs, pub_url, pull_url, msgs, zero_copy)
+            for i in range(num_subprocs)
+        ):
+            server.safe_start()
+            for msg in msgs:
+                server.broadcast(msg)
+                # The caller may modify the message as soon as broadcast() returns.
+                sent = msg["array"].copy()
+                msg["array"] += 1
+                for g in server.gather():
+                    assert np.array_equal(g["array"], 2 * sent)
+                msg["array"] -= 1
+
+
 @pytest.mark.parametrize("cross_size", [1, 4])
 @pytest.mark.parametrize("local_size", [1, 4])
 @pytest.mark.parametrize("force_tcp", [False, True])
-def test_distributed_context(cross_size: int, local_size: int, force_tcp: bool) -> None:
+@pytest.mark.parametrize("hierarchical", [False, True])
+def test_distributed_context(
+    cross_size: int, local_size: int, force_tcp: bool, hierarchical: bool
+) -> None:
     size = cross_size * local_size
 
     # Make sure `make test` doesn't hang on macbook's default values.  Avoid skipping on linux
@@ -144,6 +203,7 @@ def test_distributed_context(cross_size: int, local_size: int, force_tcp: bool)
                 cross_size=pex.cross_size,
                 chief_ip="localhost",
                 force_tcp=force_tcp,
+                hierarchical=hierarchical,
             )
 
         # Perform a broadcast.
@@ -175,6 +235,10 @@ def test_distributed_context(cross_size: int, local_size: int, force_tcp: bool)
         expect = set(range(size))
         assert results == [expect] * size, "not all threads ran allgather correctly"
 
+        # Allgather results are in rank order.
+        results = pex.run(lambda: contexts[pex.rank].allgather(pex.rank))
+        assert results == [list(range(size))] * size, "allgather results were out of order"
+
         # Perform a local allgather.
         results = pex.run(lambda: set(contexts[pex.rank].allgather_local(pex.rank)))
         expect = [
@@ -188,6 +252,80 @@ def test_distributed_context(cross_size: int, local_size: int, force_tcp: bool)
             context.close()
 
 
+@pytest.mark.slow
+def test_allgather_benchmark() -> None:
+    """
+    Compare allgather times of the star and hierarchical topologies.  Run with -s to see results.
+    """
+    cross_size, local_size, iterations = 4, 8, 20
+    size = cross_size * local_size
+    payload = np.ones(1 << 14, dtype=np.float32)
+
+    times = {}
+    for hierarchical in (False, True):
+        with parallel.Execution(size, local_size, make_distributed_context=False) as pex:
+
+            @pex.run
+            def contexts() -> core.DistributedContext:
+                return core.DistributedContext(
+                    rank=pex.rank,
+                    size=pex.size,
+                    local_rank=pex.local_rank,
+                    local_size=pex.local_size,
+                    cross_rank=pex.cross_rank,
+                    cross_size=pex.cross_size,
+                    chief_ip="localhost",
+                    # Don't wait for the previous run to release its ports.
+                    pub_port=constants.INTER_TRAIN_PROCESS_COMM_PORT_1 + 10 * hierarchical,
+                    pull_port=constants.INTER_TRAIN_PROCESS_COMM_PORT_2 + 10 * hierarchical,
+                    hierarchical=hierarchical,
+                )
+
+            def allgathers() -> float:
+                context = contexts[pex.rank]
+                context.allgather(None)
+                start = time.time()
+                for _ in range(iterations):
+                    out = context.allgather(payload)
+                    assert len(out) == size
+                return time.time() - start
+
+            times[hierarchical] = max(pex.run(allgathers))
+            for context in contexts:
+                context.close()
+
+    print(
+        f"{iterations} allgathers of {payload.nbytes} bytes across {size} workers: "
+        f"star {times[False]:.3f}s, hierarchical {times[True]:.3f}s"
+    )
+
+
+@pytest.mark.parametrize(
+    "env,arg,expect",
+    [(None, None, False), ("true", None, True), ("1", None, True), ("true", False, False)],
+)
+def test_from_torch_distributed_hierarchical(
+    env: Optional[str], arg: Optional[bool], expect: bool, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    for key, value in [
+        ("RANK", "0"),
+        ("WORLD_SIZE", "1"),
+        ("LOCAL_RANK", "0"),
+        ("LOCAL_WORLD_SIZE", "1"),
+        ("GROUP_RANK", "0"),
+        ("GROUP_WORLD_SIZE", "1"),
+    ]:
+        monkeypatch.setenv(key, value)
+    if env is None:
+        monkeypatch.delenv("DET_HIERARCHICAL_COLLECTIVES", raising=False)
+    else:
+        monkeypatch.setenv("DET_HIERARCHICAL_COLLECTIVES", env)
+
+    with mock.patch.object(core.DistributedContext, "__init__", return_value=None) as init:
+        core.DistributedContext.from_torch_distributed(hierarchical=arg)
+    assert init.call_args.kwargs["hierarchical"] is expect
+
+
 class TestPIDServer:
     @staticmethod
     def _worker_proc(
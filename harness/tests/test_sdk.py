@@ -1,6 +1,12 @@
-from typing import Any, Optional
+import json
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import numpy as np
+import pytest
 
 from determined.common.api import bindings
+from determined.common.experimental import trial
 from determined.experimental import client
 
 
@@ -67,3 +73,53 @@ def test_model_order_by() -> None:
         # We don't give the user the UNSPECIFIED option.
         ignore=[bindings.v1OrderBy.ORDER_BY_UNSPECIFIED],
     )
+
+
+def _metrics_report(trial_id: int, steps: int, metrics: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "archived": False,
+        "endTime": f"2023-01-01T00:00:{steps:02d}.5Z",
+        "id": steps,
+        "metrics": {"avg_metrics": metrics},
+        "totalBatches": steps,
+        "trialId": trial_id,
+        "trialRunId": 1,
+    }
+
+
+def test_export_trials_metrics(monkeypatch: Any) -> None:
+    # Convert the reports to arrays in several chunks.
+    monkeypatch.setattr(trial, "_EXPORT_CHUNK_SIZE", 2)
+    pages = [
+        [_metrics_report(1, 10, {"loss": 0.5}), _metrics_report(1, 20, {"loss": 0.25})],
+        [_metrics_report(1, 30, {"loss": 0.125, "acc": 0.5})],
+        [_metrics_report(2, 10, {"loss": 1})],
+        [_metrics_report(2, 40, {"acc": 0.75, "note": "text"})],
+    ]
+    session = mock.MagicMock()
+    session.get.return_value.iter_lines.return_value = [
+        json.dumps({"result": {"metrics": page}}) for page in pages
+    ]
+
+    columns = trial._export_metrics(session, [1, 2])
+    np.testing.assert_array_equal(columns["trial_id"], [1, 1, 1, 2, 2])
+    np.testing.assert_array_equal(columns["steps_completed"], [10, 20, 30, 10, 40])
+    assert columns["end_time"][0] == np.datetime64("2023-01-01T00:00:10.5")
+    np.testing.assert_array_equal(columns["loss"], [0.5, 0.25, 0.125, 1, np.nan])
+    np.testing.assert_array_equal(columns["acc"], [np.nan, np.nan, 0.5, np.nan, 0.75])
+    assert np.isnan(columns["note"][-2]) and columns["note"][-1] == "text"
+    assert session.get.call_args[1]["params"] == {"trialIds": [1, 2]}
+
+    columns = trial._export_metrics(
+        session, [1, 2], metric_names=["acc"], min_steps=20, max_steps=30
+    )
+    assert set(columns) == {"trial_id", "trial_run_id", "steps_completed", "end_time", "acc"}
+    np.testing.assert_array_equal(columns["steps_completed"], [20, 30])
+    np.testing.assert_array_equal(columns["acc"], [np.nan, 0.5])
+
+    session.get.return_value.iter_lines.return_value = []
+    columns = trial._export_metrics(session, [3], group="validation")
+    assert len(columns["trial_id"]) == 0
+
+    with pytest.raises(ValueError, match="group must be one of"):
+        trial._export_metrics(session, [1], group="profiling")
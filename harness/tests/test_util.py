@@ -1,5 +1,6 @@
 import os
 import pathlib
+import tarfile
 from typing import Optional
 
 import numpy as np
@@ -101,3 +102,63 @@ def test_is_numerical_scalar() -> None:
     assert util.is_numerical_scalar(np.array(1))
     assert util.is_numerical_scalar(np.array(-3.14))
     assert util.is_numerical_scalar(np.array([1.0])[0])
+
+
+def test_write_user_code(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    model_dir = tmp_path.joinpath("model")
+    model_dir.joinpath("pkg", "__pycache__").mkdir(parents=True)
+    model_dir.joinpath("model_def.py").write_text("x = 1\n")
+    model_dir.joinpath("pkg", "data.txt").write_text("data\n")
+    model_dir.joinpath("pkg", "__pycache__", "model_def.pyc").write_text("")
+    monkeypatch.chdir(model_dir)
+
+    ckpt_a, ckpt_b = tmp_path.joinpath("a"), tmp_path.joinpath("b")
+    for ckpt in (ckpt_a, ckpt_b):
+        ckpt.mkdir()
+        util.write_user_code(ckpt, on_cluster=False)
+        assert os.listdir(ckpt) == ["code.tar.gz"]
+    archive = ckpt_a.joinpath("code.tar.gz").read_bytes()
+    assert ckpt_b.joinpath("code.tar.gz").read_bytes() == archive
+
+    # Off-cluster, every checkpoint snapshots the current working directory.
+    model_dir.joinpath("model_def.py").write_text("x = 2\n")
+    util.write_user_code(ckpt_b, on_cluster=False)
+    assert ckpt_b.joinpath("code.tar.gz").read_bytes() != archive
+
+    # On-cluster, the model copy is only snapshotted once, and every checkpoint shares it.
+    model_dir.joinpath("model_def.py").write_text("x = 1\n")
+    monkeypatch.setattr(util, "_user_code_archives", {})
+    monkeypatch.setattr(util.constants, "MANAGED_TRAINING_MODEL_COPY", str(model_dir))
+    util.write_user_code(ckpt_b, on_cluster=True)
+    assert ckpt_b.joinpath("code.tar.gz").read_bytes() == archive
+    model_dir.joinpath("model_def.py").write_text("x = 2\n")
+    util.write_user_code(ckpt_b, on_cluster=True)
+    assert ckpt_b.joinpath("code.tar.gz").read_bytes() == archive
+
+    code_path = det.common.util.extract_user_code(ckpt_a)
+    assert code_path == ckpt_a.joinpath("code")
+    assert sorted(str(p.relative_to(code_path)) for p in code_path.rglob("*")) == [
+        "model_def.py",
+        "pkg",
+        os.path.join("pkg", "data.txt"),
+    ]
+    assert code_path.joinpath("model_def.py").read_text() == "x = 1\n"
+    # Extracted code is not extracted again.
+    code_path.joinpath("model_def.py").write_text("x = 3\n")
+    assert det.common.util.extract_user_code(ckpt_a) == code_path
+    assert code_path.joinpath("model_def.py").read_text() == "x = 3\n"
+
+
+def test_extract_user_code_outside_of_directory(tmp_path: pathlib.Path) -> None:
+    outside = tmp_path.joinpath("outside.py")
+    outside.write_text("x = 1\n")
+    ckpt = tmp_path.joinpath("ckpt")
+    ckpt.mkdir()
+    with tarfile.open(str(ckpt.joinpath("code.tar.gz")), "w:gz") as tf:
+        tf.add(str(outside), "../outside.py")
+    outside.unlink()
+
+    with pytest.raises(ValueError, match="outside of its directory"):
+        det.common.util.extract_user_code(ckpt)
+    assert not outside.exists()
+    assert os.listdir(ckpt) == ["code.tar.gz"]
@@ -105,6 +105,8 @@ type SharedFSConfigV0 struct {
 	RawTensorboardPath *string `json:"tensorboard_path,omitempty"`
 	RawStoragePath     *string `json:"storage_path"`
 	RawPropagation     *string `json:"propagation"`
+	RawMaxConcurrency  *int    `json:"max_concurrency,omitempty"`
+	RawHardlink        *bool   `json:"hardlink,omitempty"`
 }
 
 // PathInContainer caclulates where the full StoragePath will be inside the container.
@@ -135,11 +137,13 @@ type HDFSConfigV0 struct {
 //
 //go:generate ../gen.sh
 type S3ConfigV0 struct {
-	RawBucket      *string `json:"bucket"`
-	RawAccessKey   *string `json:"access_key"`
-	RawSecretKey   *string `json:"secret_key"`
-	RawEndpointURL *string `json:"endpoint_url"`
-	RawPrefix      *string `json:"prefix"`
+	RawBucket              *string `json:"bucket"`
+	RawAccessKey           *string `json:"access_key"`
+	RawSecretKey           *string `json:"secret_key"`
+	RawEndpointURL         *string `json:"endpoint_url"`
+	RawPrefix              *string `json:"prefix"`
+	RawStreamingUpload     *bool   `json:"streaming_upload,omitempty"`
+	RawStreamingDiskBudget *int    `json:"streaming_disk_budget,omitempty"`
 }
 
 // Validate implements the check.Validatable interface.
@@ -166,8 +170,10 @@ func validateStoragePrefix(prefix *string) error {
 //
 //go:generate ../gen.sh
 type GCSConfigV0 struct {
-	RawBucket *string `json:"bucket"`
-	RawPrefix *string `json:"prefix"`
+	RawBucket              *string `json:"bucket"`
+	RawPrefix              *string `json:"prefix"`
+	RawStreamingUpload     *bool   `json:"streaming_upload,omitempty"`
+	RawStreamingDiskBudget *int    `json:"streaming_disk_budget,omitempty"`
 }
 
 // Validate implements the check.Validatable interface.
@@ -186,10 +192,12 @@ func (c GCSConfigV0) Validate() []error {
 //
 //go:generate ../gen.sh
 type AzureConfigV0 struct {
-	RawContainer        *string `json:"container"`
-	RawConnectionString *string `json:"connection_string,omitempty"`
-	RawAccountURL       *string `json:"account_url,omitempty"`
-	RawCredential       *string `json:"credential,omitempty"`
+	RawContainer           *string `json:"container"`
+	RawConnectionString    *string `json:"connection_string,omitempty"`
+	RawAccountURL          *string `json:"account_url,omitempty"`
+	RawCredential          *string `json:"credential,omitempty"`
+	RawStreamingUpload     *bool   `json:"streaming_upload,omitempty"`
+	RawStreamingDiskBudget *int    `json:"streaming_disk_budget,omitempty"`
 }
 
 // Merge implements schemas.Mergeable.
@@ -206,6 +214,10 @@ func (c AzureConfigV0) Merge(other AzureConfigV0) AzureConfigV0 {
 		RawConnectionString: schemas.Copy(credSource.RawConnectionString),
 		RawAccountURL:       schemas.Copy(credSource.RawAccountURL),
 		RawCredential:       schemas.Copy(credSource.RawCredential),
+		RawStreamingUpload:  schemas.Merge(c.RawStreamingUpload, other.RawStreamingUpload),
+		RawStreamingDiskBudget: schemas.Merge(
+			c.RawStreamingDiskBudget, other.RawStreamingDiskBudget,
+		),
 	}
 }
 
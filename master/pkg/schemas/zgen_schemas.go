@@ -88,6 +88,21 @@ var (
             ],
             "default": null
         },
+        "streaming_upload": {
+            "type": [
+                "boolean",
+                "null"
+            ],
+            "default": null
+        },
+        "streaming_disk_budget": {
+            "type": [
+                "integer",
+                "null"
+            ],
+            "default": null,
+            "minimum": 0
+        },
         "save_experiment_best": {
             "type": [
                 "integer",
@@ -313,12 +328,16 @@ var (
         "credential": true,
         "endpoint_url": true,
         "prefix": true,
+        "hardlink": true,
         "hdfs_path": true,
         "hdfs_url": true,
         "host_path": true,
+        "max_concurrency": true,
         "propagation": true,
         "secret_key": true,
         "storage_path": true,
+        "streaming_disk_budget": true,
+        "streaming_upload": true,
         "tensorboard_path": true,
         "type": true,
         "user": true,
@@ -1003,6 +1022,21 @@ var (
             },
             "default": null
         },
+        "streaming_upload": {
+            "type": [
+                "boolean",
+                "null"
+            ],
+            "default": null
+        },
+        "streaming_disk_budget": {
+            "type": [
+                "integer",
+                "null"
+            ],
+            "default": null,
+            "minimum": 0
+        },
         "save_experiment_best": {
             "type": [
                 "integer",
@@ -1876,6 +1910,21 @@ var (
             },
             "default": null
         },
+        "streaming_upload": {
+            "type": [
+                "boolean",
+                "null"
+            ],
+            "default": null
+        },
+        "streaming_disk_budget": {
+            "type": [
+                "integer",
+                "null"
+            ],
+            "default": null,
+            "minimum": 0
+        },
         "save_experiment_best": {
             "type": [
                 "integer",
@@ -2833,6 +2882,21 @@ var (
             ],
             "default": null
         },
+        "max_concurrency": {
+            "type": [
+                "integer",
+                "null"
+            ],
+            "default": null,
+            "minimum": 1
+        },
+        "hardlink": {
+            "type": [
+                "boolean",
+                "null"
+            ],
+            "default": null
+        },
         "checkpoint_path": {
             "type": [
                 "string",